@@ -1,14 +1,32 @@
 import requests
 import json
 import datetime
+import glob
 import smtplib
 import imaplib
 import email as email_lib
 import os
 import re
+import hashlib
+import heapq
+import itertools
+import random
 import time
+import zlib
 import logging
+import contextlib
+import cProfile
+import io
+import pstats
+import tracemalloc
+import sys
+import threading
 import feedparser
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from email.utils import parsedate_to_datetime
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
@@ -71,6 +89,82 @@ def extract_json_from_text(text):
         return None
 
 
+class IncrementalArticlesParser:
+    """스트리밍 응답용 증분 JSON 파서. "articles" 배열의 각 객체가 닫히는 즉시 반환합니다.
+
+    feed(chunk)는 이번 청크에서 완성된 article dict 리스트를 반환합니다. 앞머리 markdown fence·
+    짧은 문구는 허용하되, max_prefix자 안에 '{'가 없거나 괄호가 어긋나거나 닫힌 article이
+    JSON이 아니면 malformed를 True로 두고 이후 입력을 무시합니다 (조기 중단 신호).
+    """
+
+    def __init__(self, key="articles", max_prefix=200):
+        self.key = key
+        self.max_prefix = max_prefix
+        self.text = ""
+        self.malformed = False
+        self.done = False
+        self._pos = 0
+        self._root = None
+        self._stack = []        # [(container 문자, 이 컨테이너의 키, 시작 위치)]
+        self._in_str = False
+        self._esc = False
+        self._str_start = 0
+        self._last_str = None
+        self._next_key = None
+
+    def feed(self, chunk):
+        self.text += chunk
+        emitted = []
+        if self.malformed or self.done:
+            return emitted
+        text = self.text
+        if self._root is None:
+            start = text.find('{')
+            if start < 0 or start > self.max_prefix:
+                self.malformed = len(text) > self.max_prefix
+                return emitted
+            self._root = self._pos = start
+        for i in range(self._pos, len(text)):
+            ch = text[i]
+            if self._in_str:
+                if self._esc:
+                    self._esc = False
+                elif ch == '\\':
+                    self._esc = True
+                elif ch == '"':
+                    self._in_str = False
+                    self._last_str = text[self._str_start:i]
+                continue
+            if ch == '"':
+                self._in_str, self._str_start = True, i + 1
+            elif ch == ':':
+                self._next_key, self._last_str = self._last_str, None
+            elif ch == ',':
+                self._next_key = None
+            elif ch in '{[':
+                parent = self._stack[-1] if self._stack else None
+                key = parent[1] if parent and parent[0] == '[' else self._next_key
+                self._stack.append((ch, key, i))
+                self._next_key = None
+            elif ch in '}]':
+                if not self._stack or self._stack[-1][0] != ('{' if ch == '}' else '['):
+                    self.malformed = True
+                    break
+                opener, key, start = self._stack.pop()
+                parent = self._stack[-1] if self._stack else None
+                if ch == '}' and parent and parent[0] == '[' and parent[1] == self.key:
+                    try:
+                        emitted.append(json.loads(text[start:i + 1]))
+                    except json.JSONDecodeError:
+                        self.malformed = True
+                        break
+                if not self._stack:
+                    self.done = True
+                    break
+        self._pos = len(text)
+        return emitted
+
+
 def _title_words(title):
     """제목에서 2글자 이상 단어 추출 (한글+영문+숫자). 따옴표/특수문자 제거."""
     title = re.sub(r'["\'\u201c\u201d\u2018\u2019\u300c\u300d\u3010\u3011\[\]()…·]', ' ', title)
@@ -79,64 +173,1372 @@ def _title_words(title):
     return {w for w in words if w not in stopwords}
 
 
-def is_near_duplicate(new_title, seen_titles, threshold=0.4):
-    """제목 단어 40% 이상 겹치면 중복 판정."""
-    new_words = _title_words(new_title)
-    if not new_words:
+class ArticleRecord:
+    """수집 기사 레코드. 생성 시 한 번만 정규화하고 제목 단어 집합(words)·링크 해시(link_hash)를 캐시.
+
+    __slots__로 기사당 메모리를 줄이고, 기존 dict 방식 접근(n['title'], n.get(...), n[...] = ...)을
+    그대로 지원합니다. to_dict()는 save_report_json의 raw_articles 형태와 동일합니다.
+    """
+
+    __slots__ = ("title", "link", "desc", "date", "source", "relevance_score", "words", "link_hash")
+    FIELDS = ("title", "link", "desc", "date", "source")
+    _KEYS = frozenset(FIELDS + ("relevance_score",))
+
+    def __init__(self, title, link, desc, date, source, relevance_score=None):
+        self.title = " ".join(title.split())
+        self.link = link
+        self.desc = desc
+        self.date = date
+        self.source = source
+        self.relevance_score = relevance_score
+        self.words = frozenset(_title_words(self.title))
+        self.link_hash = self._hash_link(link)
+
+    @staticmethod
+    def _hash_link(link):
+        return hashlib.sha1(link.encode("utf-8")).hexdigest()[:16]
+
+    @classmethod
+    def from_html(cls, title, link, desc, date, source):
+        """HTML 태그·엔티티가 섞인 원문에서 생성 (clean_html은 여기서 한 번만)."""
+        return cls(clean_html(title), link, clean_html(desc), date, source)
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(
+            d.get('title', ''), d.get('link', ''), d.get('desc', ''),
+            d.get('date', ''), d.get('source', ''), d.get('relevance_score'),
+        )
+
+    def __getitem__(self, key):
+        if key not in self._KEYS:
+            raise KeyError(key)
+        value = getattr(self, key)
+        if value is None and key == 'relevance_score':
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key not in self._KEYS:
+            raise KeyError(key)
+        setattr(self, key, value)
+        if key == 'title':
+            self.words = frozenset(_title_words(value))
+        elif key == 'link':
+            self.link_hash = self._hash_link(value)
+
+    def __contains__(self, key):
+        return key in self._KEYS and (key != 'relevance_score' or self.relevance_score is not None)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_dict(self):
+        d = {f: getattr(self, f) for f in self.FIELDS}
+        if self.relevance_score is not None:
+            d['relevance_score'] = self.relevance_score
+        return d
+
+    def __repr__(self):
+        return f"ArticleRecord({self.title!r}, {self.date!r}, {self.source!r})"
+
+
+def _article_words(article):
+    """ArticleRecord면 캐시된 제목 단어 집합, dict면 None (인덱스가 직접 계산)."""
+    return getattr(article, 'words', None)
+
+
+def _json_default(obj):
+    """json.dump default 훅 — ArticleRecord를 기존 dict 형태로 직렬화."""
+    if isinstance(obj, ArticleRecord):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class NearDupIndex:
+    """제목 근사 중복 인덱스. 제목당 _title_words를 한 번만 계산하고 단어→제목 역색인을 유지.
+
+    신규 제목은 단어를 하나 이상 공유하는 기존 제목과만 비교하며, 겹치는 단어 수 / 작은 쪽 단어 수가
+    threshold를 넘으면 중복으로 판정합니다.
+    """
+
+    def __init__(self, titles=(), threshold=0.4):
+        self.threshold = threshold
+        self._titles = []
+        self._word_counts = []
+        self._postings = {}
+        for title in titles:
+            self.add(title)
+
+    def __len__(self):
+        return len(self._titles)
+
+    def __iter__(self):
+        return iter(self._titles)
+
+    def add(self, title, words=None):
+        words = _title_words(title) if words is None else words
+        idx = len(self._titles)
+        self._titles.append(title)
+        self._word_counts.append(len(words))
+        for w in words:
+            self._postings.setdefault(w, []).append(idx)
+
+    def match(self, title, words=None):
+        """근사 중복인 기존 제목의 삽입 순번. 없으면 None."""
+        words = _title_words(title) if words is None else words
+        if not words:
+            return None
+        overlaps = {}
+        for w in words:
+            for idx in self._postings.get(w, ()):
+                overlaps[idx] = overlaps.get(idx, 0) + 1
+        n = len(words)
+        for idx, overlap in overlaps.items():
+            if overlap / min(n, self._word_counts[idx]) > self.threshold:
+                return idx
+        return None
+
+    def is_duplicate(self, title, words=None):
+        return self.match(title, words) is not None
+
+
+_MERSENNE_PRIME = (1 << 61) - 1
+
+
+class MinHashLSHIndex:
+    """문자 shingle MinHash + LSH 근사 중복 인덱스 (NearDupIndex와 동일한 add/is_duplicate 인터페이스).
+
+    띄어쓰기·조사 변형이 잦은 한글 제목에 맞춰 공백 제거 후 문자 n-gram(shingle)을 사용합니다.
+    bands × rows 개의 해시로 서명을 만들고, 밴드 버킷이 하나라도 겹치는 후보만 비교하므로
+    삽입·조회가 전체 크기에 대해 sub-linear입니다. 후보는 서명 일치 비율(추정 Jaccard)과
+    shingle 개수로 "작은 쪽 대비 겹침 비율"을 추정해 threshold 초과 시 중복으로 판정합니다.
+    해시는 zlib.crc32 + 고정 seed로 계산하여 실행마다 결과가 동일합니다.
+    """
+
+    def __init__(self, titles=(), threshold=0.5, bands=32, rows=2, shingle_size=3, seed=20260301):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = rows
+        self.shingle_size = shingle_size
+        rng = random.Random(seed)
+        self._perms = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(bands * rows)
+        ]
+        self._titles = []
+        self._signatures = []
+        self._sizes = []
+        self._buckets = [{} for _ in range(bands)]
+        for title in titles:
+            self.add(title)
+
+    def __len__(self):
+        return len(self._titles)
+
+    def __iter__(self):
+        return iter(self._titles)
+
+    def _signature(self, title):
+        """(MinHash 서명, shingle 개수). 한글·영숫자가 없으면 (None, 0)."""
+        text = "".join(re.findall(r'[가-힣A-Za-z0-9]+', title)).lower()
+        if not text:
+            return None, 0
+        k = self.shingle_size
+        shingles = {text[i:i + k] for i in range(max(len(text) - k + 1, 1))}
+        hashes = [zlib.crc32(sh.encode("utf-8")) for sh in shingles]
+        sig = tuple(
+            min((a * h + b) % _MERSENNE_PRIME for h in hashes)
+            for a, b in self._perms
+        )
+        return sig, len(shingles)
+
+    def _band_keys(self, sig):
+        r = self.rows
+        return [sig[i * r:(i + 1) * r] for i in range(self.bands)]
+
+    def add(self, title, words=None):
+        sig, size = self._signature(title)
+        idx = len(self._titles)
+        self._titles.append(title)
+        self._signatures.append(sig)
+        self._sizes.append(size)
+        if sig is None:
+            return
+        for bucket, key in zip(self._buckets, self._band_keys(sig)):
+            bucket.setdefault(key, []).append(idx)
+
+    def is_duplicate(self, title, words=None):
+        sig, size = self._signature(title)
+        if sig is None:
+            return False
+        candidates = set()
+        for bucket, key in zip(self._buckets, self._band_keys(sig)):
+            candidates.update(bucket.get(key, ()))
+        n = len(sig)
+        for idx in candidates:
+            jaccard = sum(x == y for x, y in zip(sig, self._signatures[idx])) / n
+            other = self._sizes[idx]
+            # 추정 Jaccard → 추정 교집합 크기 → 작은 쪽 대비 겹침 비율 (정확 판정과 같은 척도)
+            overlap = jaccard * (size + other) / (1 + jaccard)
+            if overlap / min(size, other) > self.threshold:
+                return True
         return False
-    for seen_t in seen_titles:
-        seen_words = _title_words(seen_t)
-        if not seen_words:
-            continue
-        overlap = len(new_words & seen_words)
-        similarity = overlap / min(len(new_words), len(seen_words))
-        if similarity > threshold:
-            return True
-    return False
+
+
+def make_near_dup_index(titles=()):
+    """NEAR_DUP_BACKEND 환경변수에 따른 근사 중복 인덱스 생성.
+
+    exact(기본): NearDupIndex — 단어 겹침 40% 기준 정확 판정
+    minhash: MinHashLSHIndex — MINHASH_BANDS(32) / MINHASH_ROWS(2) / MINHASH_THRESHOLD(0.5) /
+             MINHASH_SHINGLE(3)로 조정, 대량 기사·수개월 이력 중복 제거용
+             (BOT_MODE=neardup_report로 아카이브 기준 정밀도·재현율 확인)
+    """
+    if os.environ.get('NEAR_DUP_BACKEND', 'exact').lower() == 'minhash':
+        return MinHashLSHIndex(
+            titles,
+            threshold=float(os.environ.get('MINHASH_THRESHOLD', '0.5')),
+            bands=int(os.environ.get('MINHASH_BANDS', '32')),
+            rows=int(os.environ.get('MINHASH_ROWS', '2')),
+            shingle_size=int(os.environ.get('MINHASH_SHINGLE', '3')),
+        )
+    return NearDupIndex(titles)
+
+
+def _archived_titles(report_dir="data/reports"):
+    """아카이브 리포트의 raw_articles 제목 (날짜순, 패널 순)."""
+    titles = []
+    for path in sorted(glob.glob(os.path.join(report_dir, "[0-9]*.json"))):
+        report = _read_json_file(path) or {}
+        for articles in (report.get("raw_articles") or {}).values():
+            titles.extend(a.get("title", "") for a in articles if a.get("title"))
+    return titles
+
+
+def near_dup_report(report_dir="data/reports", configs=None):
+    """MinHash/LSH 설정별 정밀도·재현율 리포트. 기준(정답)은 현행 정확 판정(NearDupIndex).
+
+    아카이브 제목을 순서대로 삽입하며 "이전 제목과 중복인가"를 두 방식으로 판정해 비교합니다.
+    configs: [{"bands", "rows", "threshold", "shingle_size"}, ...] — 생략 시 기본 그리드.
+    """
+    titles = _archived_titles(report_dir)
+    exact = NearDupIndex()
+    truth = []
+    for t in titles:
+        truth.append(exact.is_duplicate(t))
+        exact.add(t)
+
+    if configs is None:
+        configs = [
+            {"bands": b, "rows": r, "threshold": th, "shingle_size": k}
+            for b, r in ((32, 2), (20, 3), (16, 4))
+            for th in (0.4, 0.5, 0.6)
+            for k in (2, 3)
+        ]
+    results = []
+    for cfg in configs:
+        index = MinHashLSHIndex(**cfg)
+        tp = fp = fn = 0
+        t0 = time.perf_counter()
+        for t, expected in zip(titles, truth):
+            got = index.is_duplicate(t)
+            index.add(t)
+            tp += got and expected
+            fp += got and not expected
+            fn += expected and not got
+        results.append(dict(
+            cfg,
+            precision=round(tp / (tp + fp), 3) if tp + fp else None,
+            recall=round(tp / (tp + fn), 3) if tp + fn else None,
+            true_positive=tp, false_positive=fp, false_negative=fn,
+            ms_per_title=round(1000 * (time.perf_counter() - t0) / max(len(titles), 1), 3),
+        ))
+    return {"titles": len(titles), "exact_duplicates": sum(truth), "configs": results}
+
+
+# ============================================================
+# 1-A. HTTP 클라이언트 (호스트별 keep-alive 커넥션 풀)
+# ============================================================
+class _TimeoutHTTPAdapter(HTTPAdapter):
+    """timeout 미지정 요청에 기본 timeout을 적용하는 어댑터."""
+
+    def __init__(self, *args, timeout=30, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        return super().send(request, **kwargs)
+
+
+_http_session = None
+_http_session_lock = threading.Lock()
+
+
+def _record_http_metrics(res, *args, **kwargs):
+    """응답 훅: 호스트·상태별 요청 수, 지연, 송수신 바이트를 metrics에 기록.
+
+    스트리밍 응답은 본문을 여기서 읽지 않으며, 수신 바이트는 읽는 쪽(_read_gemini_stream)이 기록합니다.
+    """
+    host = urlparse(res.url).hostname or "unknown"
+    metrics.inc("http_requests", host=host, status=f"{res.status_code // 100}xx")
+    metrics.observe("http_request", res.elapsed.total_seconds(), host=host)
+    body = res.request.body if res.request is not None else None
+    if body:
+        metrics.inc("http_sent_bytes", len(body.encode("utf-8") if isinstance(body, str) else body), host=host)
+    if not kwargs.get("stream"):
+        metrics.inc("http_received_bytes", len(res.content or b""), host=host)
+    return res
+
+
+def http_session():
+    """Naver·RSS·Gemini 공용 requests.Session. 호스트별 커넥션 풀로 TCP+TLS 핸드셰이크 재사용.
+
+    HTTP_POOL_SIZE(호스트당 커넥션, 기본 10), HTTP_DEFAULT_TIMEOUT(초, 기본 30),
+    HTTP_CONNECT_RETRIES(연결 실패 재시도, 기본 2) 환경변수로 설정.
+    상태 코드(429/5xx) 재시도는 호출부에서 처리하므로 어댑터는 연결 오류만 재시도합니다.
+    모든 응답은 _record_http_metrics 훅으로 metrics에 집계됩니다.
+    """
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            pool_size = int(os.environ.get('HTTP_POOL_SIZE', '10'))
+            retries = int(os.environ.get('HTTP_CONNECT_RETRIES', '2'))
+            adapter = _TimeoutHTTPAdapter(
+                timeout=float(os.environ.get('HTTP_DEFAULT_TIMEOUT', '30')),
+                pool_connections=8,
+                pool_maxsize=pool_size,
+                max_retries=Retry(
+                    total=retries, connect=retries, read=0, status=0, other=0,
+                    backoff_factor=0.5, raise_on_status=False,
+                ),
+            )
+            session = requests.Session()
+            session.headers.update({'User-Agent': 'hr-newsletter-bot/1.0'})
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.hooks['response'].append(_record_http_metrics)
+            _http_session = session
+    return _http_session
+
+
+# ============================================================
+# 1-B. 로컬 캐시 디렉터리 (data/cache — CI에서는 actions/cache로 보존)
+# ============================================================
+CACHE_DIR = os.environ.get('BOT_CACHE_DIR', 'data/cache')
+
+
+def _read_json_file(path):
+    """JSON 파일 로드. 없거나 손상되었으면 None."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json_file(path, obj):
+    """임시 파일에 쓴 뒤 os.replace — 중단되어도 반쯤 쓰인 캐시가 남지 않음."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False, default=_json_default)
+    os.replace(tmp_path, path)
+
+
+class DiskCache:
+    """CACHE_DIR/<namespace>/ 아래 JSON 응답 캐시. TTL 만료 + 항목 수 상한(LRU) + 적중 카운터.
+
+    LRU 순서는 파일 mtime으로 관리합니다 (적중 시 touch, 초과분은 오래된 순서로 삭제).
+    """
+
+    def __init__(self, namespace, ttl_seconds, max_entries):
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def directory(self):
+        return os.path.join(CACHE_DIR, self.namespace)
+
+    def _path(self, key):
+        digest = hashlib.sha256(
+            json.dumps(key, ensure_ascii=False, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        return os.path.join(self.directory, digest + ".json")
+
+    def get(self, key, ignore_ttl=False):
+        """캐시 값 반환. 없거나 만료되었으면 None. ignore_ttl=True면 만료 무시 (오프라인 재생용)."""
+        path = self._path(key)
+        entry = _read_json_file(path)
+        fresh = entry is not None and (
+            ignore_ttl or time.time() - entry.get("stored_at", 0) <= self.ttl_seconds
+        )
+        with self._lock:
+            if not fresh:
+                self.misses += 1
+            else:
+                self.hits += 1
+        metrics.inc("cache_hits" if fresh else "cache_misses", cache=self.namespace)
+        if not fresh:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry.get("value")
+
+    def set(self, key, value):
+        try:
+            _write_json_file(self._path(key), {"stored_at": time.time(), "key": key, "value": value})
+            self._evict()
+        except OSError as e:
+            logger.debug(f"캐시 저장 실패 ({self.namespace}): {e}")
+
+    def _evict(self):
+        with self._lock:
+            try:
+                files = [e for e in os.scandir(self.directory) if e.name.endswith(".json")]
+            except OSError:
+                return
+            excess = len(files) - self.max_entries
+            if excess <= 0:
+                return
+            files.sort(key=lambda e: e.stat().st_mtime)
+            for entry in files[:excess]:
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+
+
+# ============================================================
+# 1-C. 적응형 토큰 버킷 (API 쿼터 공유 속도 제한)
+# ============================================================
+def parse_retry_after(value):
+    """Retry-After 헤더(초 또는 HTTP-date) → 대기 초. 해석 불가 시 None."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=datetime.timezone.utc)
+    return max((when - datetime.datetime.now(datetime.timezone.utc)).total_seconds(), 0.0)
+
+
+class RateLimiter:
+    """스레드 간 공유 토큰 버킷. 모든 호출은 acquire()로 토큰을 받은 뒤 나갑니다.
+
+    429 수신 시 on_throttle()이 Retry-After(없으면 지터 지수 백오프)만큼 전체 호출을 멈추고
+    초당 속도를 절반으로 낮춥니다. 이후 성공할 때마다 설정 속도까지 10%씩 회복합니다.
+    requests / throttle_events / wait_seconds 카운터로 동시성 튜닝 근거를 제공합니다.
+    """
+
+    def __init__(self, name, rate_per_sec, burst, min_rate=0.2, base_backoff=1.0, max_backoff=60.0,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.name = name
+        self.base_backoff = base_backoff
+        self.max_rate = float(rate_per_sec)
+        self.rate = float(rate_per_sec)
+        self.min_rate = min(float(min_rate), self.max_rate)
+        self.burst = max(float(burst), 1.0)
+        self.max_backoff = max_backoff
+        self.tokens = self.burst
+        self.requests = 0
+        self.throttle_events = 0
+        self.wait_seconds = 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """토큰 1개 획득까지 대기. 반환: 대기한 초."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    self.requests += 1
+                    self.wait_seconds += waited
+                    return waited
+                else:
+                    wait = (1 - self.tokens) / self.rate
+            self._sleep(wait)
+            waited += wait
+
+    def on_throttle(self, retry_after=None, attempt=0):
+        """429 처리: 전체 일시정지 + 속도 감소. 반환: 적용한 대기 초."""
+        if retry_after is None:
+            retry_after = min(self.base_backoff * 2.0 ** attempt, self.max_backoff) * random.uniform(0.5, 1.5)
+        delay = min(retry_after, self.max_backoff)
+        with self._lock:
+            self.throttle_events += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = 0.0
+            self._paused_until = max(self._paused_until, self._clock() + delay)
+        return delay
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate * 1.1)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "throttle_events": self.throttle_events,
+                "wait_seconds": round(self.wait_seconds, 2),
+                "rate_per_sec": round(self.rate, 2),
+            }
+
+
+# ============================================================
+# 1-D. 서킷 브레이커 (장애 API 호출 조기 차단)
+# ============================================================
+class CircuitBreaker:
+    """연속 실패가 failure_threshold회에 이르면 open — cooldown초 동안 allow()가 False.
+
+    cooldown이 지나면 half-open으로 1건만 시험 호출을 허용하고, 성공 시 closed, 실패 시 다시 open.
+    allow()는 closed면 True, half-open 시험권이면 "trial"을 반환합니다. 시험 호출이 판정 없이 끝나면
+    release_trial()로 반납해야 다음 시험이 가능합니다.
+    """
+
+    def __init__(self, name, failure_threshold=4, cooldown=300.0, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.cooldown = cooldown
+        self.failures = 0
+        self.trips = 0
+        self._state = "closed"
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == "open" and self._clock() - self._opened_at >= self.cooldown:
+                return "half_open"
+            return self._state
+
+    def allow(self):
+        with self._lock:
+            if self._state == "closed":
+                return True
+            if self._state == "open" and self._clock() - self._opened_at >= self.cooldown:
+                self._state = "half_open"
+                self._trial_in_flight = False
+            if self._state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return "trial"
+            return False
+
+    def release_trial(self):
+        with self._lock:
+            if self._state == "half_open":
+                self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._state = "closed"
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._state == "half_open" or self.failures >= self.failure_threshold:
+                if self._state != "open":
+                    self.trips += 1
+                    logger.warning(f"서킷 브레이커 open: {self.name} (연속 실패 {self.failures}회)")
+                self._state = "open"
+                self._opened_at = self._clock()
+                self._trial_in_flight = False
+
+    def stats(self):
+        return {"state": self.state, "failures": self.failures, "trips": self.trips}
+
+
+# ============================================================
+# 1-E. 스테이지 그래프 실행기 (독립 단계 동시 실행)
+# ============================================================
+class StageGraph:
+    """선언적 스테이지 DAG. 의존 노드가 끝난 노드부터 동시에 실행하고 노드별 소요 시간을 기록합니다.
+
+    add()의 func는 deps 노드 결과를 같은 이름의 키워드 인자로 받습니다. default가 주어진 노드는
+    예외·타임아웃 시 default를 결과로 쓰고 계속 진행하며, 그렇지 않은 노드의 예외는 그대로 전파됩니다.
+    타임아웃된 노드의 스레드는 강제 종료되지 않고 결과만 버려집니다.
+    checkpoint(EditionCheckpoint)가 주어지면 성공한 노드 결과를 저장하고, 재개 모드에서는 저장된
+    결과가 있는 노드를 실행하지 않습니다 (persist=False 노드 제외, restore로 JSON → 객체 복원).
+    persist는 결과를 받는 함수일 수도 있어 폴백·차단 같은 결과는 저장하지 않게 할 수 있고 (이때 이전
+    실행의 저장 결과는 삭제), 의존 노드 중 하나라도 다시 실행되면 그 뒤 노드도 다시 실행합니다.
+    profiler(StageProfiler)가 주어지면 각 노드 실행을 profiler.stage(이름)으로 감쌉니다.
+    """
+
+    _REQUIRED = object()
+
+    def __init__(self, name="run", max_workers=4, checkpoint=None, profiler=None):
+        self.name = name
+        self.max_workers = max_workers
+        self.checkpoint = checkpoint
+        self.profiler = profiler
+        self.timings = {}
+        self.errors = {}
+        self.restored = []
+        self._stages = {}
+        self._persist = {}
+
+    def add(self, name, func, deps=(), timeout=None, default=_REQUIRED, persist=True, restore=None):
+        self._stages[name] = (func, tuple(deps), timeout, default)
+        self._persist[name] = (persist, restore)
+        return self
+
+    def _restore(self, name):
+        persist, restore = self._persist[name]
+        if not (persist is not False and self.checkpoint is not None and self.checkpoint.has(name)):
+            return False, None
+        value = self.checkpoint.load(name)
+        return True, restore(value) if restore else value
+
+    def _should_persist(self, name, value):
+        persist = self._persist[name][0]
+        return persist(value) if callable(persist) else bool(persist)
+
+    def run(self):
+        """모든 노드 실행. 반환: {노드 이름: 결과}."""
+        for name, (_, deps, _, _) in self._stages.items():
+            missing = [d for d in deps if d not in self._stages]
+            if missing:
+                raise ValueError(f"스테이지 {name}: 알 수 없는 의존 {missing}")
+        pending = dict(self._stages)
+        results, running = {}, {}
+        pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=f"stage-{self.name}")
+        try:
+            while pending or running:
+                for name in [n for n, st in pending.items() if all(d in results for d in st[1])]:
+                    func, deps, timeout, _ = pending.pop(name)
+                    found, value = (
+                        self._restore(name) if all(d in self.restored for d in deps) else (False, None)
+                    )
+                    if found:
+                        results[name] = value
+                        self.timings[name] = 0.0
+                        self.restored.append(name)
+                        metrics.inc("stage_runs", graph=self.name, stage=name, outcome="restored")
+                        logger.info(f"  [stage] {name} 체크포인트 재사용")
+                        continue
+                    started = time.monotonic()
+                    future = pool.submit(self._invoke, name, func, {d: results[d] for d in deps})
+                    running[future] = (name, started, started + timeout if timeout else None)
+                if not running:
+                    if not pending:
+                        break
+                    if any(all(d in results for d in st[1]) for st in pending.values()):
+                        continue
+                    raise ValueError(f"스테이지 의존성 순환: {sorted(pending)}")
+                deadlines = [dl for _, _, dl in running.values() if dl is not None]
+                wait_for = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+                done, _ = wait(list(running), timeout=wait_for, return_when=FIRST_COMPLETED)
+                now = time.monotonic()
+                for future in list(running):
+                    name, started, deadline = running[future]
+                    if future in done:
+                        del running[future]
+                        self.timings[name] = round(now - started, 2)
+                        metrics.observe("stage", now - started, graph=self.name, stage=name)
+                        try:
+                            results[name] = future.result()
+                        except Exception as e:
+                            metrics.inc("stage_runs", graph=self.name, stage=name, outcome="failed")
+                            self._discard(name)
+                            results[name] = self._failed(name, e)
+                        else:
+                            metrics.inc("stage_runs", graph=self.name, stage=name, outcome="ok")
+                            if self.checkpoint is not None and self._should_persist(name, results[name]):
+                                self.checkpoint.save(name, results[name])
+                            else:
+                                self._discard(name)
+                        logger.info(f"  [stage] {name} 완료 {self.timings[name]:.1f}s")
+                    elif deadline is not None and now >= deadline:
+                        del running[future]
+                        self.timings[name] = round(now - started, 2)
+                        metrics.observe("stage", now - started, graph=self.name, stage=name)
+                        metrics.inc("stage_runs", graph=self.name, stage=name, outcome="timeout")
+                        self._discard(name)
+                        results[name] = self._failed(name, TimeoutError(f"{self.timings[name]:.0f}s 초과"))
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+        return results
+
+    def _discard(self, name):
+        # 실행했지만 저장하지 않는 결과 — 이전 실행의 체크포인트가 재개 시 섞이지 않도록 삭제
+        if self.checkpoint is not None:
+            self.checkpoint.discard(name)
+
+    def _invoke(self, name, func, kwargs):
+        if self.profiler is None:
+            return func(**kwargs)
+        with self.profiler.stage(name):
+            return func(**kwargs)
+
+    def _failed(self, name, error):
+        default = self._stages[name][3]
+        if default is self._REQUIRED:
+            raise error
+        logger.error(f"  [stage] {name} 실패 → 기본값으로 계속: {error}")
+        self.errors[name] = str(error)
+        return default
+
+    def summary(self):
+        return ", ".join(f"{name} {sec:.1f}s" for name, sec in self.timings.items())
+
+
+# ============================================================
+# 1-F. 실행 메트릭 레지스트리 (JSON + Prometheus textfile)
+# ============================================================
+METRICS_DIR = os.environ.get('BOT_METRICS_DIR', 'data/reports/metrics')
+
+
+class MetricsRegistry:
+    """실행 1회분 메트릭 (스레드 안전). 이름 + 라벨 조합별로 집계합니다.
+
+    inc(): 누적 카운터 (요청 수, 바이트, 재시도, 캐시 적중 등)
+    observe(): 소요 시간(초) — 횟수·합계·최대
+    gauge(): 마지막 값 (수집 건수, 필터율 등 실행 결과)
+    write()는 METRICS_DIR/<날짜>.json과 node_exporter textfile collector 형식의 <날짜>.prom을 기록합니다.
+    """
+
+    PREFIX = "hr_brief"
+
+    def __init__(self):
+        self._counters = {}
+        self._durations = {}
+        self._gauges = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            count, total, peak = self._durations.get(key, (0, 0.0, 0.0))
+            self._durations[key] = (count + 1, total + seconds, max(peak, seconds))
+
+    def gauge(self, name, value, **labels):
+        with self._lock:
+            self._gauges[self._key(name, labels)] = value
+
+    @contextlib.contextmanager
+    def timer(self, name, **labels):
+        """with metrics.timer("x", ...): 블록 소요 시간을 observe (예외 시에도 기록)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._durations.clear()
+            self._gauges.clear()
+
+    def snapshot(self):
+        """{"counters": [...], "durations": [...], "gauges": [...]} — 각 항목은 name/labels/값."""
+        with self._lock:
+            return {
+                "counters": [
+                    {"name": n, "labels": dict(l), "value": v} for (n, l), v in sorted(self._counters.items())
+                ],
+                "durations": [
+                    {"name": n, "labels": dict(l), "count": c, "sum_seconds": round(t, 3), "max_seconds": round(m, 3)}
+                    for (n, l), (c, t, m) in sorted(self._durations.items())
+                ],
+                "gauges": [
+                    {"name": n, "labels": dict(l), "value": v} for (n, l), v in sorted(self._gauges.items())
+                ],
+            }
+
+    @staticmethod
+    def _prom_labels(labels):
+        if not labels:
+            return ""
+        def _escape(value):
+            return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+        return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in sorted(labels.items())) + "}"
+
+    def to_prometheus(self, extra_labels=None):
+        """Prometheus text exposition 형식. 카운터 *_total, 소요 시간 *_seconds(summary) + *_seconds_max."""
+        snap = self.snapshot()
+        extra = extra_labels or {}
+        lines, typed = [], set()
+
+        def _emit(metric, kind, labels, value):
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} {kind}")
+                typed.add(metric)
+            lines.append(f"{metric}{self._prom_labels({**extra, **labels})} {value}")
+
+        for c in snap["counters"]:
+            _emit(f"{self.PREFIX}_{c['name']}_total", "counter", c["labels"], c["value"])
+        for d in snap["durations"]:
+            base = f"{self.PREFIX}_{d['name']}_seconds"
+            if base not in typed:
+                lines.append(f"# TYPE {base} summary")
+                typed.add(base)
+            lines.append(f"{base}_count{self._prom_labels({**extra, **d['labels']})} {d['count']}")
+            lines.append(f"{base}_sum{self._prom_labels({**extra, **d['labels']})} {d['sum_seconds']}")
+            _emit(f"{base}_max", "gauge", d["labels"], d["max_seconds"])
+        for g in snap["gauges"]:
+            value = g["value"]
+            if isinstance(value, bool):
+                value = int(value)
+            if isinstance(value, (int, float)):
+                _emit(f"{self.PREFIX}_{g['name']}", "gauge", g["labels"], value)
+        return "\n".join(lines) + "\n"
+
+    def write(self, run_date, base_dir=None, **meta):
+        """METRICS_DIR/<run_date>.json + .prom 기록. 반환: (json 경로, prom 경로) 또는 실패 시 None."""
+        base_dir = base_dir or METRICS_DIR
+        json_path = os.path.join(base_dir, f"{run_date}.json")
+        prom_path = os.path.join(base_dir, f"{run_date}.prom")
+        try:
+            _write_json_file(json_path, {
+                "date": run_date,
+                "written_at": datetime.datetime.now(KST).isoformat(),
+                **meta,
+                **self.snapshot(),
+            })
+            prom = self.to_prometheus({"edition": run_date})
+            tmp_path = f"{prom_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(prom)
+            os.replace(tmp_path, prom_path)
+        except OSError as e:
+            logger.error(f"메트릭 저장 실패: {e}")
+            return None
+        logger.info(f"메트릭 저장 완료: {json_path}, {prom_path}")
+        return json_path, prom_path
+
+
+metrics = MetricsRegistry()
+
+
+def _metric_label(value):
+    """에러 문자열을 레이블 값으로 정규화 — 식별자 형태([A-Za-z0-9_]{1,40})가 아니면 "error"."""
+    return value if value and re.fullmatch(r'[A-Za-z0-9_]{1,40}', value) else "error"
+
+
+# ============================================================
+# 1-G. 단계별 프로파일러 (BOT_PROFILE=cpu|mem)
+# ============================================================
+PROFILE_DIR = os.environ.get('BOT_PROFILE_DIR', 'data/reports/profiles')
+
+
+class StageProfiler:
+    """StageGraph 노드별 CPU·메모리 프로파일. 산출물은 <directory>/<stage>.* 로 기록합니다.
+
+    cpu: 노드 스레드에서 cProfile 실행 → <stage>.pstats + 누적 시간 상위 함수 <stage>.cpu.txt.
+         노드가 띄운 하위 스레드(네트워크 워커 등)는 포함되지 않습니다.
+    mem: tracemalloc 스냅샷을 노드 전후로 비교한 상위 할당 위치 → <stage>.mem.txt.
+         tracemalloc은 프로세스 전체를 추적하므로 동시에 실행된 노드의 할당이 섞일 수 있습니다.
+    """
+
+    MODES = ("cpu", "mem")
+
+    def __init__(self, mode, directory, top=25):
+        if mode not in self.MODES:
+            raise ValueError(f"알 수 없는 프로파일 모드: {mode}")
+        self.mode = mode
+        self.directory = directory
+        self.top = top
+        self.artifacts = []
+        self._lock = threading.Lock()
+        self._owns_tracemalloc = False
+        if mode == "mem" and not tracemalloc.is_tracing():
+            tracemalloc.start(int(os.environ.get('BOT_PROFILE_FRAMES', '10')))
+            self._owns_tracemalloc = True
+
+    @classmethod
+    def from_env(cls, run_date, base_dir=None):
+        """BOT_PROFILE(cpu|mem) 설정 시 PROFILE_DIR/<run_date>/에 기록하는 프로파일러, 아니면 None."""
+        mode = os.environ.get('BOT_PROFILE', '').strip().lower()
+        if mode in ('', '0', 'off', 'false', 'no'):
+            return None
+        if mode not in cls.MODES:
+            logger.warning(f"BOT_PROFILE={mode} 무시 — cpu 또는 mem만 지원")
+            return None
+        directory = os.path.join(base_dir or PROFILE_DIR, run_date)
+        logger.info(f"프로파일링 활성화: {mode} → {directory}")
+        return cls(mode, directory, top=int(os.environ.get('BOT_PROFILE_TOP', '25')))
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        if self.mode == "cpu":
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError as e:  # Python 3.12+: 다른 노드의 프로파일러가 이미 활성
+                logger.warning(f"CPU 프로파일 생략 ({name}): {e}")
+                profile = None
+            try:
+                yield
+            finally:
+                if profile is not None:
+                    profile.disable()
+                    self._write(name, "pstats", profile)
+        else:
+            before = tracemalloc.take_snapshot()
+            try:
+                yield
+            finally:
+                self._write(name, "mem.txt", (before, tracemalloc.take_snapshot()))
+
+    def _write(self, name, suffix, data):
+        path = os.path.join(self.directory, f"{name}.{suffix}")
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            if suffix == "pstats":
+                data.dump_stats(path)
+                buf = io.StringIO()
+                pstats.Stats(data, stream=buf).sort_stats("cumulative").print_stats(self.top)
+                with open(os.path.join(self.directory, f"{name}.cpu.txt"), "w", encoding="utf-8") as f:
+                    f.write(buf.getvalue())
+            else:
+                before, after = data
+                ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+                diff = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), "lineno")
+                current, peak = tracemalloc.get_traced_memory()
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(f"# {name}: traced current={current / 1024:.1f} KiB, peak={peak / 1024:.1f} KiB\n")
+                    for stat in diff[:self.top]:
+                        f.write(f"{stat}\n")
+        except OSError as e:
+            logger.error(f"프로파일 저장 실패 ({name}): {e}")
+            return
+        with self._lock:
+            self.artifacts.append(path)
+
+    def close(self):
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+            self._owns_tracemalloc = False
+        if self.artifacts:
+            logger.info(f"프로파일 {len(self.artifacts)}건 저장: {self.directory}")
 
 
 # ============================================================
 # 2. Gemini API 호출 (재시도 + 튜플 반환)
 # ============================================================
-def call_gemini(api_key, prompt, max_retries=3):
-    """Gemini API 호출. 성공 시 (텍스트, None), 실패 시 (None, 에러유형)."""
-    model = os.environ.get('GEMINI_DEEP_MODEL', 'gemini-2.0-flash')
-    api_url = (
-        f"https://generativelanguage.googleapis.com/v1beta/models/"
-        f"{model}:generateContent?key={api_key}"
-    )
+# 분당 요청 예산(GEMINI_RPM, 기본 10) 공유 토큰 버킷. 고정 sleep 대신 429 발생 시에만 백오프.
+gemini_rate_limiter = RateLimiter(
+    "gemini",
+    rate_per_sec=float(os.environ.get('GEMINI_RPM', '10')) / 60.0,
+    burst=float(os.environ.get('GEMINI_BURST', '5')),
+    min_rate=1 / 60.0,
+    base_backoff=15.0,
+    max_backoff=120.0,
+)
+
+
+_gemini_breakers = {}
+_gemini_breakers_lock = threading.Lock()
+_gemini_run_deadline = None
+
+
+def gemini_breaker(model):
+    """모델별 실행 범위 서킷 브레이커 (GEMINI_BREAKER_THRESHOLD 기본 4, GEMINI_BREAKER_COOLDOWN 기본 300초)."""
+    with _gemini_breakers_lock:
+        breaker = _gemini_breakers.get(model)
+        if breaker is None:
+            breaker = _gemini_breakers[model] = CircuitBreaker(
+                f"gemini:{model}",
+                failure_threshold=int(os.environ.get('GEMINI_BREAKER_THRESHOLD', '4')),
+                cooldown=float(os.environ.get('GEMINI_BREAKER_COOLDOWN', '300')),
+            )
+        return breaker
+
+
+def reset_gemini_run():
+    """실행 시작 시 호출: 브레이커 초기화 + 전체 Gemini 시간 예산(GEMINI_RUN_BUDGET, 기본 900초) 설정."""
+    global _gemini_run_deadline
+    with _gemini_breakers_lock:
+        _gemini_breakers.clear()
+    _gemini_run_deadline = time.monotonic() + float(os.environ.get('GEMINI_RUN_BUDGET', '900'))
+
+
+def _gemini_model_chain():
+    """시도 순서대로의 모델 목록. GEMINI_MODEL_CHAIN(쉼표 구분) 또는 DEEP → FALLBACK 모델."""
+    chain = os.environ.get('GEMINI_MODEL_CHAIN', '')
+    models = [m.strip() for m in chain.split(',') if m.strip()] or [
+        os.environ.get('GEMINI_DEEP_MODEL', 'gemini-2.0-flash'),
+        os.environ.get('GEMINI_FALLBACK_MODEL', 'gemini-2.0-flash-lite'),
+    ]
+    return list(dict.fromkeys(models))
+
+
+def _gemini_retry_delay(res):
+    """429 응답의 재시도 대기 초. Retry-After 헤더 → error.details[].retryDelay("37s") 순."""
+    delay = parse_retry_after(res.headers.get('Retry-After'))
+    if delay is not None:
+        return delay
+    try:
+        for detail in res.json().get('error', {}).get('details', []):
+            value = detail.get('retryDelay')
+            if value:
+                return float(str(value).rstrip('s'))
+    except (ValueError, AttributeError, TypeError):
+        pass
+    return None
+
+
+# 응답 캐시: (모델, generationConfig, 프롬프트 SHA-256) → 응답 텍스트. GEMINI_CACHE=off로 우회.
+gemini_cache = DiskCache(
+    "gemini",
+    ttl_seconds=int(os.environ.get('GEMINI_CACHE_TTL', str(6 * 24 * 3600))),
+    max_entries=int(os.environ.get('GEMINI_CACHE_MAX_ENTRIES', '500')),
+)
+
+
+def _gemini_cache_enabled():
+    return os.environ.get('GEMINI_CACHE', 'on').lower() not in ('0', 'off', 'false', 'no')
+
+
+def _gemini_cache_key(model, generation_config, prompt):
+    """응답 캐시 키: (모델, 요청 generationConfig, 접두부 포함 프롬프트 해시)."""
+    return [model, generation_config, hashlib.sha256(prompt.encode("utf-8")).hexdigest()]
+
+
+def estimate_tokens(text):
+    """Gemini 토큰 수 근사치: 한글 1자 ≈ 1토큰, 그 외 문자 4자 ≈ 1토큰."""
+    hangul = sum(1 for ch in text if '\uac00' <= ch <= '\ud7a3')
+    return hangul + (len(text) - hangul + 3) // 4
+
+
+class GeminiContextCache:
+    """공통 프롬프트 접두부(역할·COMPANY_CONTEXT·규칙·스키마)의 Gemini cachedContents 관리.
+
+    (모델, 접두부 해시)당 1개를 실행 중 생성·재사용하며 TTL(GEMINI_CONTEXT_CACHE_TTL, 기본 900초)이
+    실행 시간을 덮습니다. 접두부가 모델 최소 캐시 크기(GEMINI_CONTEXT_CACHE_MIN_TOKENS, 기본 1024)보다
+    작거나 생성이 실패하면 해당 키를 unavailable로 기억하고 None을 반환합니다 (호출자는 인라인 프롬프트 사용).
+    """
+
+    API_URL = "https://generativelanguage.googleapis.com/v1beta/cachedContents"
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def enabled():
+        return os.environ.get('GEMINI_CONTEXT_CACHE', 'on').lower() not in ('0', 'off', 'false', 'no')
+
+    def get(self, api_key, model, prefix):
+        """cachedContents 이름 또는 None."""
+        key = (model, hashlib.sha256(prefix.encode("utf-8")).hexdigest())
+        ttl = int(os.environ.get('GEMINI_CONTEXT_CACHE_TTL', '900'))
+        with self._lock:
+            if key in self._entries:
+                name, expires_at = self._entries[key]
+                if name is None or time.monotonic() < expires_at - 30:
+                    return name
+            min_tokens = int(os.environ.get('GEMINI_CONTEXT_CACHE_MIN_TOKENS', '1024'))
+            if estimate_tokens(prefix) < min_tokens:
+                logger.info(f"컨텍스트 캐시 생략: 접두부 약 {estimate_tokens(prefix)}토큰 < {min_tokens} — 인라인 프롬프트 사용")
+                self._entries[key] = (None, 0)
+                return None
+            name = self._create(api_key, model, prefix, ttl)
+            self._entries[key] = (name, time.monotonic() + ttl)
+            return name
+
+    def _create(self, api_key, model, prefix, ttl):
+        try:
+            gemini_rate_limiter.acquire()
+            res = http_session().post(
+                f"{self.API_URL}?key={api_key}",
+                headers={'Content-Type': 'application/json'},
+                data=json.dumps({
+                    "model": f"models/{model}",
+                    "displayName": f"newsletter-{_profile_key}",
+                    "contents": [{"role": "user", "parts": [{"text": prefix}]}],
+                    "ttl": f"{ttl}s",
+                }),
+                timeout=30,
+            )
+            name = res.json().get('name') if res.status_code == 200 else None
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.warning(f"컨텍스트 캐시 생성 오류 — 인라인 프롬프트 사용: {e}")
+            return None
+        if not isinstance(name, str):
+            logger.warning(f"컨텍스트 캐시 생성 실패 (HTTP {res.status_code}) — 인라인 프롬프트 사용")
+            return None
+        logger.info(f"컨텍스트 캐시 생성: {name} ({model}, TTL {ttl}s)")
+        return name
+
+    def invalidate(self, name):
+        with self._lock:
+            for key, (cached, _) in list(self._entries.items()):
+                if cached == name:
+                    self._entries[key] = (None, 0)
+
+    def release(self, api_key):
+        """실행 종료 시 생성한 캐시를 삭제 (실패해도 TTL로 자동 만료)."""
+        with self._lock:
+            names = [name for name, _ in self._entries.values() if name]
+            self._entries.clear()
+        for name in names:
+            try:
+                http_session().delete(
+                    f"https://generativelanguage.googleapis.com/v1beta/{name}?key={api_key}", timeout=10
+                )
+            except requests.exceptions.RequestException:
+                pass
+
+
+gemini_context_cache = GeminiContextCache()
+
+
+def _gemini_stream_enabled():
+    return os.environ.get('GEMINI_STREAM', 'off').lower() in ('1', 'true', 'on', 'yes')
+
+
+def _read_gemini_stream(res, on_article=None, usage=None):
+    """streamGenerateContent(SSE) 응답을 읽으며 완성된 article을 on_article로 즉시 전달.
+
+    반환: (전체 텍스트, None) 또는 (None, 에러유형). 출력이 명백히 깨지면 스트림을 끊고
+    "malformed_output"을 반환합니다. usage dict가 주어지면 마지막 usageMetadata로 갱신합니다.
+    """
+    parser = IncrementalArticlesParser()
+    parts, block_reason, received = [], '', 0
+    res.encoding = 'utf-8'
+    try:
+        for line in res.iter_lines(decode_unicode=True):
+            if not line:
+                continue
+            received += len(line.encode("utf-8")) + 1
+            if not line.startswith('data:'):
+                continue
+            chunk = json.loads(line[5:])
+            block_reason = chunk.get('promptFeedback', {}).get('blockReason', '') or block_reason
+            if usage is not None and chunk.get('usageMetadata'):
+                usage.update(chunk['usageMetadata'])
+            for cand in chunk.get('candidates') or []:
+                for part in cand.get('content', {}).get('parts', []):
+                    text = part.get('text', '')
+                    parts.append(text)
+                    for article in parser.feed(text):
+                        if on_article is not None:
+                            on_article(article)
+            if parser.malformed:
+                logger.error(f"Gemini 스트림 출력 형식 오류 — 조기 중단 (앞 300자: {parser.text[:300]})")
+                return None, "malformed_output"
+    finally:
+        res.close()
+        metrics.inc("http_received_bytes", received, host="generativelanguage.googleapis.com")
+    if block_reason:
+        return None, f"blocked_{block_reason}"
+    if not parts:
+        return None, "no_candidates"
+    return "".join(parts), None
+
+
+def _structured_output_enabled():
+    """response_schema를 responseMimeType/responseSchema로 요청할지 (GEMINI_STRUCTURED_OUTPUT=off로 끔)."""
+    return os.environ.get('GEMINI_STRUCTURED_OUTPUT', 'on').lower() not in ('0', 'false', 'off', 'no')
+
+
+def call_gemini(api_key, prompt, max_retries=3, max_output_tokens=4096, on_article=None,
+                response_schema=None, cache_prefix=None, usage=None, validate=None):
+    """Gemini API 호출. 성공 시 (텍스트, None), 실패 시 (None, 에러유형).
+
+    on_article: 스트리밍(GEMINI_STREAM) 시 완성된 article dict마다 호출. response_schema: 구조화 출력 스키마.
+    cache_prefix: 컨텍스트 캐시로 보낼 공통 접두부. usage: usageMetadata를 채울 dict.
+    validate(text): 응답 캐시에 저장·재사용할 조건 (기본: JSON 추출 가능).
+    에러유형: "rate_limit", "timeout", "circuit_open", "budget_exhausted", "http_<코드>", "malformed_output" 등.
+    """
+    started = time.perf_counter()
+    text, err = _call_gemini(api_key, prompt, max_retries, max_output_tokens, on_article,
+                             response_schema, cache_prefix, usage, validate or _is_json_response)
+    metrics.observe("gemini_call", time.perf_counter() - started)
+    outcome = "ok" if err is None else _metric_label(err)
+    metrics.inc("gemini_calls", outcome=outcome)
+    return text, err
+
+
+def _is_json_response(text):
+    return extract_json_from_text(text) is not None
+
+
+def _call_gemini(api_key, prompt, max_retries, max_output_tokens, on_article,
+                 response_schema, cache_prefix, usage, validate):
+    """call_gemini 본체 (모델 체인 순회·재시도).
+
+    시도는 _gemini_model_chain() 순서이며 타임아웃·브레이커 open 시 대기 없이 다음 모델로 넘어갑니다.
+    호출 1건은 GEMINI_CALL_BUDGET(기본 300초)과 reset_gemini_run()의 실행 예산 중 이른 시점까지만 재시도합니다.
+    429는 gemini_rate_limiter가 Retry-After만큼 전체 호출을 늦추고, 스키마 거부(400)는 스키마 없이 재시도합니다.
+    """
+    chain = _gemini_model_chain()
+    stream = _gemini_stream_enabled()
+    method = "streamGenerateContent?alt=sse&" if stream else "generateContent?"
+    generation_config = {
+        "temperature": 0.2,
+        "maxOutputTokens": max_output_tokens
+    }
+    if response_schema is not None and _structured_output_enabled():
+        generation_config.update({
+            "responseMimeType": "application/json",
+            "responseSchema": response_schema,
+        })
+    full_prompt = f"{cache_prefix}\n\n{prompt}" if cache_prefix else prompt
+    # 캐시 키는 요청 원본 설정 기준 — 스키마 거부(400)로 generation_config가 바뀌어도 다음 실행과 같은 키
+    cache_config = dict(generation_config)
+    if _gemini_cache_enabled():
+        for model in chain:
+            cached = gemini_cache.get(_gemini_cache_key(model, cache_config, full_prompt))
+            if cached is not None and validate(cached):
+                logger.info(f"Gemini 캐시 적중 ({model})")
+                if on_article is not None:
+                    for article in IncrementalArticlesParser().feed(cached):
+                        on_article(article)
+                return cached, None
+
+    deadline = time.monotonic() + float(os.environ.get('GEMINI_CALL_BUDGET', '300'))
+    if _gemini_run_deadline is not None:
+        deadline = min(deadline, _gemini_run_deadline)
+
+    def _pause(seconds):
+        time.sleep(max(0.0, min(seconds, deadline - time.monotonic())))
+
+    def _all_open():
+        return all(gemini_breaker(m).state == "open" for m in chain[model_idx:])
+
+    model_idx = 0
+    context_models = {}
     last_error = "unknown"
     for attempt in range(max_retries):
+        if attempt:
+            metrics.inc("retries", api="gemini", reason=_metric_label(last_error))
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            logger.error(f"Gemini 호출 시간 예산 소진 (시도 {attempt + 1})")
+            return None, "budget_exhausted"
+        permit = False
+        while model_idx < len(chain):
+            permit = gemini_breaker(chain[model_idx]).allow()
+            if permit:
+                break
+            logger.warning(f"Gemini 브레이커 open — {chain[model_idx]} 건너뜀")
+            model_idx += 1
+        if not permit:
+            return None, "circuit_open"
+        model = chain[model_idx]
+        breaker = gemini_breaker(model)
+        has_next = model_idx + 1 < len(chain)
+        api_url = (
+            f"https://generativelanguage.googleapis.com/v1beta/models/"
+            f"{model}:{method}key={api_key}"
+        )
+        cache_key = _gemini_cache_key(model, cache_config, full_prompt)
         try:
-            res = requests.post(
+            if model not in context_models:
+                context_models[model] = (
+                    gemini_context_cache.get(api_key, model, cache_prefix)
+                    if cache_prefix and gemini_context_cache.enabled() else None
+                )
+            cached_content = context_models[model]
+            payload = {
+                "contents": [{"parts": [{"text": prompt if cached_content else full_prompt}]}],
+                "generationConfig": generation_config,
+            }
+            if cached_content:
+                payload["cachedContent"] = cached_content
+            metrics.inc("gemini_attempts", model=model)
+            gemini_rate_limiter.acquire()
+            res = http_session().post(
                 api_url,
                 headers={'Content-Type': 'application/json'},
-                data=json.dumps({
-                    "contents": [{"parts": [{"text": prompt}]}],
-                    "generationConfig": {
-                        "temperature": 0.2,
-                        "maxOutputTokens": 4096
-                    }
-                }),
-                timeout=120
+                data=json.dumps(payload),
+                timeout=min(120, remaining),
+                stream=stream,
             )
             if res.status_code == 429:
-                wait = 30 * (attempt + 1)
-                logger.warning(f"Gemini 429 rate limit (시도 {attempt + 1}), {wait}초 대기...")
-                time.sleep(wait)
+                # 쿼터 초과는 모델 장애가 아니므로 브레이커가 아닌 gemini_rate_limiter에서만 처리
+                retry_after = _gemini_retry_delay(res)
+                wait = gemini_rate_limiter.on_throttle(retry_after, attempt)
                 last_error = "rate_limit"
+                if wait >= deadline - time.monotonic():
+                    logger.error(f"Gemini 429 ({model}) — 재시도 대기 {wait:.0f}초가 남은 예산 초과, 중단")
+                    return None, last_error
+                logger.warning(f"Gemini 429 rate limit ({model}, 시도 {attempt + 1}), {wait:.0f}초 후 재시도...")
+                continue
+            if res.status_code in (400, 403, 404) and cached_content:
+                logger.warning(f"컨텍스트 캐시 사용 실패 (HTTP {res.status_code}) — 인라인 프롬프트로 재시도")
+                gemini_context_cache.invalidate(cached_content)
+                context_models[model] = None
+                continue
+            if res.status_code == 400 and "responseSchema" in generation_config:
+                logger.warning(f"Gemini 구조화 출력 거부 — 스키마 없이 재시도: {res.text[:200]}")
+                del generation_config["responseMimeType"], generation_config["responseSchema"]
                 continue
             if res.status_code != 200:
-                logger.error(f"Gemini HTTP {res.status_code} (시도 {attempt + 1}): {res.text[:300]}")
+                logger.error(f"Gemini HTTP {res.status_code} ({model}, 시도 {attempt + 1}): {res.text[:300]}")
                 last_error = f"http_{res.status_code}"
-                time.sleep(5 * (attempt + 1))
+                if res.status_code >= 500:
+                    breaker.record_failure()
+                    if _all_open():
+                        return None, "circuit_open"
+                _pause(5 * (attempt + 1))
                 continue
+            if stream:
+                text, err = _read_gemini_stream(res, on_article, usage)
+                if err == "malformed_output":
+                    breaker.record_success()
+                    return None, err
+                if err:
+                    logger.warning(f"Gemini 스트림 실패 ({model}, 시도 {attempt + 1}): {err}")
+                    last_error = err
+                    _pause(5)
+                    continue
+                breaker.record_success()
+                gemini_rate_limiter.on_success()
+                if _gemini_cache_enabled() and validate(text):
+                    gemini_cache.set(cache_key, text)
+                return text, None
             try:
                 body = res.json()
             except json.JSONDecodeError as e:
                 logger.error(f"Gemini JSON 파싱 실패 (시도 {attempt + 1}): {e}")
                 last_error = "json_decode_error"
-                time.sleep(5 * (attempt + 1))
+                _pause(5 * (attempt + 1))
                 continue
             candidates = body.get('candidates')
             if not candidates:
@@ -147,16 +1549,38 @@ def call_gemini(api_key, prompt, max_retries=3):
                 else:
                     logger.warning(f"Gemini candidates 없음 (시도 {attempt + 1})")
                     last_error = "no_candidates"
-                time.sleep(5)
+                _pause(5)
                 continue
-            return candidates[0]['content']['parts'][0]['text'], None
+            breaker.record_success()
+            gemini_rate_limiter.on_success()
+            if usage is not None:
+                usage.update(body.get('usageMetadata') or {})
+            text = candidates[0]['content']['parts'][0]['text']
+            if _gemini_cache_enabled() and validate(text):
+                gemini_cache.set(cache_key, text)
+            return text, None
         except requests.exceptions.Timeout:
-            logger.error(f"Gemini 타임아웃 (시도 {attempt + 1})")
+            breaker.record_failure()
             last_error = "timeout"
+            if has_next:
+                logger.error(f"Gemini 타임아웃 ({model}, 시도 {attempt + 1}) — {chain[model_idx + 1]}로 전환")
+                model_idx += 1
+                continue
+            logger.error(f"Gemini 타임아웃 ({model}, 시도 {attempt + 1})")
+        except requests.exceptions.RequestException as e:
+            breaker.record_failure()
+            logger.error(f"Gemini 연결 오류 ({model}, 시도 {attempt + 1}): {e}")
+            last_error = "connection_error"
         except Exception as e:
             logger.error(f"Gemini 오류 (시도 {attempt + 1}): {e}")
             last_error = str(e)
-        time.sleep(5 * (attempt + 1))
+        finally:
+            # 성공·실패 판정 없이 끝난 시도(4xx, 파싱 오류, 스키마/캐시 재시도 등)도 half-open 시험권 반납
+            if permit == "trial":
+                breaker.release_trial()
+        if _all_open():
+            return None, "circuit_open"
+        _pause(5 * (attempt + 1))
     return None, last_error
 
 
@@ -314,6 +1738,81 @@ _REPORT_SCHEMA = (
 )
 
 
+def _schema_from_example(example):
+    """프롬프트용 예시 JSON에서 Gemini responseSchema 도출.
+
+    "High|Medium|Low"처럼 영문 토큰을 |로 나열한 문자열은 enum, 객체의 모든 키는 required로
+    둡니다 (propertyOrdering으로 예시와 같은 출력 순서 유지).
+    """
+    if isinstance(example, dict):
+        return {
+            "type": "OBJECT",
+            "properties": {k: _schema_from_example(v) for k, v in example.items()},
+            "required": list(example),
+            "propertyOrdering": list(example),
+        }
+    if isinstance(example, list):
+        return {"type": "ARRAY", "items": _schema_from_example(example[0] if example else "")}
+    if isinstance(example, bool):
+        return {"type": "BOOLEAN"}
+    if isinstance(example, int):
+        return {"type": "INTEGER"}
+    if isinstance(example, float):
+        return {"type": "NUMBER"}
+    options = example.split('|')
+    if len(options) > 1 and all(re.fullmatch(r'[A-Za-z]+', o) for o in options):
+        return {"type": "STRING", "enum": options}
+    return {"type": "STRING"}
+
+
+ARTICLES_RESPONSE_SCHEMA = _schema_from_example({"articles": [json.loads(_ARTICLE_SCHEMA)]})
+REPORT_RESPONSE_SCHEMA = _schema_from_example({"report": json.loads(_REPORT_SCHEMA)})
+
+
+def conform_to_schema(value, schema):
+    """응답 값을 스키마에 맞춰 1회 순회로 보정. 보정 불가하면 None.
+
+    재요청 없이 로컬에서 고치는 경미한 오류: 숫자 문자열 → INTEGER("2", "2.0"), 숫자 → STRING,
+    enum 대소문자·설명 접미("high", "High(즉각 대응)"), 단일 값 → 1원소 ARRAY.
+    보정할 수 없는 속성은 버리고, 스키마에 없는 속성과 매칭되지 않는 enum 값은 그대로 둡니다.
+    """
+    kind = schema.get("type")
+    if kind == "OBJECT":
+        if not isinstance(value, dict):
+            return None
+        out = dict(value)
+        for key, sub in schema.get("properties", {}).items():
+            if key in out:
+                fixed = conform_to_schema(out[key], sub)
+                if fixed is None:
+                    del out[key]
+                else:
+                    out[key] = fixed
+        return out
+    if kind == "ARRAY":
+        items = value if isinstance(value, list) else [value]
+        fixed = [conform_to_schema(v, schema["items"]) for v in items]
+        return [v for v in fixed if v is not None]
+    if kind == "INTEGER":
+        if isinstance(value, bool):
+            return None
+        if isinstance(value, (int, float)) and value == int(value):
+            return int(value)
+        if isinstance(value, str) and re.fullmatch(r'\s*\d+(\.0*)?\s*', value):
+            return int(float(value))
+        return None
+    if kind == "STRING":
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = str(value)
+        if not isinstance(value, str):
+            return None
+        for option in schema.get("enum", ()):
+            if value.strip().lower().startswith(option.lower()):
+                return option
+        return value
+    return value
+
+
 # ============================================================
 # 4. 관련도 사전 필터링
 # ============================================================
@@ -328,150 +1827,483 @@ EXCLUDE_PATTERNS = [
 ]
 
 
+class AhoCorasickMatcher:
+    """다중 패턴 Aho-Corasick 오토마톤. 텍스트 1회 순회로 포함된 모든 패턴을 찾습니다."""
+
+    def __init__(self, patterns):
+        self.patterns = [p for p in dict.fromkeys(patterns) if p]
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        for idx, pattern in enumerate(self.patterns):
+            node = 0
+            for ch in pattern:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                node = nxt
+            self._out[node] = self._out[node] + (idx,)
+        # BFS로 failure link 계산, 출력 집합은 failure 체인을 따라 병합
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0) if node else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def _scan(self, text):
+        node = 0
+        goto, fail, out = self._goto, self._fail, self._out
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                yield out[node]
+
+    def find(self, text):
+        """text에 포함된 패턴 집합."""
+        found = set()
+        for hits in self._scan(text):
+            found.update(hits)
+        return {self.patterns[i] for i in found}
+
+    def contains_any(self, text):
+        return next(self._scan(text), None) is not None
+
+
+_matcher_cache = {}
+
+
+def _cached_matcher(key, patterns):
+    """(프로파일, 용도) 키별 AhoCorasickMatcher를 한 번만 컴파일해 재사용."""
+    matcher = _matcher_cache.get(key)
+    if matcher is None:
+        matcher = _matcher_cache[key] = AhoCorasickMatcher(sorted(patterns))
+    return matcher
+
+
 def is_excluded(article):
     """제목에 명백히 무관한 키워드가 있으면 True."""
-    title = article['title']
-    return any(pat in title for pat in EXCLUDE_PATTERNS)
+    return _cached_matcher((_profile_key, "EXCLUDE"), EXCLUDE_PATTERNS).contains_any(article['title'])
 
 
 def compute_relevance_score(article, panel_id):
-    """제목+설명에서 관련 단어 출현 횟수 기반 0.0~1.0 점수. 제목 매칭 가중치 2배."""
-    title = article['title']
-    desc = article['desc']
+    """제목+설명에서 관련 단어 출현 횟수 기반 0.0~1.0 점수. 제목 매칭 가중치 2배.
+
+    패널별 Aho-Corasick 오토마톤으로 제목·설명을 각 1회 순회하여 매칭 단어를 찾습니다.
+    """
     terms = RELEVANCE_TERMS.get(panel_id, set())
     if not terms:
         return 0.5
-    title_hits = sum(1 for t in terms if t in title)
-    desc_hits = sum(1 for t in terms if t in desc and t not in title)
-    return min((title_hits * 2 + desc_hits) / 6.0, 1.0)
+    matcher = _cached_matcher((_profile_key, panel_id), terms)
+    title_terms = matcher.find(article['title'])
+    desc_hits = len(matcher.find(article['desc']) - title_terms)
+    return min((len(title_terms) * 2 + desc_hits) / 6.0, 1.0)
+
+
+def stage_clean(articles):
+    """정제 단계: 제목 공백 정리, 제목 없는 기사 제거."""
+    for n in articles:
+        title = " ".join((n.get('title') or '').split())
+        if not title:
+            continue
+        if title != n['title']:
+            n['title'] = title
+        yield n
+
+
+def stage_exclude(articles, stats=None):
+    """네거티브 필터 단계: EXCLUDE_PATTERNS 해당 기사 제거."""
+    for n in articles:
+        if stats is not None:
+            stats['fetched'] = stats.get('fetched', 0) + 1
+        if is_excluded(n):
+            if stats is not None:
+                stats['excluded'] = stats.get('excluded', 0) + 1
+            continue
+        yield n
+
+
+def stage_score(articles, panel_id, min_score=0.4, stats=None):
+    """관련도 점수 단계: relevance_score 기록, min_score 미만 제거."""
+    for n in articles:
+        score = compute_relevance_score(n, panel_id)
+        if score < min_score:
+            if stats is not None:
+                stats['below_min'] = stats.get('below_min', 0) + 1
+            continue
+        n['relevance_score'] = round(score, 3)
+        yield n
+
+
+def stage_near_dup(articles, seen_titles, stats=None):
+    """교차 중복 단계: 우선순위가 높은 패널에서 이미 채택된 제목과 근사 중복이면 제거.
+    seen_titles: 근사 중복 인덱스 또는 제목 iterable (iterable이면 인덱스를 한 번 구축)."""
+    if seen_titles is not None and not isinstance(seen_titles, (NearDupIndex, MinHashLSHIndex)):
+        seen_titles = make_near_dup_index(seen_titles)
+    for n in articles:
+        if seen_titles and seen_titles.is_duplicate(n['title'], _article_words(n)):
+            if stats is not None:
+                stats['cross_dup'] = stats.get('cross_dup', 0) + 1
+            continue
+        yield n
+
+
+def top_k(articles, k=None):
+    """관련도 내림차순 상위 k개. heapq.nlargest로 k 크기 힙만 유지 (동점은 입력 순서 유지).
+    k=None이면 전체 정렬."""
+    if k is None:
+        return sorted(articles, key=lambda n: n['relevance_score'], reverse=True)
+    return heapq.nlargest(k, articles, key=lambda n: n['relevance_score'])
+
+
+def run_panel_pipeline(panel_id, articles, seen_titles=None, min_score=0.4, k=None, stats=None):
+    """정제 → 제외 → 점수 → 교차 중복 → top-k 제너레이터 파이프라인. 반환: 채택 기사 리스트."""
+    stream = stage_clean(articles)
+    stream = stage_exclude(stream, stats)
+    stream = stage_score(stream, panel_id, min_score, stats)
+    stream = stage_near_dup(stream, seen_titles, stats)
+    return top_k(stream, k)
 
 
 def filter_by_relevance(news_list, panel_id, min_score=0.4):
     """최소 점수 미만 기사 제거. 네거티브 필터 후 점수 내림차순 정렬."""
-    before_exclude = len(news_list)
-    news_list = [n for n in news_list if not is_excluded(n)]
-    excluded = before_exclude - len(news_list)
-    if excluded:
-        logger.info(f"  네거티브 필터: {panel_id} {excluded}건 제외")
-    scored = [(n, compute_relevance_score(n, panel_id)) for n in news_list]
-    filtered = [(n, s) for n, s in scored if s >= min_score]
-    filtered.sort(key=lambda x: x[1], reverse=True)
-    removed = len(news_list) - len(filtered)
-    if removed:
-        logger.info(f"  관련도 필터: {panel_id} {removed}건 제거 (총 {len(filtered)}건 유지)")
-    for n, s in filtered:
-        n['relevance_score'] = round(s, 3)
-    return [n for n, _ in filtered]
-
-
-def dedup_across_panels(panel_a, panel_b, panel_c):
-    """패널 간 교차 중복 제거. Panel A 우선 → B → C 순."""
-    a_titles = [n['title'] for n in panel_a]
-    b_titles = [n['title'] for n in panel_b]
-
-    deduped_b = [n for n in panel_b if not is_near_duplicate(n['title'], a_titles)]
-    deduped_c = [
-        n for n in panel_c
-        if not is_near_duplicate(n['title'], a_titles)
-        and not is_near_duplicate(n['title'], b_titles)
-    ]
-
-    removed_b = len(panel_b) - len(deduped_b)
-    removed_c = len(panel_c) - len(deduped_c)
-    if removed_b:
-        logger.info(f"  교차 중복 제거: Panel B {removed_b}건 제거")
-    if removed_c:
-        logger.info(f"  교차 중복 제거: Panel C {removed_c}건 제거")
-    return panel_a, deduped_b, deduped_c
+    stats = {}
+    filtered = top_k(
+        stage_score(stage_exclude(news_list, stats), panel_id, min_score, stats)
+    )
+    if stats.get('excluded'):
+        logger.info(f"  네거티브 필터: {panel_id} {stats['excluded']}건 제외")
+    if stats.get('below_min'):
+        logger.info(f"  관련도 필터: {panel_id} {stats['below_min']}건 제거 (총 {len(filtered)}건 유지)")
+    return filtered
 
 
 # ============================================================
 # 5. 뉴스 수집 (Naver API + 공공기관 RSS)
 # ============================================================
-def fetch_news(panel_id, keywords):
-    """Naver 뉴스 검색 API로 뉴스 수집. NEWS_COLLECTION_DAYS 환경변수로 기간 설정.
+NAVER_SEARCH_URL = "https://openapi.naver.com/v1/search/news.json"
+NAVER_MAX_DISPLAY = 100   # Naver 검색 API display 상한
+NAVER_MAX_START = 1000    # Naver 검색 API start 상한
+
+_host_semaphores = {}
+_host_semaphores_lock = threading.Lock()
+
+
+def _host_slot(url):
+    """호스트별 동시 요청 상한 세마포어. NEWS_HOST_CONCURRENCY 환경변수 (기본 4)."""
+    host = urlparse(url).netloc
+    with _host_semaphores_lock:
+        sem = _host_semaphores.get(host)
+        if sem is None:
+            sem = threading.BoundedSemaphore(int(os.environ.get('NEWS_HOST_CONCURRENCY', '4')))
+            _host_semaphores[host] = sem
+    return sem
+
+
+_naver_cache = DiskCache(
+    "naver",
+    ttl_seconds=int(os.environ.get('NAVER_CACHE_TTL', '3600')),
+    max_entries=int(os.environ.get('NAVER_CACHE_MAX_ENTRIES', '2000')),
+)
+
+
+naver_rate_limiter = RateLimiter(
+    "naver",
+    rate_per_sec=float(os.environ.get('NAVER_RATE_PER_SEC', '8')),
+    burst=float(os.environ.get('NAVER_RATE_BURST', '8')),
+)
+
+
+def _naver_offline():
+    """NAVER_OFFLINE=1이면 캐시만 사용 (네트워크 호출 없음, TTL 무시)."""
+    return os.environ.get('NAVER_OFFLINE', '').lower() in ('1', 'true', 'yes')
+
+
+def _naver_search(headers, query, display=10, sort="date", start=1, timeout=30):
+    """Naver 뉴스 검색 1회. (query, display, sort, start) 키로 응답 items를 디스크 캐시.
+
+    모든 네트워크 호출은 naver_rate_limiter를 거치며, 429는 버리지 않고
+    Retry-After/지터 백오프 후 NAVER_THROTTLE_RETRIES(기본 4)회까지 재시도합니다.
+    반환: (status_code, items). 오프라인 모드 캐시 미적중 시 (None, []).
+    JSON 파싱 실패는 ValueError로 호출부에 전달됩니다.
+    """
+    key = ["news", query, display, sort, start]
+    offline = _naver_offline()
+    cached = _naver_cache.get(key, ignore_ttl=offline)
+    if cached is not None:
+        return 200, cached
+    if offline:
+        return None, []
+
+    max_retries = int(os.environ.get('NAVER_THROTTLE_RETRIES', '4'))
+    for attempt in range(max_retries + 1):
+        naver_rate_limiter.acquire()
+        with _host_slot(NAVER_SEARCH_URL):
+            resp = http_session().get(
+                NAVER_SEARCH_URL, headers=headers,
+                params={"query": query, "display": display, "sort": sort, "start": start},
+                timeout=timeout
+            )
+        if resp.status_code != 429 or attempt == max_retries:
+            break
+        delay = naver_rate_limiter.on_throttle(
+            parse_retry_after(resp.headers.get('Retry-After')), attempt
+        )
+        metrics.inc("retries", api="naver", reason="rate_limit")
+        logger.warning(f"Naver 429 rate limit (keyword={query}) — {delay:.1f}초 후 재시도")
+    if resp.status_code != 200:
+        return resp.status_code, []
+    naver_rate_limiter.on_success()
+    items = resp.json().get('items', [])
+    _naver_cache.set(key, items)
+    return 200, items
+
+
+def _naver_page(panel_id, kw, headers, display, start):
+    """Naver 검색 1페이지 원본 items 반환. 실패 시 빈 리스트.
 
     개선사항 (Naver Search MCP 참고):
     - HTTP 상태 코드별 로깅 (429/403/500 구별)
     - timeout 명시적 설정 (30초)
     - JSON 파싱 실패 원인 기록
     """
+    try:
+        try:
+            status, items = _naver_search(headers, kw, display=display, start=start)
+        except ValueError as e:
+            logger.error(f"Naver JSON 파싱 실패 ({panel_id}, keyword={kw}): {e}")
+            return []
+        if status is None:
+            logger.warning(f"Naver 오프라인 캐시 없음 ({panel_id}, keyword={kw}, start={start})")
+            return []
+        if status == 429:
+            logger.warning(f"Naver 429 재시도 한도 초과 ({panel_id}, keyword={kw}, start={start})")
+            return []
+        elif status == 403:
+            logger.error(f"Naver 403 인증 실패 ({panel_id}, keyword={kw})")
+            return []
+        elif status == 500:
+            logger.warning(f"Naver 500 서버 오류 ({panel_id}, keyword={kw})")
+            return []
+        elif status != 200:
+            logger.warning(f"Naver HTTP {status} ({panel_id}, keyword={kw})")
+            return []
+        return items
+    except requests.exceptions.Timeout:
+        logger.warning(f"Naver 타임아웃 ({panel_id}, keyword={kw})")
+    except requests.exceptions.RequestException as e:
+        logger.warning(f"Naver 요청 오류 ({panel_id}, keyword={kw}): {e}")
+    except Exception as e:
+        logger.error(f"Naver 수집 중 예기치 않은 오류 ({panel_id}): {e}")
+    return []
+
+
+def _oldest_pub_date(items):
+    """페이지 내 가장 오래된 pubDate. 파싱 가능한 항목이 없으면 None."""
+    oldest = None
+    for item in items:
+        try:
+            pd = parsedate_to_datetime(item['pubDate'])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if oldest is None or pd < oldest:
+            oldest = pd
+    return oldest
+
+
+def iter_naver_pages(panel_id, kw, headers, limit):
+    """키워드 1개의 Naver 검색 결과를 start 오프셋 순으로 지연 yield.
+
+    sort=date이므로 페이지의 가장 오래된 pubDate가 limit 이전이면 다음 페이지를 요청하지 않습니다.
+    NAVER_PAGE_SIZE(기본 10, API 상한 100), NAVER_MAX_PAGES(기본 5) 환경변수로 깊이 설정.
+    """
+    page_size = min(max(int(os.environ.get('NAVER_PAGE_SIZE', '10')), 1), NAVER_MAX_DISPLAY)
+    max_pages = max(int(os.environ.get('NAVER_MAX_PAGES', '5')), 1)
+    start = 1
+    for _ in range(max_pages):
+        if start > NAVER_MAX_START:
+            return
+        items = _naver_page(panel_id, kw, headers, page_size, start)
+        yield from items
+        if len(items) < page_size:
+            return
+        oldest = _oldest_pub_date(items)
+        if oldest is not None and oldest < limit:
+            return
+        start += page_size
+
+
+def _naver_keyword_items(panel_id, kw, headers, limit):
+    """워커 스레드용: 키워드 1개의 items를 리스트로 수집 (iter_naver_pages가 기간 하한에서 페이지 요청 중단)."""
+    return list(iter_naver_pages(panel_id, kw, headers, limit))
+
+
+def iter_naver_articles(panel_id, item_streams, limit):
+    """키워드 순서대로 items 스트림을 ArticleRecord로 변환하여 지연 yield.
+
+    기간 외 기사와 패널 내 근사 중복(seen)은 이 단계에서 제거되며,
+    완료 순서와 무관하게 입력 순서대로 처리되므로 결과가 실행마다 동일합니다.
+    """
+    seen = make_near_dup_index()
+    seen_links = set()
+    for items in item_streams:
+        for item in items:
+            try:
+                pd = parsedate_to_datetime(item['pubDate'])
+                if pd < limit:
+                    continue
+                record = ArticleRecord.from_html(
+                    item['title'], item.get('originallink') or item['link'],
+                    item['description'], pd.strftime("%Y-%m-%d"), "naver",
+                )
+                if record.link_hash in seen_links or seen.is_duplicate(record.title, record.words):
+                    continue
+                seen.add(record.title, record.words)
+                seen_links.add(record.link_hash)
+                yield record
+            except Exception as e:
+                logger.debug(f"Naver 항목 처리 실패 ({panel_id}): {e}")
+                continue
+
+
+def _naver_credentials():
+    """Naver API 헤더. 키 미설정이면 None (오프라인 모드에서는 빈 헤더)."""
     client_id = os.environ.get('NAVER_CLIENT_ID')
     client_secret = os.environ.get('NAVER_CLIENT_SECRET')
     if not client_id or not client_secret:
-        logger.warning(f"Naver API 키 미설정 ({panel_id})")
-        return []
+        return {} if _naver_offline() else None
+    return {"X-Naver-Client-Id": client_id, "X-Naver-Client-Secret": client_secret}
+
 
+def _collection_limit():
+    """NEWS_COLLECTION_DAYS 기준 수집 하한 시각 (UTC)과 기간(일)."""
     days = int(os.environ.get('NEWS_COLLECTION_DAYS', '7'))
-    url = "https://openapi.naver.com/v1/search/news.json"
-    headers = {"X-Naver-Client-Id": client_id, "X-Naver-Client-Secret": client_secret}
-    collected = []
-    seen = set()
     now = datetime.datetime.now(datetime.timezone.utc)
-    limit = now - datetime.timedelta(days=days)
+    return now - datetime.timedelta(days=days), days
 
-    for kw in keywords:
-        try:
-            resp = requests.get(
-                url, headers=headers,
-                params={"query": kw, "display": 10, "sort": "date"},
-                timeout=30  # 개선: MCP 기준 30초
+
+def iter_panel_streams(panel_keywords):
+    """전 패널·키워드 Naver 검색을 bounded worker pool에 한꺼번에 제출하고
+    패널 순서대로 (panel_id, 기사 iterator)를 yield.
+
+    각 iterator는 키워드 순서대로 future 완료를 기다리며 기사를 흘려보내므로,
+    소비자는 앞 키워드를 처리하는 동안 나머지 요청이 계속 진행됩니다 (I/O와 점수 계산 중첩).
+    다음 패널로 넘어가기 전에 현재 iterator를 끝까지 소비해야 합니다.
+    NEWS_FETCH_WORKERS(기본 8)로 전체 동시성, NEWS_HOST_CONCURRENCY로 호스트별 상한 설정.
+    NAVER_OFFLINE=1이면 API 키 없이 캐시된 응답만으로 수집합니다.
+    """
+    headers = _naver_credentials()
+    if headers is None:
+        for panel_id in panel_keywords:
+            logger.warning(f"Naver API 키 미설정 ({panel_id})")
+            yield panel_id, iter(())
+        return
+
+    limit, _ = _collection_limit()
+    workers = max(1, int(os.environ.get('NEWS_FETCH_WORKERS', '8')))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="naver") as pool:
+        futures = {
+            panel_id: [
+                pool.submit(_naver_keyword_items, panel_id, kw, headers, limit) for kw in keywords
+            ]
+            for panel_id, keywords in panel_keywords.items()
+        }
+        for panel_id, panel_futures in futures.items():
+            yield panel_id, iter_naver_articles(
+                panel_id, (f.result() for f in panel_futures), limit
             )
-            if resp.status_code == 429:
-                logger.warning(f"Naver 429 rate limit ({panel_id}, keyword={kw}) — 대기 중...")
-                time.sleep(10)
-                continue
-            elif resp.status_code == 403:
-                logger.error(f"Naver 403 인증 실패 ({panel_id}, keyword={kw})")
-                continue
-            elif resp.status_code == 500:
-                logger.warning(f"Naver 500 서버 오류 ({panel_id}, keyword={kw})")
-                continue
-            elif resp.status_code != 200:
-                logger.warning(f"Naver HTTP {resp.status_code} ({panel_id}, keyword={kw})")
-                continue
+    _log_naver_limiter_stats()
 
-            try:
-                items = resp.json().get('items', [])
-            except ValueError as e:
-                logger.error(f"Naver JSON 파싱 실패 ({panel_id}, keyword={kw}): {e}")
-                continue
 
-            for item in items:
-                try:
-                    pd = parsedate_to_datetime(item['pubDate'])
-                    if pd < limit:
-                        continue
-                    t = clean_html(item['title'])
-                    if is_near_duplicate(t, seen):
-                        continue
-                    collected.append({
-                        "title": t,
-                        "link": item.get('originallink') or item['link'],
-                        "desc": clean_html(item['description']),
-                        "date": pd.strftime("%Y-%m-%d"),
-                        "source": "naver",
-                    })
-                    seen.add(t)
-                except Exception as e:
-                    logger.debug(f"Naver 항목 처리 실패 ({panel_id}): {e}")
-                    continue
-        except requests.exceptions.Timeout:
-            logger.warning(f"Naver 타임아웃 ({panel_id}, keyword={kw})")
-            continue
-        except requests.exceptions.RequestException as e:
-            logger.warning(f"Naver 요청 오류 ({panel_id}, keyword={kw}): {e}")
-            continue
-        except Exception as e:
-            logger.error(f"Naver 수집 중 예기치 않은 오류 ({panel_id}): {e}")
-            continue
+def _log_naver_limiter_stats():
+    stats = naver_rate_limiter.stats()
+    logger.info(
+        f"  Naver 속도 제한: 호출 {stats['requests']}건, 스로틀 {stats['throttle_events']}회, "
+        f"대기 {stats['wait_seconds']}s (현재 {stats['rate_per_sec']}/s)"
+    )
 
-    logger.info(f"  Naver 수집: {panel_id} {len(collected)}건 (최근 {days}일)")
-    return sorted(collected, key=lambda x: x['date'], reverse=True)[:12]
+
+def _rss_entry_to_dict(entry):
+    """feedparser entry → 캐시 가능한 dict (published는 UTC ISO 문자열 또는 None)."""
+    parsed = entry.get('published_parsed') or entry.get('updated_parsed')
+    pub = datetime.datetime(*parsed[:6], tzinfo=datetime.timezone.utc) if parsed else None
+    return {
+        "title": clean_html(entry.get('title', '')),
+        "link": entry.get('link', ''),
+        "desc": clean_html(entry.get('summary', entry.get('description', ''))),
+        "published": pub.isoformat() if pub else None,
+    }
+
+
+def _fetch_feed_entries(url):
+    """조건부 GET(ETag/Last-Modified)으로 RSS 피드 항목 조회.
+
+    data/cache/rss/에 검증자와 파싱된 항목을 저장하고, 304면 캐시 항목을 재사용합니다.
+    RSS_TIMEOUT(초, 기본 20)으로 느린 공공기관 서버가 파이프라인을 붙잡지 않도록 제한.
+    캐시 항목이 없는데 304가 오면(중간 캐시 등) 조건 헤더 없이 한 번 다시 요청하며, 그래도 304면 실패로 처리합니다.
+    반환: (entries, status) — status는 "fresh" / "not_modified" / "stale"
+    """
+    cache_path = os.path.join(CACHE_DIR, "rss", hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json")
+    cached = _read_json_file(cache_path)
+    if cached is not None and not isinstance(cached.get("entries"), list):
+        cached = None
+    timeout = float(os.environ.get('RSS_TIMEOUT', '20'))
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    try:
+        resp = http_session().get(url, headers=headers, timeout=timeout)
+        if resp.status_code == 304 and cached:
+            metrics.inc("cache_hits", cache="rss")
+            return cached["entries"], "not_modified"
+        if resp.status_code == 304:
+            logger.warning(f"RSS 304 수신했으나 캐시 항목 없음 — 조건 헤더 없이 재요청: {url}")
+            resp = http_session().get(url, headers={"Cache-Control": "no-cache"}, timeout=timeout)
+            if resp.status_code == 304:
+                raise requests.exceptions.HTTPError(f"304 Not Modified without cached entries: {url}", response=resp)
+        metrics.inc("cache_misses", cache="rss")
+        resp.raise_for_status()
+    except requests.exceptions.RequestException:
+        if cached:
+            return cached["entries"], "stale"
+        raise
+
+    feed = feedparser.parse(resp.content, response_headers=dict(resp.headers))
+    entries = []
+    for entry in feed.entries:
+        try:
+            entries.append(_rss_entry_to_dict(entry))
+        except Exception:
+            continue
+    try:
+        _write_json_file(cache_path, {
+            "url": url,
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+            "fetched_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "entries": entries,
+        })
+    except OSError as e:
+        logger.debug(f"RSS 캐시 저장 실패 ({url}): {e}")
+    return entries, "fresh"
 
 
 def fetch_rss_news(panel_id):
-    """공공기관 RSS 피드 수집 (Panel B 전용). feedparser 사용."""
+    """공공기관 RSS 피드 수집 (Panel B 전용). 조건부 GET 캐시 + timeout 적용."""
     feeds = [f for f in PROFILE.get('rss_feeds', []) if f['panel'] == panel_id]
     if not feeds:
         return []
@@ -480,46 +2312,34 @@ def fetch_rss_news(panel_id):
     now = datetime.datetime.now(datetime.timezone.utc)
     limit = now - datetime.timedelta(days=days)
     collected = []
-    seen = set()
+    seen = make_near_dup_index()
 
     for feed_info in feeds:
         try:
-            feed = feedparser.parse(feed_info['url'])
-            for entry in feed.entries:
+            entries, status = _fetch_feed_entries(feed_info['url'])
+            if status != "fresh":
+                logger.info(f"  RSS 캐시 사용 ({feed_info['label']}, {status})")
+            for entry in entries:
                 try:
-                    pub = None
-                    if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                        pub = datetime.datetime(
-                            *entry.published_parsed[:6],
-                            tzinfo=datetime.timezone.utc
-                        )
-                    elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
-                        pub = datetime.datetime(
-                            *entry.updated_parsed[:6],
-                            tzinfo=datetime.timezone.utc
-                        )
-
+                    pub = (
+                        datetime.datetime.fromisoformat(entry['published'])
+                        if entry.get('published') else None
+                    )
                     if pub and pub < limit:
                         continue
 
-                    t = clean_html(entry.get('title', ''))
-                    if not t or is_near_duplicate(t, seen):
-                        continue
-
-                    desc = clean_html(entry.get('summary', entry.get('description', '')))
-                    link = entry.get('link', '')
                     date_str = (
                         pub.strftime("%Y-%m-%d") if pub
                         else datetime.datetime.now(KST).strftime("%Y-%m-%d")
                     )
-                    collected.append({
-                        "title": t,
-                        "link": link,
-                        "desc": desc,
-                        "date": date_str,
-                        "source": f"rss_{feed_info['label']}",
-                    })
-                    seen.add(t)
+                    record = ArticleRecord(
+                        entry['title'], entry['link'], entry['desc'],
+                        date_str, f"rss_{feed_info['label']}",
+                    )
+                    if not record.title or seen.is_duplicate(record.title, record.words):
+                        continue
+                    collected.append(record)
+                    seen.add(record.title, record.words)
                 except Exception:
                     continue
         except Exception as e:
@@ -527,72 +2347,312 @@ def fetch_rss_news(panel_id):
             continue
 
     logger.info(
-        f"  RSS 수집: {panel_id} {len(collected)}건 "
-        f"({', '.join(f['label'] for f in feeds)})"
+        f"  RSS 수집: {panel_id} {len(collected)}건 "
+        f"({', '.join(f['label'] for f in feeds)})"
+    )
+    return collected
+
+
+# 교차 중복 제거 대상 패널 (우선순위 순). Panel E는 독립적으로 분석.
+CROSS_DEDUP_PANELS = ("PANEL_A", "PANEL_B", "PANEL_C")
+
+
+def _iter_future(future):
+    """future 결과(리스트)를 소비 시점에 기다려 yield — Naver 스트림 뒤에 이어 붙이기용."""
+    yield from future.result()
+
+
+def collect_panels(panel_keywords, extra_sources=None, min_score=0.4):
+    """수집부터 교차 중복 제거까지 스트리밍 실행.
+
+    Naver 결과가 도착하는 대로 정제 → 제외 → 점수 → 교차 중복 → top-k 단계를 통과시키고,
+    패널별로 NEWS_TOP_K(기본 30)개 힙만 유지합니다. 교차 중복은 CROSS_DEDUP_PANELS 순서로
+    앞 패널의 채택 기사와 비교합니다 (A 우선 → B → C).
+    extra_sources: {panel_id: 인자 없는 callable} — RSS 등 추가 소스, Naver 수집과 병행 실행.
+    반환: ({panel_id: 채택 기사 리스트}, {panel_id: 단계별 카운터 dict})
+    """
+    k = int(os.environ.get('NEWS_TOP_K', '30'))
+    extra_sources = extra_sources or {}
+    results, stats = {}, {}
+    cross_seen = make_near_dup_index()
+    with ThreadPoolExecutor(max_workers=max(1, len(extra_sources)), thread_name_prefix="extra") as pool:
+        extra_futures = {pid: pool.submit(fn) for pid, fn in extra_sources.items()}
+        for panel_id, stream in iter_panel_streams(panel_keywords):
+            if panel_id in extra_futures:
+                stream = itertools.chain(stream, _iter_future(extra_futures[panel_id]))
+            panel_stats = {}
+            seen = cross_seen if panel_id in CROSS_DEDUP_PANELS else None
+            kept = run_panel_pipeline(panel_id, stream, seen, min_score, k, panel_stats)
+            if panel_id in CROSS_DEDUP_PANELS:
+                for n in kept:
+                    cross_seen.add(n['title'], _article_words(n))
+            panel_stats['kept'] = len(kept)
+            results[panel_id], stats[panel_id] = kept, panel_stats
+            logger.info(
+                f"  {panel_id}: 수집 {panel_stats.get('fetched', 0)}건 → 제외 {panel_stats.get('excluded', 0)} / "
+                f"저관련 {panel_stats.get('below_min', 0)} / 교차중복 {panel_stats.get('cross_dup', 0)} → "
+                f"채택 {len(kept)}건"
+            )
+    return results, stats
+
+
+# ============================================================
+# 5-A. 후보 컨텍스트 빌더 (토큰 예산 플래너)
+# ============================================================
+_DESC_BOILERPLATE = [
+    re.compile(r'^\s*[\[(【][^\])】]{0,30}[\])】]\s*'),                  # [서울=뉴시스], (워싱턴=연합뉴스)
+    re.compile(r'[가-힣]{2,4}\s*(?:기자|특파원)\s*=\s*'),                  # 홍길동 기자 =
+    re.compile(r'[\w.+-]+@[\w-]+\.[\w.]+'),                               # 기자 이메일
+    re.compile(r'(?:<?저작권자|무단\s*전재|재배포\s*금지|ⓒ|©).*$'),          # 저작권 꼬리말
+    re.compile(r'(?:\.{3,}|…)+\s*$'),                                      # 끝 말줄임표
+]
+
+
+def compact_desc(desc, max_tokens=80):
+    """기사 요약 압축: 통신사 태그·기자명·이메일·저작권 문구·말줄임표 제거 후 max_tokens로 절단."""
+    text = desc or ''
+    for pattern in _DESC_BOILERPLATE:
+        text = pattern.sub(' ', text).strip()
+    text = re.sub(r'(?:\.{3,}|…)+', ' ', text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if estimate_tokens(text[:mid]) <= max_tokens:
+            lo = mid
+        else:
+            hi = mid - 1
+    cut = text[:lo]
+    space = cut.rfind(' ')
+    return (cut[:space] if space > lo * 0.8 else cut).rstrip(' ,.')
+
+
+def build_candidate_context(news_list, budget_tokens, max_items=None, desc_tokens=80, brief_ids=()):
+    """후보 목록을 토큰 예산 안에서 "[i] 제목 | 압축 요약" 줄로 구성 (brief_ids 후보는 "[i] 제목"만).
+
+    순위 순서대로 담다가 예산을 넘는 첫 후보에서 멈추므로, 선택 결과는 항상 news_list의 앞부분입니다
+    (ref_id가 원래 인덱스와 일치). 예산이 작아도 후보가 있으면 최소 1건은 포함합니다.
+    반환: (컨텍스트 문자열, 선택된 기사 리스트, 예상 토큰 수)
+    """
+    lines, used = [], 0
+    for i, n in enumerate(news_list):
+        if max_items is not None and i >= max_items:
+            break
+        line = f"[{i}] {n['title']}"
+        if i not in brief_ids:
+            line += f" | {compact_desc(n['desc'], desc_tokens)}"
+        cost = estimate_tokens(line) + 1
+        if lines and used + cost > budget_tokens:
+            break
+        lines.append(line)
+        used += cost
+    return "".join(f"{line}\n" for line in lines), list(news_list[:len(lines)]), used
+
+
+def _panel_context_budget():
+    """패널 분석 후보 예산 (GEMINI_PANEL_CONTEXT_TOKENS 기본 900, PANEL_MAX_CANDIDATES 기본 8, GEMINI_DESC_TOKENS 기본 80)."""
+    return {
+        "budget_tokens": int(os.environ.get('GEMINI_PANEL_CONTEXT_TOKENS', '900')),
+        "max_items": int(os.environ.get('PANEL_MAX_CANDIDATES', '8')),
+        "desc_tokens": int(os.environ.get('GEMINI_DESC_TOKENS', '80')),
+    }
+
+
+def _log_token_usage(label, planned, usage):
+    """계획(추정) 대비 실제 usageMetadata 토큰 로그. 캐시 적중 등으로 usage가 비면 생략."""
+    actual = usage.get('promptTokenCount')
+    if actual is None:
+        return
+    metrics.inc("gemini_tokens", actual, kind="prompt")
+    metrics.inc("gemini_tokens", usage.get('cachedContentTokenCount', 0), kind="cached")
+    metrics.inc("gemini_tokens", usage.get('candidatesTokenCount', 0), kind="output")
+    logger.info(
+        f"  {label} 입력 토큰: 계획 {planned} / 실제 {actual}"
+        f" (컨텍스트 캐시 {usage.get('cachedContentTokenCount', 0)}),"
+        f" 출력 {usage.get('candidatesTokenCount', '?')}"
     )
-    return collected
 
 
 # ============================================================
 # 6. 패널별 6단계 AI 분석 (Phase 1)
 # ============================================================
-def analyze_panel(api_key, news_list, panel_id):
+def analyze_panel(api_key, news_list, panel_id, store=None, on_article=None):
     """6단계 분석. top-3 기사를 선정하여 분석.
 
+    store(AnalysisStore)가 주어지면 모델에 보내는 예산 내 후보 중 최근 ANALYSIS_REUSE_DAYS일 내 분석된
+    기사(동일 링크 또는 근사 중복 제목)는 제목만 보내 선정 여부만 묻고, 선정되면 저장된 분석으로
+    대체합니다. 저장된 분석만으로 3건이 채워지면 호출을 생략합니다.
+    on_article: 스트리밍 모드(GEMINI_STREAM)에서 분석 기사가 완성될 때마다 호출되는 콜백.
     반환: (분석된 기사 리스트, error_type 또는 None)
     """
     if not news_list:
         return [], None
+    if store is None:
+        return _analyze_candidates(api_key, news_list, panel_id, on_article=on_article)
+    _, candidates, _ = build_candidate_context(news_list, **_panel_context_budget())
+    reusable = _reusable_analyses(candidates, panel_id, store)
+    return _analyze_candidates(api_key, candidates, panel_id, on_article=on_article,
+                               reusable=reusable, store=store)
+
+
+def _reusable_analyses(candidates, panel_id, store):
+    """후보 중 저장소에 재사용 가능한 분석이 있는 것. 반환: {ref_id: 이전 분석}."""
+    if store is None:
+        return {}
+    reusable = {}
+    for i, n in enumerate(candidates):
+        prior = store.lookup(n)
+        if prior is not None:
+            reusable[i] = prior
+    if reusable:
+        logger.info(f"{panel_id} 후보 {len(candidates)}건 중 이전 분석 보유 {len(reusable)}건 (선정 시에만 재사용)")
+    return reusable
+
+
+def _reuse_hint(reusable):
+    """이전 분석 보유 후보 안내 (프롬프트용). 없으면 빈 문자열."""
+    if not reusable:
+        return ""
+    ids = ", ".join(str(i) for i in sorted(reusable))
+    return (
+        f"\n[기존 분석 보유 후보] ref_id {ids} — 요약 없이 제목만 제공합니다. 선정 기준은 동일하게 적용하되, "
+        f"선정하면 저장된 분석을 사용하므로 해당 항목은 ref_id만 채우고 나머지 필드는 빈 문자열로 두세요.\n"
+    )
 
-    analyst_role = PROFILE['analyst_roles'].get(panel_id, '오뚜기라면 HR 전략 애널리스트')
-    panel_label = PROFILE['panel_labels'].get(panel_id, panel_id)
-    selection_rule = PROFILE['selection_rules'].get(panel_id, '')
-
-    ctx = ""
-    for i, n in enumerate(news_list):
-        ctx += f"[{i}] {n['title']} | {n['desc']}\n"
-
-    prompt = f"""당신은 {analyst_role}입니다.
 
-[독자] 과장·팀장급 이상 의사결정권자
-[톤] 보고서 형식, 경어체, 수식어 배제, 숫자·데이터·의사결정 포인트 중심
+def _reused_selection(reusable, max_pick):
+    """저장된 분석만으로 max_pick건을 채울 수 있으면 순위 순 상위 max_pick건 (호출 생략), 아니면 None."""
+    if not reusable or len(reusable) < max_pick:
+        return None
+    return [dict(reusable[i], ref_id=i) for i in sorted(reusable)[:max_pick]]
 
-[회사 컨텍스트]
-{COMPANY_CONTEXT}
 
-아래 [{panel_label}] 뉴스 후보에서 **최대 3개**를 선정하여 6단계 전략 분석을 작성하세요.
+def _apply_reused(items, candidates, reusable, panel_id, store):
+    """모델이 선정한 항목 중 이전 분석 보유 후보는 저장된 분석으로 대체하고, 신규 분석은 저장소에 기록."""
+    merged = []
+    for item in items:
+        prior = reusable.get(item['ref_id']) if reusable else None
+        if prior is not None:
+            merged.append(dict(prior, ref_id=item['ref_id']))
+            continue
+        if store is not None:
+            store.record(candidates[item['ref_id']], item, panel_id)
+        merged.append(item)
+    return merged
 
-[선정 기준]
-{selection_rule}
-- 관련 뉴스가 없으면 정확히 {{"articles": []}} 만 출력하세요.
-- 품질 우선: 1개라도 깊은 분석이 3개의 얕은 분석보다 낫습니다.
 
-[6단계 분석 스키마]
+_SIX_STEP_GUIDE = """[6단계 분석 스키마]
 - signal_strength: High(즉각 대응 필요) | Medium(모니터링) | Low(참고)
 - fact: 수치 포함 핵심 사실 2~3문장 (뉴스에 있는 내용만)
 - so_what: "그래서 오뚜기라면에 뭐가 달라지는가?" — 1문장
 - business_impact: 재무·운영·인력 측면의 영향
 - strategic_options: A(선제 대응), B(관망) 각각 action + tradeoff
-- decision_point: 기한 명시 + 미결 시 리스크
+- decision_point: 기한 명시 + 미결 시 리스크"""
+
+
+def _panel_guides():
+    """전 패널의 담당 관점·선정 기준 (공통 접두부용)."""
+    return "\n\n".join(
+        f"### {pid} — {PROFILE['panel_labels'].get(pid, pid)}\n"
+        f"[관점] {PROFILE['analyst_roles'].get(pid, '오뚜기라면 HR 전략 애널리스트')}\n"
+        f"[선정 기준]\n{PROFILE['selection_rules'].get(pid, '')}"
+        for pid in _PANEL_IDS
+    )
+
+
+def _shared_prompt_prefix():
+    """패널 분석·Panel D 리포트가 공유하는 접두부 (독자·톤·회사 컨텍스트·패널별 기준·스키마·규칙).
+
+    실행 중 변하지 않는 지침을 모두 담아 컨텍스트 캐시 최소 크기를 넘기고, 호출별 프롬프트에는
+    과업 지정과 뉴스 후보만 남깁니다.
+    """
+    return f"""[독자] 과장·팀장급 이상 의사결정권자
+[톤] 보고서 형식, 경어체, 수식어 배제, 숫자·데이터·의사결정 포인트 중심
+
+[회사 컨텍스트]
+{COMPANY_CONTEXT}
+
+=== 과업 1: 패널 뉴스 분석 ===
+[패널별 담당 관점·선정 기준]
+{_panel_guides()}
+
+{_SIX_STEP_GUIDE}
 
 [중요 규칙]
 1. 반드시 아래 JSON 형식만 출력하세요. 다른 텍스트, 마크다운은 절대 포함하지 마세요.
 2. 뉴스에 없는 사실·수치를 만들어내지 마세요. 추정 시 "(추정)" 명시.
 3. ref_id는 반드시 정수여야 합니다.
+4. 관련 뉴스가 없으면 정확히 {{"articles": []}} 만 출력하세요.
+5. 품질 우선: 1개라도 깊은 분석이 3개의 얕은 분석보다 낫습니다.
 
 {{"articles": [{_ARTICLE_SCHEMA}]}}
 
+=== 과업 2: Panel D 비즈니스 리포트 ===
+BCG/Goldman Sachs 30년 경력 수석 컨설턴트의 관점으로 패널 간 인과관계를 통합합니다.
+
+{_REPORT_RULES}
+
+{{"report": {_REPORT_SCHEMA}}}"""
+
+
+def _analyze_candidates(api_key, news_list, panel_id, max_pick=3, on_article=None, reusable=None, store=None):
+    """후보 리스트에서 최대 max_pick개를 선정해 6단계 분석 (Gemini 호출).
+
+    reusable: {ref_id: 이전 분석} — 모델이 선정하면 저장된 분석으로 대체 (_apply_reused), 신규 분석은 store에 기록.
+    반환: (분석된 기사 리스트, error_type 또는 None). 각 항목의 ref_id는 정수로 정규화됩니다.
+    """
+
+    reused = _reused_selection(reusable, max_pick)
+    if reused is not None:
+        logger.info(f"{panel_id} 저장된 분석 {len(reused)}건으로 충분 — Gemini 호출 생략")
+        return reused, None
+
+    panel_label = PROFILE['panel_labels'].get(panel_id, panel_id)
+
+    ctx, news_list, planned = build_candidate_context(
+        news_list, **_panel_context_budget(), brief_ids=frozenset(reusable or ())
+    )
+
+    # 공통 접두부(_shared_prompt_prefix, 패널별 기준 포함)는 컨텍스트 캐시로, 과업 지정과 후보만 새 토큰으로 전송
+    prompt = f"""[과업 1] {panel_id} — {panel_label} 담당 애널리스트로서, 공통 지침의 {panel_id} 관점·선정 기준에 따라
+아래 뉴스 후보에서 **최대 {max_pick}개**를 선정하여 6단계 전략 분석을 작성하세요.
+{_reuse_hint(reusable)}
 뉴스 후보:
 {ctx}"""
 
     logger.info(f"AI 분석 중 ({panel_id})...")
-    raw, err = call_gemini(api_key, prompt)
+    t0 = time.time()
+    streamed = set()
+
+    def _on_streamed(item):
+        for mapped in _map_ref_ids([item], news_list):
+            if mapped['ref_id'] in streamed:
+                continue
+            if not streamed:
+                logger.info(f"  {panel_id} 첫 분석 결과 수신: {time.time() - t0:.1f}s")
+            streamed.add(mapped['ref_id'])
+            if on_article is not None:
+                on_article(_apply_reused([mapped], news_list, reusable, panel_id, None)[0])
+
+    prefix = _shared_prompt_prefix()
+    usage = {}
+    logger.info(f"  {panel_id} 후보 {len(news_list)}건, 후보 컨텍스트 약 {planned}토큰")
+    def _valid(text):
+        return bool(_parse_articles(text, news_list))
+
+    raw, err = call_gemini(api_key, prompt, on_article=_on_streamed,
+                           response_schema=ARTICLES_RESPONSE_SCHEMA,
+                           cache_prefix=prefix, usage=usage, validate=_valid)
+    _log_token_usage(panel_id, estimate_tokens(f"{prefix}\n\n{prompt}"), usage)
+    if not raw and err in ("circuit_open", "budget_exhausted"):
+        logger.warning(f"Gemini 사용 불가 ({panel_id}): {err} — 간소화 재시도 없이 폴백")
+        return [], err
     if not raw:
         logger.warning(f"Gemini 1차 실패 ({panel_id}): {err} — 간소화 프롬프트로 재시도")
-        time.sleep(10)
-        simple_ctx = "\n".join(
-            f"[{i}] {n['title']} | {n['desc']}"
-            for i, n in enumerate(news_list[:2])
+        simple_ctx, _, _ = build_candidate_context(
+            news_list, _panel_context_budget()["budget_tokens"] // 2, max_items=2
         )
         simple_prompt = f"""오뚜기라면 전략 애널리스트입니다. 아래 뉴스를 6단계 분석하세요.
 
@@ -604,28 +2664,153 @@ JSON만 출력하세요:
 
 뉴스:
 {simple_ctx}"""
-        raw, err = call_gemini(api_key, simple_prompt)
+        raw, err = call_gemini(api_key, simple_prompt, response_schema=ARTICLES_RESPONSE_SCHEMA, validate=_valid)
         if not raw:
             logger.error(f"Gemini 2차 실패 ({panel_id}): {err}")
             return [], err
 
-    parsed = extract_json_from_text(raw)
-    if not parsed or not isinstance(parsed.get('articles'), list):
+    result = _parse_articles(raw, news_list)
+    if result is None:
         logger.error(f"JSON 구조 불일치 ({panel_id}) — raw 앞 300자: {raw[:300]}")
         return [], "json_parse_error"
+    result = _apply_reused(result[:max_pick], news_list, reusable, panel_id, store)
+    logger.info(f"{panel_id} 분석 완료: {len(result)}건")
+    return result, None
+
 
+def _parse_articles(raw, news_list):
+    """패널 분석 응답 → 후보에 연결된 article 리스트. "articles" 구조가 없으면 None."""
+    parsed = extract_json_from_text(raw)
+    if isinstance(parsed, list):
+        parsed = {"articles": parsed}
+    articles = parsed.get('articles') if isinstance(parsed, dict) else None
+    if articles is None:
+        return None
+    return _map_ref_ids(articles if isinstance(articles, list) else [articles], news_list)
+
+
+def _map_ref_ids(items, news_list):
+    """모델이 돌려준 articles 항목을 스키마로 보정한 뒤 ref_id로 후보 기사에 연결 (범위 밖·비정수 ref_id는 버림)."""
+    article_schema = ARTICLES_RESPONSE_SCHEMA["properties"]["articles"]["items"]
     result = []
-    for item in parsed['articles']:
+    for item in items:
+        item = conform_to_schema(item, article_schema)
+        if item is None:
+            continue
         ref_id = item.get('ref_id')
-        if isinstance(ref_id, str):
-            ref_id = int(ref_id) if ref_id.isdigit() else -1
         if isinstance(ref_id, int) and 0 <= ref_id < len(news_list):
             n = news_list[ref_id]
-            item.update({'link': n['link'], 'date': n['date']})
+            item.update({'ref_id': ref_id, 'link': n['link'], 'date': n['date']})
             result.append(item)
+    return result
 
-    logger.info(f"{panel_id} 분석 완료: {len(result)}건")
-    return result, None
+
+# ============================================================
+# 6-A. 기사 단위 분석 저장소 (주차 간 재사용)
+# ============================================================
+ANALYSIS_STORE_PATH = os.environ.get('ANALYSIS_STORE_PATH', 'data/reports/analysis_store.json')
+
+_TRACKING_PARAMS = frozenset({'fbclid', 'gclid', 'igshid', 'mc_cid', 'mc_eid'})
+
+
+def _is_tracking_param(param):
+    name = param.split('=', 1)[0].lower()
+    return name.startswith('utm_') or name in _TRACKING_PARAMS
+
+
+def canonical_link(link):
+    """기사 URL 정규화: scheme·www·m. 접두, 추적 파라미터, fragment, 끝 슬래시 제거."""
+    parsed = urlparse((link or '').strip())
+    host = parsed.netloc.lower()
+    for prefix in ('www.', 'm.', 'mobile.'):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+    params = sorted(
+        p for p in parsed.query.split('&')
+        if p and not _is_tracking_param(p)
+    )
+    path = parsed.path.rstrip('/')
+    return f"{host}{path}" + (f"?{'&'.join(params)}" if params else "")
+
+
+class AnalysisStore:
+    """기사별 6단계 분석 결과 저장소. 정규화 링크를 키로, 근사 중복 제목 클러스터로도 조회합니다.
+
+    data/reports/에 저장되어 주간 아카이브 커밋과 함께 다음 주 실행으로 이어집니다.
+    ANALYSIS_REUSE_DAYS(기본 14)일 이내 분석만 재사용, ANALYSIS_STORE_RETENTION_DAYS(기본 56)일 후 삭제.
+    """
+
+    def __init__(self, entries=None, path=ANALYSIS_STORE_PATH, today=None):
+        self.path = path
+        self.today = today or datetime.datetime.now(KST).date()
+        self.max_age_days = int(os.environ.get('ANALYSIS_REUSE_DAYS', '14'))
+        self.entries = dict(entries or {})
+        self._lock = threading.Lock()
+        self._rebuild_index()
+
+    @classmethod
+    def load(cls, path=ANALYSIS_STORE_PATH, today=None):
+        data = _read_json_file(path) or {}
+        return cls(data.get("articles"), path=path, today=today)
+
+    def _rebuild_index(self):
+        self._keys = list(self.entries)
+        self._titles = NearDupIndex(self.entries[k].get("title", "") for k in self._keys)
+
+    def _age_days(self, entry):
+        try:
+            analyzed = datetime.date.fromisoformat(entry.get("analyzed_at", ""))
+        except ValueError:
+            return None
+        return (self.today - analyzed).days
+
+    def lookup(self, article):
+        """재사용 가능한 이전 분석 (현재 기사의 link/date로 갱신된 사본). 없으면 None."""
+        with self._lock:
+            entry = self.entries.get(canonical_link(article['link']))
+            if entry is None:
+                idx = self._titles.match(article['title'], _article_words(article))
+                entry = self.entries.get(self._keys[idx]) if idx is not None else None
+        age = self._age_days(entry) if entry is not None else None
+        if age is None or age > self.max_age_days:
+            metrics.inc("cache_misses", cache="analysis_store")
+            return None
+        metrics.inc("cache_hits", cache="analysis_store")
+        item = dict(entry["analysis"])
+        item.update({'link': article['link'], 'date': article['date'], 'reused_from': entry["analyzed_at"]})
+        return item
+
+    def record(self, article, analysis, panel_id):
+        key = canonical_link(article['link'])
+        stored = {k: v for k, v in analysis.items() if k not in ('link', 'date', 'ref_id', 'reused_from')}
+        with self._lock:
+            is_new = key not in self.entries
+            self.entries[key] = {
+                "title": article['title'],
+                "panel": panel_id,
+                "analyzed_at": self.today.isoformat(),
+                "analysis": stored,
+            }
+            if is_new:
+                self._keys.append(key)
+                self._titles.add(article['title'], _article_words(article))
+
+    def prune(self):
+        retention = int(os.environ.get('ANALYSIS_STORE_RETENTION_DAYS', '56'))
+        with self._lock:
+            ages = {k: self._age_days(e) for k, e in self.entries.items()}
+            # 날짜를 해석할 수 없는 항목은 보존 기간을 판단할 수 없으므로 제거
+            self.entries = {
+                k: e for k, e in self.entries.items()
+                if ages[k] is not None and ages[k] <= retention
+            }
+            self._rebuild_index()
+
+    def save(self):
+        with self._lock:
+            _write_json_file(self.path, {"articles": self.entries})
+        logger.info(f"분석 저장소 업데이트: {self.path} ({len(self.entries)}건)")
 
 
 # ============================================================
@@ -680,16 +2865,23 @@ def make_smart_fallback(news_list, panel_id, error_type=None):
 # ============================================================
 # 8. Panel D — 비즈니스 리포트 (Phase 1)
 # ============================================================
-def generate_business_report(api_key, panel_a_news, panel_b_news, panel_c_news):
-    """3축(A·B·C) 교차 통합 비즈니스 리포트 생성 (Panel D) — 패널 개수별 동적 프롬프트."""
-    def fmt_panel(label, news):
-        lines = f"--- {label} ---\n"
-        for i, n in enumerate(news):
-            lines += f"[{i}] {n['title']} | {n['desc']}\n"
-        return lines
+def _report_prompt_parts(panel_a_news, panel_b_news, panel_c_news):
+    """Panel D 프롬프트 구성요소. 반환: (panel_count, framework, all_ctx).
 
+    뉴스 데이터는 GEMINI_REPORT_CONTEXT_TOKENS(기본 1200)를 활성 패널 수로 나눈 예산 안에서
+    패널당 최대 REPORT_MAX_PER_PANEL(기본 6)건, 요약은 GEMINI_REPORT_DESC_TOKENS(기본 60)로 압축합니다.
+    """
     # 패널 개수 계산
     panel_count = sum([len(panel_a_news) > 0, len(panel_b_news) > 0, len(panel_c_news) > 0])
+    per_panel = int(os.environ.get('GEMINI_REPORT_CONTEXT_TOKENS', '1200')) // max(panel_count, 1)
+
+    def fmt_panel(label, news):
+        ctx, _, _ = build_candidate_context(
+            news, per_panel,
+            max_items=int(os.environ.get('REPORT_MAX_PER_PANEL', '6')),
+            desc_tokens=int(os.environ.get('GEMINI_REPORT_DESC_TOKENS', '60')),
+        )
+        return f"--- {label} ---\n{ctx}"
 
     all_ctx = ""
     if panel_a_news:
@@ -712,8 +2904,7 @@ Layer 2 (Panel B): 한국은 어떻게 반응했/반응할 것인가?
 Layer 3 (Panel C): 오뚜기라면은 어디에 노출되었는가?
 통합 질문: 세 층위가 같은 방향으로 수렴(Converging)하는가, 상쇄(Diverging)하는가, 불확실(Ambiguous)한가?
 
-[필수 규칙]
-1. causal_narrative는 "A→B→C" 3층 인과 서사로 작성하세요."""
+[서사 규칙] causal_narrative는 "A→B→C" 3층 인과 서사로 작성하세요."""
     elif panel_count == 2:
         # 2층 분석: 두 층 사이의 인과관계
         framework = """[분석 프레임워크]
@@ -722,8 +2913,7 @@ Layer 3 (Panel C): 오뚜기라면은 어디에 노출되었는가?
 - MACRO→산업: 글로벌 이슈가 식품·제조산업에 미치는 영향
 - MICRO→산업: 한국 경제정책이 오뚜기라면에 미치는 영향
 
-[필수 규칙]
-1. causal_narrative는 "X→Y" 2층 인과 서사로 작성하세요."""
+[서사 규칙] causal_narrative는 "X→Y" 2층 인과 서사로 작성하세요."""
     else:
         # 1층 심화 분석: 단일 패널 deep-dive
         framework = """[분석 프레임워크]
@@ -732,42 +2922,347 @@ Layer 3 (Panel C): 오뚜기라면은 어디에 노출되었는가?
 - 가능한 대응 전략 3~4개 도출
 - 불확실 요소와 모니터링 대상 명시
 
-[필수 규칙]
-1. causal_narrative는 이슈의 구체적 전개와 영향을 한 문단으로 작성하세요."""
+[서사 규칙] causal_narrative는 이슈의 구체적 전개와 영향을 한 문단으로 작성하세요."""
 
-    prompt = f"""당신은 BCG/Goldman Sachs 30년 경력 수석 컨설턴트입니다.
+    return panel_count, framework, all_ctx
 
-[회사 컨텍스트]
-{COMPANY_CONTEXT}
 
-{framework}
-2. 반드시 아래 JSON 형식만 출력하세요. 마크다운 불가.
-3. 뉴스에 없는 사실·수치를 만들어내지 마세요. 추정 시 "(추정)" 명시.
-4. bluf: Bottom Line Up Front — 의사결정자가 가장 먼저 알아야 할 3문장.
-5. risks: 3개 이하.
-6. watch_list: 다음 주까지 모니터링할 구체적 지표 2~3개.
+_REPORT_FIELD_RULES = """- bluf: Bottom Line Up Front — 의사결정자가 가장 먼저 알아야 할 3문장.
+- risks: 3개 이하.
+- watch_list: 다음 주까지 모니터링할 구체적 지표 2~3개.
+- causal_narrative는 [서사 규칙]을 따르세요."""
+
+_REPORT_RULES = f"""[필수 규칙]
+- 반드시 아래 JSON 형식만 출력하세요. 마크다운 불가.
+- 뉴스에 없는 사실·수치를 만들어내지 마세요. 추정 시 "(추정)" 명시.
+{_REPORT_FIELD_RULES}"""
+
+
+def _valid_report(parsed):
+    """{"report": {...}} 또는 직접 {...} 응답을 스키마로 보정해 bluf·direction을 갖춘 리포트만 반환."""
+    if not isinstance(parsed, dict):
+        return None
+    report = parsed.get('report') if isinstance(parsed.get('report'), dict) else parsed
+    report = conform_to_schema(report, REPORT_RESPONSE_SCHEMA["properties"]["report"])
+    if report and report.get('bluf') and report.get('direction'):
+        return report
+    return None
+
+
+def generate_business_report(api_key, panel_a_news, panel_b_news, panel_c_news):
+    """3축(A·B·C) 교차 통합 비즈니스 리포트 생성 (Panel D) — 패널 개수별 동적 프롬프트."""
+    panel_count, framework, all_ctx = _report_prompt_parts(panel_a_news, panel_b_news, panel_c_news)
 
-{{"report": {_REPORT_SCHEMA}}}
+    prompt = f"""[과업 2] Panel D 비즈니스 리포트를 작성하세요.
+
+{framework}
 
 이번 주 뉴스 데이터:
 {all_ctx}"""
 
     logger.info(f"Panel D 비즈니스 리포트 생성 중 (패널 {panel_count}개)...")
-    raw, err = call_gemini(api_key, prompt)
+    prefix = _shared_prompt_prefix()
+    usage = {}
+    raw, err = call_gemini(api_key, prompt, response_schema=REPORT_RESPONSE_SCHEMA,
+                           cache_prefix=prefix, usage=usage,
+                           validate=lambda text: _valid_report(extract_json_from_text(text)) is not None)
+    _log_token_usage("Panel D", estimate_tokens(f"{prefix}\n\n{prompt}"), usage)
     if raw:
-        parsed = extract_json_from_text(raw)
-        if parsed:
-            # {"report": {...}} 또는 직접 {...} 형태 모두 처리
-            report = parsed.get('report') if isinstance(parsed.get('report'), dict) else parsed
-            if isinstance(report, dict) and report.get('bluf') and report.get('direction'):
-                logger.info(f"비즈니스 리포트 생성 완료: direction={report['direction']} (패널 {panel_count}개)")
-                return report
+        report = _valid_report(extract_json_from_text(raw))
+        if report:
+            logger.info(f"비즈니스 리포트 생성 완료: direction={report['direction']} (패널 {panel_count}개)")
+            return report
         logger.error(f"리포트 JSON 파싱 실패 — raw 앞 300자: {raw[:300]}")
     else:
         logger.error(f"Gemini 응답 없음 (generate_business_report): {err}")
     return None
 
 
+# ============================================================
+# 8-A. 패널 분석 스케줄러 (A/B/C/E + Panel D 동시 실행)
+# ============================================================
+def _analyze_with_fallback(api_key, news, panel_id, store=None):
+    """패널 1개 분석 + 실패 시 스마트 폴백. 반환: (articles, is_fallback).
+
+    스트리밍 모드에서는 기사별 수신 시점을 metrics(first_article, streamed_articles)에 기록합니다.
+    """
+    logger.info(f"3. AI 분석 시작 ({panel_id})...")
+    t0 = time.time()
+    streamed = []
+
+    def _on_article(item):
+        if not streamed:
+            metrics.observe("first_article", time.time() - t0, panel=panel_id)
+        streamed.append(item)
+        metrics.inc("streamed_articles", panel=panel_id)
+
+    on_article = _on_article if _gemini_stream_enabled() else None
+    result, err = analyze_panel(api_key, news, panel_id, store=store, on_article=on_article) if news else ([], None)
+    metrics.observe("panel_analysis", time.time() - t0, panel=panel_id)
+    logger.info(f"  {panel_id} 분석 완료: {time.time() - t0:.1f}s")
+    if result:
+        return result, False
+    metrics.inc("panel_fallbacks", panel=panel_id)
+    return make_smart_fallback(news, panel_id, err)
+
+
+def _batch_mode_enabled():
+    return os.environ.get('GEMINI_BATCH_MODE', 'off').lower() in ('1', 'true', 'on', 'yes')
+
+
+def analyze_batch(api_key, panel_candidates, report_inputs=None, reusable=None):
+    """모든 패널 후보(+ Panel D 리포트)를 단일 Gemini 호출로 분석.
+
+    COMPANY_CONTEXT·톤 규칙·스키마를 한 번만 보내 호출 수와 토큰을 줄입니다.
+    panel_candidates: {panel_id: (후보 기사 리스트, max_pick)}
+    reusable: {panel_id: {ref_id: 이전 분석}} — 해당 후보는 제목만 보내며 대체는 호출자(_run_batch)가 수행
+    반환: ({panel_id: 분석 리스트} — 응답에 유효하게 포함된 패널만, 리포트 또는 None).
+          항목이 있지만 모두 유효한 ref_id로 연결되지 않는 패널은 누락으로 취급합니다.
+    """
+    blocks, chosen = [], {}
+    for pid, (news_list, max_pick) in panel_candidates.items():
+        ctx, chosen[pid], _ = build_candidate_context(
+            news_list, **_panel_context_budget(), brief_ids=frozenset((reusable or {}).get(pid) or ())
+        )
+        blocks.append(
+            f"### {pid} — {PROFILE['panel_labels'].get(pid, pid)} (최대 {max_pick}개)\n"
+            f"[관점] {PROFILE['analyst_roles'].get(pid, '오뚜기라면 HR 전략 애널리스트')}\n"
+            f"[선정 기준]\n{PROFILE['selection_rules'].get(pid, '')}\n"
+            f"{_reuse_hint((reusable or {}).get(pid))}"
+            f"뉴스 후보:\n{ctx}"
+        )
+    panel_ids = list(panel_candidates)
+    panel_shape = ", ".join(
+        f'"{pid}": {{"articles": [{_ARTICLE_SCHEMA if i == 0 else "..."}]}}'
+        for i, pid in enumerate(panel_ids)
+    )
+
+    report_section, report_shape = "", ""
+    if report_inputs is not None:
+        _, framework, all_ctx = _report_prompt_parts(*report_inputs)
+        report_section = f"""
+=== Panel D 비즈니스 리포트 ===
+당신은 BCG/Goldman Sachs 30년 경력 수석 컨설턴트의 관점으로 report를 작성합니다.
+{framework}
+{_REPORT_FIELD_RULES}
+
+이번 주 뉴스 데이터:
+{all_ctx}
+"""
+        report_shape = f', "report": {_REPORT_SCHEMA}'
+
+    prompt = f"""당신은 오뚜기라면 전략 애널리스트 팀입니다. 패널별 담당 관점으로 뉴스 후보를 6단계 분석하세요.
+
+[독자] 과장·팀장급 이상 의사결정권자
+[톤] 보고서 형식, 경어체, 수식어 배제, 숫자·데이터·의사결정 포인트 중심
+
+[회사 컨텍스트]
+{COMPANY_CONTEXT}
+
+{_SIX_STEP_GUIDE}
+
+[중요 규칙]
+1. 반드시 아래 JSON 형식만 출력하세요. 다른 텍스트, 마크다운은 절대 포함하지 마세요.
+2. 뉴스에 없는 사실·수치를 만들어내지 마세요. 추정 시 "(추정)" 명시.
+3. ref_id는 해당 패널 후보 목록의 정수 번호입니다.
+4. panels에는 {", ".join(panel_ids)} 키를 모두 포함하고, 관련 뉴스가 없는 패널은 {{"articles": []}}로 두세요.
+5. 품질 우선: 1개라도 깊은 분석이 3개의 얕은 분석보다 낫습니다.
+
+{{"panels": {{{panel_shape}}}{report_shape}}}
+
+=== 패널별 후보 ===
+{chr(10).join(blocks)}{report_section}"""
+
+    logger.info(f"Gemini 배치 분석 중 (패널 {len(panel_ids)}개, 리포트 {'포함' if report_inputs is not None else '없음'})...")
+    max_tokens = int(os.environ.get('GEMINI_BATCH_MAX_OUTPUT_TOKENS', '16384'))
+    schema = {
+        "type": "OBJECT",
+        "properties": {"panels": {
+            "type": "OBJECT",
+            "properties": {pid: ARTICLES_RESPONSE_SCHEMA for pid in panel_ids},
+            "required": panel_ids,
+        }},
+        "required": ["panels"],
+    }
+    if report_inputs is not None:
+        schema["properties"]["report"] = REPORT_RESPONSE_SCHEMA["properties"]["report"]
+        schema["required"].append("report")
+    usage = {}
+
+    def _parse(text):
+        parsed = extract_json_from_text(text)
+        if not isinstance(parsed, dict):
+            return None
+        panels = parsed.get('panels') if isinstance(parsed.get('panels'), dict) else parsed
+        results = {}
+        for pid, (_, max_pick) in panel_candidates.items():
+            entry = panels.get(pid)
+            items = entry.get('articles') if isinstance(entry, dict) else entry
+            if not isinstance(items, list):
+                continue
+            mapped = _map_ref_ids(items, chosen[pid])[:max_pick]
+            if items and not mapped:
+                continue  # 모든 항목의 ref_id가 무효 → 응답 누락으로 보고 개별 호출로 재시도
+            results[pid] = mapped
+        report = _valid_report(parsed.get('report')) if report_inputs is not None else None
+        return results, report
+
+    def _valid(text):
+        parsed = _parse(text)
+        return parsed is not None and (any(parsed[0].values()) or parsed[1] is not None)
+
+    raw, err = call_gemini(api_key, prompt, max_output_tokens=max_tokens, response_schema=schema,
+                           usage=usage, validate=_valid)
+    _log_token_usage("배치", estimate_tokens(prompt), usage)
+    if not raw:
+        logger.error(f"Gemini 배치 호출 실패: {err}")
+        return {}, None
+    parsed = _parse(raw)
+    if parsed is None:
+        logger.error(f"배치 JSON 파싱 실패 — raw 앞 300자: {raw[:300]}")
+        return {}, None
+    return parsed
+
+
+def _run_batch(api_key, panel_news, report_inputs, store):
+    """배치 모드 실행. 반환: ({panel_id: (articles, is_fallback)}, 리포트 또는 None).
+
+    응답에 빠진 패널·리포트는 결과에서 제외되어 호출자가 개별 호출로 처리합니다.
+    """
+    results, candidates, reusable = {}, {}, {}
+    for pid, news in panel_news.items():
+        if not news:
+            results[pid] = make_smart_fallback(news, pid)
+            continue
+        _, chosen, _ = build_candidate_context(news, **_panel_context_budget())
+        reusable[pid] = _reusable_analyses(chosen, pid, store)
+        reused = _reused_selection(reusable[pid], 3)
+        if reused is not None:
+            results[pid] = (reused, False)
+            continue
+        candidates[pid] = (chosen, 3)
+    if not candidates and report_inputs is None:
+        return results, None
+
+    t0 = time.time()
+    batched, report = analyze_batch(api_key, candidates, report_inputs, reusable=reusable)
+    for pid, items in batched.items():
+        articles = _apply_reused(items, candidates[pid][0], reusable[pid], pid, store)
+        results[pid] = (articles, False) if articles else make_smart_fallback(panel_news[pid], pid)
+    missing = [pid for pid in candidates if pid not in batched]
+    logger.info(
+        f"  배치 분석 완료: {time.time() - t0:.1f}s — 패널 {len(batched)}/{len(candidates)}"
+        + (f", 리포트 {'성공' if report else '누락'}" if report_inputs is not None else "")
+        + (f" (개별 호출 폴백: {', '.join(missing)})" if missing else "")
+    )
+    return results, report
+
+
+def _news_fingerprint(*news_lists):
+    """기사 링크 목록 지문 — 재개 시 수집 결과가 바뀌었으면 저장된 분석을 버리기 위한 비교값."""
+    links = "\n".join(n.get('link', '') for news in news_lists for n in news)
+    return hashlib.sha1(links.encode("utf-8")).hexdigest()[:16]
+
+
+def _checkpoint_panel(checkpoint, pid, result, news):
+    """AI 분석에 성공한 패널 결과만 저장 (폴백은 이전 저장분까지 지우고 재개 시 다시 시도)."""
+    articles, is_fallback = result
+    if checkpoint is None:
+        return
+    if is_fallback:
+        checkpoint.discard(f"analysis_{pid}")
+    else:
+        checkpoint.save(f"analysis_{pid}", {"fingerprint": _news_fingerprint(news), "articles": articles})
+
+
+def _restore_checkpointed(checkpoint, stage, fingerprint, key):
+    """같은 입력(fingerprint)으로 저장된 결과만 반환. 없거나 입력이 바뀌었으면 None."""
+    if not checkpoint.has(stage):
+        return None
+    saved = checkpoint.load(stage)
+    if not isinstance(saved, dict) or saved.get("fingerprint") != fingerprint:
+        logger.info(f"  체크포인트 {stage}: 수집 결과가 달라 폐기")
+        checkpoint.discard(stage)
+        return None
+    return saved.get(key)
+
+
+def run_panel_analyses(api_key, panel_news, report_inputs=None, store=None, checkpoint=None):
+    """패널 분석과 Panel D 리포트를 동시에 제출하는 스케줄러.
+
+    고정 sleep 없이 GEMINI_MAX_CONCURRENCY(기본 5)개 워커로 실행하며, 실제 호출 속도는
+    call_gemini의 gemini_rate_limiter(GEMINI_RPM)가 제한하고 429가 발생할 때만 백오프합니다.
+    패널별 결과·폴백 처리는 서로 독립적입니다 (한 패널 예외가 다른 패널에 영향 없음).
+
+    panel_news: {panel_id: 필터된 기사 리스트}
+    report_inputs: (panel_a, panel_b, panel_c) 또는 None (리포트 생략)
+    store: AnalysisStore 또는 None (주차 간 기사 분석 재사용)
+    GEMINI_BATCH_MODE=on이면 먼저 analyze_batch 단일 호출을 시도하고, 응답에 빠진 패널·리포트만
+    아래 개별 호출로 보완합니다.
+    checkpoint: EditionCheckpoint 또는 None — 폴백이 아닌 패널 결과(analysis_<panel>)와 리포트
+    (business_report)를 입력 기사 지문과 함께 저장하고, 재개 시 지문이 같은 것만 다시 호출하지 않습니다.
+    반환: ({panel_id: (articles, is_fallback)}, business_report 또는 None)
+    """
+    results, business_report = {}, None
+    report_fingerprint = _news_fingerprint(*report_inputs) if report_inputs is not None else None
+    if checkpoint is not None:
+        for pid, news in panel_news.items():
+            saved = _restore_checkpointed(checkpoint, f"analysis_{pid}", _news_fingerprint(news), "articles")
+            if saved is not None:
+                results[pid] = (saved, False)
+        if report_inputs is not None:
+            business_report = _restore_checkpointed(checkpoint, "business_report", report_fingerprint, "report")
+        if results or business_report:
+            logger.info(f"  체크포인트 재사용: 패널 {sorted(results)}, 리포트 {'있음' if business_report else '없음'}")
+    pending = {pid: news for pid, news in panel_news.items() if pid not in results}
+    if _batch_mode_enabled() and (pending or (report_inputs is not None and business_report is None)):
+        batched, batch_report = _run_batch(
+            api_key, pending, report_inputs if business_report is None else None, store
+        )
+        results.update(batched)
+        business_report = business_report or batch_report
+        for pid in batched:
+            _checkpoint_panel(checkpoint, pid, batched[pid], panel_news[pid])
+    workers = max(1, int(os.environ.get('GEMINI_MAX_CONCURRENCY', '5')))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gemini") as pool:
+        futures = {
+            pid: pool.submit(_analyze_with_fallback, api_key, news, pid, store)
+            for pid, news in pending.items() if pid not in results
+        }
+        report_future = (
+            pool.submit(generate_business_report, api_key, *report_inputs)
+            if report_inputs is not None and business_report is None else None
+        )
+        panel_of = {future: pid for pid, future in futures.items()}
+        for future in as_completed(panel_of):
+            pid = panel_of[future]
+            try:
+                results[pid] = future.result()
+            except Exception as e:
+                logger.error(f"{pid} 분석 중 예기치 않은 오류: {e}")
+                results[pid] = make_smart_fallback(panel_news[pid], pid, str(e))
+            _checkpoint_panel(checkpoint, pid, results[pid], panel_news[pid])
+        if report_future is not None:
+            try:
+                business_report = report_future.result()
+            except Exception as e:
+                logger.error(f"비즈니스 리포트 생성 중 예기치 않은 오류: {e}")
+    if checkpoint is not None and business_report:
+        checkpoint.save("business_report", {"fingerprint": report_fingerprint, "report": business_report})
+    results = {pid: results[pid] for pid in panel_news}
+    gemini_context_cache.release(api_key)
+    stats = gemini_rate_limiter.stats()
+    with _gemini_breakers_lock:
+        tripped = [b.name for b in _gemini_breakers.values() if b.trips]
+    logger.info(
+        f"  Gemini 호출 {stats['requests']}건, 429 {stats['throttle_events']}회, "
+        f"속도 제한 대기 {stats['wait_seconds']}s, "
+        f"캐시 적중 {gemini_cache.hits}/미적중 {gemini_cache.misses}"
+        + (f", 브레이커 open: {', '.join(tripped)}" if tripped else "")
+    )
+    return results, business_report
+
+
 # ============================================================
 # 9. 품질 게이트 + 관리자 알림 (Phase 1)
 # ============================================================
@@ -919,29 +3414,24 @@ def check_company_news_reply(app_password):
 
 def fetch_company_fallback_news():
     """회신 없을 때: INDUSTRY_PROFILE의 company_news_keywords로 회사 뉴스 검색."""
-    client_id = os.environ.get('NAVER_CLIENT_ID')
-    client_secret = os.environ.get('NAVER_CLIENT_SECRET')
-    if not client_id or not client_secret:
+    headers = _naver_credentials()
+    if headers is None:
         return []
 
     keywords = PROFILE.get('company_news_keywords', ["오뚜기 신제품", "오뚜기라면 신제품", "오뚜기 출시"])
     filter_kw = PROFILE.get('company_filter_keyword', "오뚜기")
-    url = "https://openapi.naver.com/v1/search/news.json"
-    headers = {"X-Naver-Client-Id": client_id, "X-Naver-Client-Secret": client_secret}
     results = []
+    seen = make_near_dup_index()
     for kw in keywords:
         try:
-            resp = requests.get(
-                url, headers=headers,
-                params={"query": kw, "display": 5, "sort": "date"},
-                timeout=10
-            )
-            if resp.status_code == 200:
-                for item in resp.json().get('items', []):
+            status, items = _naver_search(headers, kw, display=5, timeout=10)
+            if status == 200:
+                for item in items:
                     t = clean_html(item['title'])
                     if filter_kw not in t:
                         continue
-                    if not is_near_duplicate(t, {r['title'] for r in results}):
+                    if not seen.is_duplicate(t):
+                        seen.add(t)
                         results.append({
                             "title": t,
                             "link": item.get('originallink') or item['link'],
@@ -1239,8 +3729,11 @@ background:#FFF;color:#333;">
 # ============================================================
 # 12. 이메일 발송 (복수 수신 지원)
 # ============================================================
-def send_email(app_password, recipients, subject, html):
-    """Gmail SMTP로 이메일 발송. 수신자별 try-except로 부분 실패 격리."""
+def send_email(app_password, recipients, subject, html, on_sent=None):
+    """Gmail SMTP로 이메일 발송. 수신자별 try-except로 부분 실패 격리.
+
+    on_sent: 수신자별 발송 성공 시 호출되는 콜백 (체크포인트 발송 기록용).
+    """
     failed = []
     for recipient in recipients:
         try:
@@ -1250,16 +3743,22 @@ def send_email(app_password, recipients, subject, html):
             msg['Subject'] = subject
             msg.attach(MIMEText(html, 'html', 'utf-8'))
 
-            with smtplib.SMTP_SSL("smtp.gmail.com", 465, timeout=30) as server:
+            with metrics.timer("smtp_send"), smtplib.SMTP_SSL("smtp.gmail.com", 465, timeout=30) as server:
                 server.login(SENDER_EMAIL, app_password)
                 server.sendmail(SENDER_EMAIL, recipient, msg.as_string())
+            metrics.inc("emails", outcome="sent")
+            metrics.inc("smtp_sent_bytes", len(msg.as_bytes()))
             logger.info(f"발송 완료: {recipient}")
+            if on_sent is not None:
+                on_sent(recipient)
         except smtplib.SMTPAuthenticationError as e:
             logger.error(f"SMTP 인증 실패 ({recipient}): {e}")
+            metrics.inc("emails", outcome="failed")
             failed.append(recipient)
             break  # 인증 실패 시 나머지도 실패할 것이므로 중단
         except (smtplib.SMTPException, OSError) as e:
             logger.error(f"발송 실패 ({recipient}): {e}")
+            metrics.inc("emails", outcome="failed")
             failed.append(recipient)
             continue  # 다음 수신자 시도
     if failed:
@@ -1275,6 +3774,8 @@ def validate_environment(mode='newsletter'):
     common = ['GMAIL_APP_PASSWORD']
     if mode == 'newsletter':
         required = common + ['GEMINI_API_KEY', 'NAVER_CLIENT_ID', 'NAVER_CLIENT_SECRET']
+    elif mode == 'replay':  # 수집·발송 없이 Gemini만 호출
+        required = ['GEMINI_API_KEY']
     else:  # weekend
         required = common
     missing = [v for v in required if not os.environ.get(v)]
@@ -1304,204 +3805,350 @@ def validate_profile_schema(profile_key, profile_dict):
 
 
 # ============================================================
-# 13. 메인 실행 (Phase 1 — 4-Panel Weekly)
+# 13-B. 에디션 체크포인트 (중단된 실행 재개)
 # ============================================================
-def run_newsletter():
-    """매주 수요일 뉴스레터 메인 실행 (4-Panel)."""
-    validate_environment('newsletter')
-    validate_profile_schema('FOOD_MFG', PROFILE)
-    api_key = os.environ.get('GEMINI_API_KEY')
-    app_password = os.environ.get('GMAIL_APP_PASSWORD')
-    recipient_str = os.environ.get('RECIPIENT_EMAILS', 'tjdaudwo21@otokirm.com')
-    recipients = [e.strip() for e in recipient_str.split(',') if e.strip()]
-    today_kst = datetime.datetime.now(KST)
-    today = today_kst.strftime("%Y년 %m월 %d일")
-    today_str = today_kst.strftime("%Y-%m-%d")
+CHECKPOINT_DIR = os.environ.get('BOT_CHECKPOINT_DIR', 'data/checkpoints')
 
-    # Step 1: 뉴스 수집
-    logger.info("1. 뉴스 수집 중...")
-    panel_a_news = fetch_news("PANEL_A", PROFILE["PANEL_A"])
-    panel_b_news = fetch_news("PANEL_B", PROFILE["PANEL_B"]) + fetch_rss_news("PANEL_B")
-    panel_c_news = fetch_news("PANEL_C", PROFILE["PANEL_C"])
-    panel_e_news = fetch_news("PANEL_E", PROFILE.get("PANEL_E", []))
-
-    # 수집 단계 카운터
-    a_fetched = len(panel_a_news)
-    b_fetched = len(panel_b_news)
-    c_fetched = len(panel_c_news)
-    e_fetched = len(panel_e_news)
-    logger.info(
-        f"수집 완료: Panel A {a_fetched}건, "
-        f"Panel B {b_fetched}건, Panel C {c_fetched}건, "
-        f"Panel E {e_fetched}건"
-    )
 
-    # Step 2: 관련도 필터링
-    logger.info("2. 관련도 필터링...")
-    panel_a_news = filter_by_relevance(panel_a_news, "PANEL_A")
-    panel_b_news = filter_by_relevance(panel_b_news, "PANEL_B")
-    panel_c_news = filter_by_relevance(panel_c_news, "PANEL_C")
-    panel_e_news = filter_by_relevance(panel_e_news, "PANEL_E")
-
-    # 필터링 후 카운터 및 필터율 계산
-    a_after_filter = len(panel_a_news)
-    b_after_filter = len(panel_b_news)
-    c_after_filter = len(panel_c_news)
-    e_after_filter = len(panel_e_news)
-
-    a_filter_rate = 0 if a_fetched == 0 else int(100 * (a_fetched - a_after_filter) / a_fetched)
-    b_filter_rate = 0 if b_fetched == 0 else int(100 * (b_fetched - b_after_filter) / b_fetched)
-    c_filter_rate = 0 if c_fetched == 0 else int(100 * (c_fetched - c_after_filter) / c_fetched)
-    e_filter_rate = 0 if e_fetched == 0 else int(100 * (e_fetched - e_after_filter) / e_fetched)
-
-    # 상위 3개 점수 추출
-    a_top_scores = [n.get('relevance_score', 0) for n in panel_a_news[:3]]
-    b_top_scores = [n.get('relevance_score', 0) for n in panel_b_news[:3]]
-    c_top_scores = [n.get('relevance_score', 0) for n in panel_c_news[:3]]
-    e_top_scores = [n.get('relevance_score', 0) for n in panel_e_news[:3]]
+class EditionCheckpoint:
+    """에디션(날짜)별 단계 결과 저장소: CHECKPOINT_DIR/<YYYY-MM-DD>/<stage>.json.
 
-    logger.info(
-        f"필터 후: Panel A {a_after_filter}건 (필터율 {a_filter_rate}%, 상위 점수 {a_top_scores}), "
-        f"Panel B {b_after_filter}건 (필터율 {b_filter_rate}%, 상위 점수 {b_top_scores}), "
-        f"Panel C {c_after_filter}건 (필터율 {c_filter_rate}%, 상위 점수 {c_top_scores}), "
-        f"Panel E {e_after_filter}건 (필터율 {e_filter_rate}%, 상위 점수 {e_top_scores})"
-    )
+    save()는 항상 기록하고, has()/load()는 resume=True일 때만 저장된 결과를 돌려줍니다.
+    발송 단계는 sent.json에 수신자별 성공을 기록해 재개 실행이 같은 수신자에게 다시 보내지 않게 합니다
+    (새 실행은 clear()로 이전 실행의 결과와 sent.json을 지우고 새로 기록).
+    """
 
-    # Step 3: 패널 간 교차 중복 제거 (Panel E는 독립적 분석)
-    panel_a_news, panel_b_news, panel_c_news = dedup_across_panels(
-        panel_a_news, panel_b_news, panel_c_news
-    )
-    logger.info(
-        f"필터 후: Panel A {len(panel_a_news)}건, "
-        f"Panel B {len(panel_b_news)}건, Panel C {len(panel_c_news)}건, "
-        f"Panel E {len(panel_e_news)}건"
-    )
+    def __init__(self, edition, base_dir=None, resume=False):
+        self.edition = edition
+        self.directory = os.path.join(base_dir or CHECKPOINT_DIR, edition)
+        self.resume = resume
+        self._lock = threading.Lock()
+        self._sent = None
 
-    # Step 4: Panel A AI 분석
-    logger.info("3. AI 분석 시작 (Panel A)...")
-    _t0 = time.time()
-    final_a, a_err = analyze_panel(api_key, panel_a_news[:6], "PANEL_A") if panel_a_news else ([], None)
-    logger.info(f"  Panel A 분석 완료: {time.time() - _t0:.1f}s")
-    a_is_fallback = False
-    if not final_a:
-        final_a, a_is_fallback = make_smart_fallback(panel_a_news, "PANEL_A", a_err)
-
-    # Step 5: Panel B AI 분석 — 8초 딜레이
-    logger.info("3. AI 분석 시작 (Panel B)...")
-    if panel_a_news:
-        time.sleep(8)
-    _t0 = time.time()
-    final_b, b_err = analyze_panel(api_key, panel_b_news[:6], "PANEL_B") if panel_b_news else ([], None)
-    logger.info(f"  Panel B 분석 완료: {time.time() - _t0:.1f}s")
-    b_is_fallback = False
-    if not final_b:
-        final_b, b_is_fallback = make_smart_fallback(panel_b_news, "PANEL_B", b_err)
-
-    # Step 6: Panel C AI 분석 — 8초 딜레이
-    logger.info("3. AI 분석 시작 (Panel C)...")
-    if panel_b_news:
-        time.sleep(8)
-    _t0 = time.time()
-    final_c, c_err = analyze_panel(api_key, panel_c_news[:6], "PANEL_C") if panel_c_news else ([], None)
-    logger.info(f"  Panel C 분석 완료: {time.time() - _t0:.1f}s")
-    c_is_fallback = False
-    if not final_c:
-        final_c, c_is_fallback = make_smart_fallback(panel_c_news, "PANEL_C", c_err)
-
-    # Step 6-B: Panel E AI 분석 (신규 - AI & 업무혁신) — 8초 딜레이
-    logger.info("3. AI 분석 시작 (Panel E)...")
-    if panel_c_news:
-        time.sleep(8)
-    final_e, e_err = analyze_panel(api_key, panel_e_news[:6], "PANEL_E") if panel_e_news else ([], None)
-    e_is_fallback = False
-    if not final_e:
-        final_e, e_is_fallback = make_smart_fallback(panel_e_news, "PANEL_E", e_err)
-
-    # Step 7: Panel D 비즈니스 리포트
-    total_articles = len(panel_a_news) + len(panel_b_news) + len(panel_c_news)
-    business_report = None
-    if total_articles >= 2:
-        logger.info("Gemini rate limit 보호: 10초 대기...")
-        time.sleep(10)
-        business_report = generate_business_report(
-            api_key, panel_a_news[:4], panel_b_news[:4], panel_c_news[:4]
-        )
-    else:
-        logger.info(f"비즈니스 리포트 스킵: 기사 {total_articles}건 (최소 2건 필요)")
+    def _path(self, stage):
+        return os.path.join(self.directory, f"{stage}.json")
 
-    # Step 8: 품질 게이트
-    logger.info("4. 품질 게이트 검증...")
-    panel_results = {"PANEL_A": final_a, "PANEL_B": final_b, "PANEL_C": final_c, "PANEL_E": final_e}
-    panel_is_fallback = {"PANEL_A": a_is_fallback, "PANEL_B": b_is_fallback, "PANEL_C": c_is_fallback, "PANEL_E": e_is_fallback}
-    should_send, edition_type, warnings = quality_gate(panel_results, panel_is_fallback, business_report)
-    for w in warnings:
-        logger.warning(w)
-
-    if not should_send:
-        send_admin_alert(app_password, warnings)
-        logger.warning("뉴스레터 발송 중단 (품질 게이트)")
-        return
+    def has(self, stage):
+        return self.resume and os.path.exists(self._path(stage))
+
+    def load(self, stage):
+        data = _read_json_file(self._path(stage)) if self.resume else None
+        return data.get("value") if data else None
+
+    def save(self, stage, value):
+        try:
+            _write_json_file(self._path(stage), {
+                "stage": stage,
+                "saved_at": datetime.datetime.now(KST).isoformat(),
+                "value": value,
+            })
+        except (OSError, TypeError, ValueError) as e:
+            logger.error(f"체크포인트 저장 실패 ({stage}): {e}")
+
+    def discard(self, stage):
+        try:
+            os.remove(self._path(stage))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.error(f"체크포인트 삭제 실패 ({stage}): {e}")
+
+    def clear(self):
+        """이 에디션의 저장 결과 전체 삭제 (재개가 아닌 새 실행 시작 시)."""
+        with self._lock:
+            self._sent = None
+            if os.path.isdir(self.directory):
+                self._remove_dir(self.directory)
+
+    @staticmethod
+    def _remove_dir(path):
+        for f in os.scandir(path):
+            os.remove(f.path)
+        os.rmdir(path)
+
+    def _sent_ledger(self):
+        if self._sent is None:
+            data = _read_json_file(self._path("sent")) if self.resume else None
+            self._sent = set((data or {}).get("value") or [])
+        return self._sent
+
+    def sent_recipients(self):
+        with self._lock:
+            return set(self._sent_ledger())
+
+    def mark_sent(self, recipient):
+        with self._lock:
+            self._sent_ledger().add(recipient)
+            self.save("sent", sorted(self._sent))
+
+    @staticmethod
+    def prune(base_dir=None, keep_days=None, keep=()):
+        """보존 기간(CHECKPOINT_RETENTION_DAYS, 기본 14일)이 지난 에디션 디렉터리 삭제 (keep 에디션 제외)."""
+        base_dir = base_dir or CHECKPOINT_DIR
+        keep_days = keep_days if keep_days is not None else int(os.environ.get('CHECKPOINT_RETENTION_DAYS', '14'))
+        cutoff = (datetime.datetime.now(KST) - datetime.timedelta(days=keep_days)).strftime("%Y-%m-%d")
+        if not os.path.isdir(base_dir):
+            return
+        for entry in os.scandir(base_dir):
+            if entry.name in keep:
+                continue
+            if entry.is_dir() and re.fullmatch(r'\d{4}-\d{2}-\d{2}', entry.name) and entry.name < cutoff:
+                EditionCheckpoint._remove_dir(entry.path)
+
+
+def _resume_edition():
+    """재개 대상 에디션. --resume [YYYY-MM-DD] 인자 또는 BOT_RESUME(1/true 또는 날짜). 미지정 시 None."""
+    value = os.environ.get('BOT_RESUME', '').strip()
+    if '--resume' in sys.argv:
+        idx = sys.argv.index('--resume')
+        nxt = sys.argv[idx + 1] if idx + 1 < len(sys.argv) else ''
+        value = nxt if re.fullmatch(r'\d{4}-\d{2}-\d{2}', nxt) else (value or '1')
+    if not value or value.lower() in ('0', 'false', 'off', 'no'):
+        return None
+    if re.fullmatch(r'\d{4}-\d{2}-\d{2}', value):
+        return value
+    return datetime.datetime.now(KST).strftime("%Y-%m-%d")
 
-    if edition_type == "light":
-        send_admin_alert(app_password, warnings)
 
-    # Step 9: 회사 소식
+# ============================================================
+# 13. 메인 실행 (Phase 1 — 4-Panel Weekly)
+# ============================================================
+def _company_section_html(app_password):
+    """회사 소식 섹션 HTML — IMAP 회신 우선, 없으면 오뚜기 신제품 뉴스 검색."""
     logger.info("5. 회사 소식 확인 중...")
     company_reply = check_company_news_reply(app_password)
     if company_reply:
         logger.info("회신 발견 → 회사 소식 삽입")
-        company_html = (
+        return (
             f'<div style="font-size:14px;color:#333;line-height:1.8;">'
             f'{company_reply.replace(chr(10), "<br>")}</div>'
         )
+    logger.info("회신 없음 → 오뚜기 신제품 뉴스 검색")
+    fallback_news = fetch_company_fallback_news()
+    if not fallback_news:
+        return _NO_COMPANY_NEWS_HTML
+    items_html = ""
+    for n in fallback_news:
+        items_html += (
+            f'<div style="margin-bottom:12px;">'
+            f'<a href="{n["link"]}" target="_blank" '
+            f'style="font-size:14px;color:#111;text-decoration:none;font-weight:600;">'
+            f'{n["title"]}</a>'
+            f'<div style="font-size:13px;color:#666;margin-top:4px;line-height:1.6;">'
+            f'{n["desc"]}</div></div>'
+        )
+    return items_html
+
+
+_NO_COMPANY_NEWS_HTML = '<p style="color:#999;font-size:13px;">금주 회사 소식이 없습니다.</p>'
+
+_PANEL_IDS = ("PANEL_A", "PANEL_B", "PANEL_C", "PANEL_E")
+
+
+def run_newsletter():
+    """매주 수요일 뉴스레터 메인 실행 (4-Panel).
+
+    StageGraph로 실행합니다: 회사 소식(IMAP·Naver)은 수집·분석과 독립적으로 동시에 진행되고,
+    패널 분석과 Panel D 리포트는 analyses 노드 안에서 함께 스케줄됩니다 (run_panel_analyses).
+    모든 단계 결과는 data/checkpoints/<날짜>/에 저장되며, --resume(또는 BOT_RESUME)으로 재실행하면
+    완료된 단계는 건너뛰고 이미 발송된 수신자에게는 다시 보내지 않습니다. 폴백 패널이 섞인 분석과
+    품질 게이트가 막은 결과는 저장하지 않으므로 재개 시 분석부터 다시 시도합니다.
+    실행 메트릭(단계·외부 호출별 소요 시간, 바이트, 재시도, 캐시 적중, 패널 결과)은 실패해도
+    METRICS_DIR/<날짜>.json · .prom으로 기록됩니다. BOT_PROFILE=cpu|mem이면 단계별 프로파일을
+    PROFILE_DIR/<날짜>/에 남깁니다 (StageProfiler).
+    """
+    validate_environment('newsletter')
+    validate_profile_schema('FOOD_MFG', PROFILE)
+    api_key = os.environ.get('GEMINI_API_KEY')
+    app_password = os.environ.get('GMAIL_APP_PASSWORD')
+    recipient_str = os.environ.get('RECIPIENT_EMAILS', 'tjdaudwo21@otokirm.com')
+    recipients = [e.strip() for e in recipient_str.split(',') if e.strip()]
+    resume_edition = _resume_edition()
+    today_kst = datetime.datetime.now(KST)
+    if resume_edition:
+        today_kst = datetime.datetime.strptime(resume_edition, "%Y-%m-%d").replace(tzinfo=KST)
+    today = today_kst.strftime("%Y년 %m월 %d일")
+    today_str = today_kst.strftime("%Y-%m-%d")
+    EditionCheckpoint.prune(keep=(today_str,))
+    checkpoint = EditionCheckpoint(today_str, resume=resume_edition is not None)
+    if checkpoint.resume:
+        logger.info(f"재개 모드: {checkpoint.directory}의 완료 단계를 재사용합니다")
     else:
-        logger.info("회신 없음 → 오뚜기 신제품 뉴스 검색")
-        fallback_news = fetch_company_fallback_news()
-        if fallback_news:
-            items_html = ""
-            for n in fallback_news:
-                items_html += (
-                    f'<div style="margin-bottom:12px;">'
-                    f'<a href="{n["link"]}" target="_blank" '
-                    f'style="font-size:14px;color:#111;text-decoration:none;font-weight:600;">'
-                    f'{n["title"]}</a>'
-                    f'<div style="font-size:13px;color:#666;margin-top:4px;line-height:1.6;">'
-                    f'{n["desc"]}</div></div>'
-                )
-            company_html = items_html
+        checkpoint.clear()
+
+    # Step 1~3: 수집 → 관련도 필터 → 교차 중복 제거 (스트리밍, Panel E는 독립적 분석)
+    def collect():
+        logger.info("1. 뉴스 수집 + 관련도 필터링 (스트리밍)...")
+        panel_news, panel_stats = collect_panels(
+            {
+                "PANEL_A": PROFILE["PANEL_A"],
+                "PANEL_B": PROFILE["PANEL_B"],
+                "PANEL_C": PROFILE["PANEL_C"],
+                "PANEL_E": PROFILE.get("PANEL_E", []),
+            },
+            extra_sources={"PANEL_B": lambda: fetch_rss_news("PANEL_B")},
+        )
+        return panel_news, panel_stats
+
+    def restore_collect(value):
+        panel_news, panel_stats = value
+        return {pid: [ArticleRecord.from_dict(d) for d in news] for pid, news in panel_news.items()}, panel_stats
+
+    # 수집 단계 카운터 및 필터율 (교차 중복 제거 전 기준) + 상위 3개 점수
+    def collect_stats(collect):
+        panel_news, panel_stats = collect
+        stats = {}
+        for pid in _PANEL_IDS:
+            st = panel_stats[pid]
+            fetched = st.get('fetched', 0)
+            removed = st.get('excluded', 0) + st.get('below_min', 0)
+            stats[pid] = {
+                "fetched": fetched,
+                "filter_rate": 0 if fetched == 0 else int(100 * removed / fetched),
+                "top_scores": [n.get('relevance_score', 0) for n in panel_news[pid][:3]],
+                "kept": len(panel_news[pid]),
+            }
+        logger.info("필터 후: " + ", ".join(
+            f"Panel {pid[-1]} {st['kept']}건 (필터율 {st['filter_rate']}%, 상위 점수 {st['top_scores']})"
+            for pid, st in stats.items()
+        ))
+        return stats
+
+    # Step 4~7: 패널 A/B/C/E 분석 + Panel D 비즈니스 리포트 동시 실행 (RPM 예산 내)
+    def analyses(collect):
+        panel_news, _ = collect
+        panel_a_news, panel_b_news, panel_c_news = (panel_news[p] for p in ("PANEL_A", "PANEL_B", "PANEL_C"))
+        total_articles = len(panel_a_news) + len(panel_b_news) + len(panel_c_news)
+        report_inputs = None
+        if total_articles >= 2:
+            report_inputs = (panel_a_news, panel_b_news, panel_c_news)
         else:
-            company_html = '<p style="color:#999;font-size:13px;">금주 회사 소식이 없습니다.</p>'
+            logger.info(f"비즈니스 리포트 스킵: 기사 {total_articles}건 (최소 2건 필요)")
+        analysis_store = AnalysisStore.load()
+        reset_gemini_run()
+        results, business_report = run_panel_analyses(
+            api_key, {pid: panel_news[pid] for pid in _PANEL_IDS}, report_inputs,
+            store=analysis_store, checkpoint=checkpoint,
+        )
+        try:
+            analysis_store.prune()
+            analysis_store.save()
+        except OSError as e:
+            logger.error(f"분석 저장소 저장 실패: {e}")
+        return results, business_report
+
+    # Step 8: 품질 게이트
+    def gate(analyses):
+        results, business_report = analyses
+        logger.info("4. 품질 게이트 검증...")
+        panel_results = {pid: results[pid][0] for pid in _PANEL_IDS}
+        panel_is_fallback = {pid: results[pid][1] for pid in _PANEL_IDS}
+        should_send, edition_type, warnings = quality_gate(panel_results, panel_is_fallback, business_report)
+        for w in warnings:
+            logger.warning(w)
+        if not should_send:
+            send_admin_alert(app_password, warnings)
+            logger.warning("뉴스레터 발송 중단 (품질 게이트)")
+        elif edition_type == "light":
+            send_admin_alert(app_password, warnings)
+        return should_send, edition_type
+
+    # Step 9: 회사 소식 (수집·분석과 독립)
+    def company():
+        return _company_section_html(app_password)
 
     # Step 10: JSON 저장
-    save_report_json(
-        today_str,
-        final_a, final_b, final_c, business_report, final_e,
-        raw_a=panel_a_news, raw_b=panel_b_news, raw_c=panel_c_news, raw_e=panel_e_news,
-    )
+    def save_json(collect, analyses, gate):
+        if not gate[0]:
+            return None
+        panel_news, _ = collect
+        results, business_report = analyses
+        save_report_json(
+            today_str,
+            results["PANEL_A"][0], results["PANEL_B"][0], results["PANEL_C"][0],
+            business_report, results["PANEL_E"][0],
+            raw_a=panel_news["PANEL_A"], raw_b=panel_news["PANEL_B"],
+            raw_c=panel_news["PANEL_C"], raw_e=panel_news["PANEL_E"],
+        )
+        return today_str
 
     # Step 11: HTML 생성 & 발송
-    logger.info("6. HTML 생성 & 발송...")
-    html = build_html(today, final_a, final_b, final_c, business_report, final_e, company_html)
-    if edition_type == "light":
-        subject = f"[{today}] Weekly HR Brief (Light) - 오뚜기라면"
-    else:
-        subject = f"[{today}] Weekly HR Strategic Intelligence - 오뚜기라면"
-    failed_recipients = send_email(app_password, recipients, subject, html)
+    def render(analyses, gate, company):
+        should_send, edition_type = gate
+        if not should_send:
+            return None
+        results, business_report = analyses
+        logger.info("6. HTML 생성 & 발송...")
+        html = build_html(
+            today, results["PANEL_A"][0], results["PANEL_B"][0], results["PANEL_C"][0],
+            business_report, results["PANEL_E"][0], company,
+        )
+        if edition_type == "light":
+            subject = f"[{today}] Weekly HR Brief (Light) - 오뚜기라면"
+        else:
+            subject = f"[{today}] Weekly HR Strategic Intelligence - 오뚜기라면"
+        return {"subject": subject, "html": html}
 
-    # [RUN SUMMARY] 구조화 실행 요약 (필터링 통계 + Panel E)
-    fallback_count = sum([a_is_fallback, b_is_fallback, c_is_fallback, e_is_fallback])
-    send_result = "ok" if not failed_recipients else f"failed={failed_recipients}"
-    logger.info(
-        f"[RUN SUMMARY] "
-        f"수집=A{a_fetched}/B{b_fetched}/C{c_fetched}/E{e_fetched} "
-        f"필터율=A{a_filter_rate}%/B{b_filter_rate}%/C{c_filter_rate}%/E{e_filter_rate}% "
-        f"상위점수=A{a_top_scores}/B{b_top_scores}/C{c_top_scores}/E{e_top_scores} "
-        f"패널결과=A{len(final_a)}/B{len(final_b)}/C{len(final_c)}/E{len(final_e)} "
-        f"폴백={fallback_count} report={'ok' if business_report else 'skip'} "
-        f"edition={edition_type} 발송={send_result}"
+    # 발송은 체크포인트로 건너뛰지 않고, sent.json에 기록된 수신자만 제외
+    def send(render):
+        if render is None:
+            return None
+        already_sent = checkpoint.sent_recipients()
+        pending = [r for r in recipients if r not in already_sent]
+        if already_sent:
+            logger.info(f"이미 발송된 수신자 {len(recipients) - len(pending)}명 제외")
+        return send_email(app_password, pending, render["subject"], render["html"],
+                          on_sent=checkpoint.mark_sent)
+
+    profiler = StageProfiler.from_env(today_str)
+    graph = (
+        StageGraph("newsletter", checkpoint=checkpoint, profiler=profiler)
+        .add("collect", collect, restore=restore_collect)
+        .add("collect_stats", collect_stats, deps=("collect",))
+        .add("analyses", analyses, deps=("collect",),
+             persist=lambda r: not any(is_fallback for _, is_fallback in r[0].values()))
+        .add("gate", gate, deps=("analyses",), persist=lambda r: r[0])
+        .add("company", company, timeout=int(os.environ.get('COMPANY_NEWS_TIMEOUT', '180')),
+             default=_NO_COMPANY_NEWS_HTML)
+        .add("save_json", save_json, deps=("collect", "analyses", "gate"), persist=lambda r: r is not None)
+        .add("render", render, deps=("analyses", "gate", "company"), persist=lambda r: r is not None)
+        .add("send", send, deps=("render",), persist=False)
     )
-    logger.info("뉴스레터 발송 완료")
-    logger.info("뉴스레터 발송 완료")
+    metrics.reset()
+    try:
+        out = graph.run()
+        logger.info(f"[STAGES] {graph.summary()}")
+        _record_run_metrics(out)
+    finally:
+        _record_limiter_metrics()
+        metrics.write(today_str, resumed=graph.restored, stage_errors=graph.errors)
+        if profiler is not None:
+            profiler.close()
+    if out["gate"][0]:
+        logger.info("뉴스레터 발송 완료")
+
+
+def _record_run_metrics(out):
+    """run_newsletter 결과(수집 통계·패널 결과·에디션·발송 실패)를 metrics 게이지로 기록."""
+    results, business_report = out["analyses"]
+    for pid, st in out["collect_stats"].items():
+        metrics.gauge("articles_fetched", st["fetched"], panel=pid)
+        metrics.gauge("articles_kept", st["kept"], panel=pid)
+        metrics.gauge("filter_rate_percent", st["filter_rate"], panel=pid)
+        metrics.gauge("top_relevance_score", max(st["top_scores"], default=0), panel=pid)
+    for pid in _PANEL_IDS:
+        metrics.gauge("panel_articles", len(results[pid][0]), panel=pid)
+        metrics.gauge("panel_fallback", results[pid][1], panel=pid)
+    metrics.gauge("business_report", bool(business_report))
+    metrics.gauge("edition", 1, type=out["gate"][1])
+    metrics.gauge("send_failed_recipients", len(out.get("send") or []))
+
+
+def _record_limiter_metrics():
+    """공유 속도 제한기 통계(요청·429·대기 시간·현재 속도)를 metrics 게이지로 기록."""
+    for limiter in (naver_rate_limiter, gemini_rate_limiter):
+        for key, value in limiter.stats().items():
+            metrics.gauge(f"rate_limiter_{key}", value, api=limiter.name)
 
 
 def run_weekend_request():
@@ -1515,15 +4162,16 @@ def run_weekend_request():
 # 14. JSON 저장 (Phase 1 신규 — Phase 2 웹 대시보드 연동 준비)
 # ============================================================
 def save_report_json(today_str, panel_a, panel_b, panel_c, business_report, panel_e=None,
-                     raw_a=None, raw_b=None, raw_c=None, raw_e=None):
+                     raw_a=None, raw_b=None, raw_c=None, raw_e=None, base_dir="data/reports"):
     """data/reports/YYYY-MM-DD.json 저장 및 index.json 업데이트.
 
     raw_a/b/c/e: 관련도 필터 + 교차 중복 제거 후, AI 선정 이전의 전체 수집 기사.
                  Phase 2 기사 스크랩 창고(/articles) 및 NotebookLM 공급용.
     panel_e: Panel E (AI & 업무혁신) — Phase 1.1 신규
+    base_dir: 저장 디렉터리 (리플레이는 아카이브 대신 별도 출력 디렉터리에 기록)
     """
     try:
-        os.makedirs("data/reports", exist_ok=True)
+        os.makedirs(base_dir, exist_ok=True)
         report = {
             "date": today_str,
             "generated_at": datetime.datetime.now(KST).isoformat(),
@@ -1539,13 +4187,13 @@ def save_report_json(today_str, panel_a, panel_b, panel_c, business_report, pane
             "panel_d": business_report,
             "panel_e": panel_e or [],
         }
-        report_path = f"data/reports/{today_str}.json"
+        report_path = os.path.join(base_dir, f"{today_str}.json")
         with open(report_path, "w", encoding="utf-8") as f:
-            json.dump(report, f, ensure_ascii=False, indent=2)
+            json.dump(report, f, ensure_ascii=False, indent=2, default=_json_default)
         logger.info(f"JSON 저장 완료: {report_path}")
 
         # index.json 업데이트 (최신 52개 유지)
-        index_path = "data/reports/index.json"
+        index_path = os.path.join(base_dir, "index.json")
         if os.path.exists(index_path):
             with open(index_path, "r", encoding="utf-8") as f:
                 index = json.load(f)
@@ -1587,12 +4235,12 @@ def save_report_json(today_str, panel_a, panel_b, panel_c, business_report, pane
         logger.info("index.json 업데이트 완료")
 
         # latest.md 생성 (NotebookLM raw URL 소비용)
-        generate_latest_md(today_str, panel_a, panel_b, panel_c, business_report)
+        generate_latest_md(today_str, panel_a, panel_b, panel_c, business_report, base_dir=base_dir)
     except Exception as e:
         logger.error(f"JSON 저장 실패: {e}")
 
 
-def generate_latest_md(today_str, panel_a, panel_b, panel_c, business_report):
+def generate_latest_md(today_str, panel_a, panel_b, panel_c, business_report, base_dir="data/reports"):
     """data/reports/latest.md 생성 — NotebookLM이 raw URL로 소비 가능한 최신 리포트 요약."""
     try:
         panel_labels = {
@@ -1645,7 +4293,7 @@ def generate_latest_md(today_str, panel_a, panel_b, panel_c, business_report):
             if watch:
                 lines.append(f"\n**감시 지표:** {', '.join(watch)}")
 
-        md_path = "data/reports/latest.md"
+        md_path = os.path.join(base_dir, "latest.md")
         with open(md_path, "w", encoding="utf-8") as f:
             f.write("\n".join(lines) + "\n")
         logger.info(f"latest.md 생성 완료: {md_path}")
@@ -1653,9 +4301,124 @@ def generate_latest_md(today_str, panel_a, panel_b, panel_c, business_report):
         logger.error(f"latest.md 생성 실패: {e}")
 
 
+# ============================================================
+# 15. 리플레이 (아카이브 raw_articles 재분석 — 지연 회귀·프롬프트 벤치마크)
+# ============================================================
+def run_replay(report_date=None, report_dir="data/reports", output_dir=None):
+    """아카이브 리포트의 raw_articles로 분석·게이트·렌더링·저장을 재실행 (수집·메일 발송 없음).
+
+    report_date: REPLAY_DATE 환경변수 또는 인자 (YYYY-MM-DD, 생략 시 최신 아카이브)
+    output_dir: REPLAY_OUTPUT_DIR 또는 인자 (기본 data/replay/<날짜>) — JSON·latest.md·newsletter.html·
+                replay_summary.json(단계별 소요 시간 포함)을 기록하며 data/reports는 건드리지 않습니다.
+    동일 입력 재현을 위해 주간 분석 저장소(AnalysisStore)는 사용하지 않습니다. 응답 캐시까지 배제한
+    실제 지연을 재려면 GEMINI_CACHE=off로 실행하세요. BOT_PROFILE=cpu|mem이면 단계별 프로파일을
+    <output_dir>/profiles/<날짜>/에 남깁니다. 실행 메트릭은 실패해도 <output_dir>/metrics/에 기록됩니다.
+    반환: replay_summary dict
+    """
+    validate_environment('replay')
+    api_key = os.environ.get('GEMINI_API_KEY')
+    report_date = report_date or os.environ.get('REPLAY_DATE')
+    if not report_date:
+        archived = sorted(glob.glob(os.path.join(report_dir, "[0-9]*.json")))
+        if not archived:
+            raise FileNotFoundError(f"리플레이할 아카이브 리포트가 없습니다: {report_dir}")
+        report_date = os.path.splitext(os.path.basename(archived[-1]))[0]
+    report = _read_json_file(os.path.join(report_dir, f"{report_date}.json"))
+    if not report or "raw_articles" not in report:
+        raise FileNotFoundError(f"raw_articles가 있는 아카이브 리포트 없음: {report_date}")
+    output_dir = output_dir or os.environ.get('REPLAY_OUTPUT_DIR') or os.path.join("data", "replay", report_date)
+    raw = report["raw_articles"]
+    panel_news = {
+        pid: [ArticleRecord.from_dict(d) for d in raw.get(pid.lower(), [])] for pid in _PANEL_IDS
+    }
+    today = datetime.datetime.strptime(report_date, "%Y-%m-%d").strftime("%Y년 %m월 %d일")
+    logger.info(
+        f"리플레이: {report_date} → {output_dir} ("
+        + ", ".join(f"Panel {pid[-1]} {len(news)}건" for pid, news in panel_news.items()) + ")"
+    )
+
+    def analyses():
+        report_inputs = tuple(panel_news[p] for p in ("PANEL_A", "PANEL_B", "PANEL_C"))
+        if sum(len(n) for n in report_inputs) < 2:
+            report_inputs = None
+        reset_gemini_run()
+        return run_panel_analyses(api_key, panel_news, report_inputs)
+
+    def gate(analyses):
+        results, business_report = analyses
+        should_send, edition_type, warnings = quality_gate(
+            {pid: results[pid][0] for pid in _PANEL_IDS},
+            {pid: results[pid][1] for pid in _PANEL_IDS},
+            business_report,
+        )
+        for w in warnings:
+            logger.warning(w)
+        return should_send, edition_type
+
+    def render(analyses):
+        results, business_report = analyses
+        html = build_html(
+            today, results["PANEL_A"][0], results["PANEL_B"][0], results["PANEL_C"][0],
+            business_report, results["PANEL_E"][0], _NO_COMPANY_NEWS_HTML,
+        )
+        os.makedirs(output_dir, exist_ok=True)
+        with open(os.path.join(output_dir, "newsletter.html"), "w", encoding="utf-8") as f:
+            f.write(html)
+        return len(html)
+
+    def save_json(analyses):
+        results, business_report = analyses
+        save_report_json(
+            report_date,
+            results["PANEL_A"][0], results["PANEL_B"][0], results["PANEL_C"][0],
+            business_report, results["PANEL_E"][0],
+            raw_a=panel_news["PANEL_A"], raw_b=panel_news["PANEL_B"],
+            raw_c=panel_news["PANEL_C"], raw_e=panel_news["PANEL_E"],
+            base_dir=output_dir,
+        )
+
+    metrics.reset()
+    profiler = StageProfiler.from_env(report_date, base_dir=os.path.join(output_dir, "profiles"))
+    graph = (
+        StageGraph("replay", profiler=profiler)
+        .add("analyses", analyses)
+        .add("gate", gate, deps=("analyses",))
+        .add("render", render, deps=("analyses",))
+        .add("save_json", save_json, deps=("analyses",))
+    )
+    try:
+        out = graph.run()
+        logger.info(f"[STAGES] {graph.summary()}")
+        results, business_report = out["analyses"]
+        summary = {
+            "report_date": report_date,
+            "replayed_at": datetime.datetime.now(KST).isoformat(),
+            "stage_seconds": dict(graph.timings),
+            "articles": {pid: len(panel_news[pid]) for pid in _PANEL_IDS},
+            "panel_results": {pid: len(results[pid][0]) for pid in _PANEL_IDS},
+            "fallback": {pid: results[pid][1] for pid in _PANEL_IDS},
+            "report": bool(business_report),
+            "edition": out["gate"][1],
+            "html_bytes": out["render"],
+        }
+        _write_json_file(os.path.join(output_dir, "replay_summary.json"), summary)
+    finally:
+        _record_limiter_metrics()
+        metrics.write(report_date, base_dir=os.path.join(output_dir, "metrics"), replay=True,
+                      stage_errors=graph.errors)
+        if profiler is not None:
+            profiler.close()
+    logger.info(f"리플레이 완료: {output_dir}")
+    return summary
+
+
 if __name__ == "__main__":
     mode = os.environ.get('BOT_MODE', 'newsletter')
     if mode == 'weekend_request':
         run_weekend_request()
+    elif mode == 'neardup_report':
+        logger.info(json.dumps(near_dup_report(), ensure_ascii=False, indent=2))
+    elif mode == 'replay':
+        run_replay()
     else:
         run_newsletter()
@@ -2,8 +2,11 @@
 핵심 순수 함수 단위 테스트 — 외부 API 호출 없음.
 실행: python3 -m unittest discover tests/
 """
+import datetime
+import json
 import os
 import sys
+import tempfile
 import unittest
 from unittest.mock import patch
 import requests
@@ -15,10 +18,27 @@ os.environ.setdefault('GEMINI_API_KEY', 'test')
 os.environ.setdefault('GMAIL_APP_PASSWORD', 'test')
 os.environ.setdefault('NAVER_CLIENT_ID', 'test')
 os.environ.setdefault('NAVER_CLIENT_SECRET', 'test')
+os.environ.setdefault('BOT_CACHE_DIR', tempfile.mkdtemp(prefix='hr_brief_test_cache_'))
+os.environ.setdefault('BOT_CHECKPOINT_DIR', tempfile.mkdtemp(prefix='hr_brief_test_ckpt_'))
+os.environ.setdefault('BOT_METRICS_DIR', tempfile.mkdtemp(prefix='hr_brief_test_metrics_'))
+os.environ.setdefault('GEMINI_CACHE', 'off')  # 캐시 테스트는 patch.dict로 개별 활성화
+os.environ.setdefault('GEMINI_RPM', '6000')    # 테스트 간 공유 속도 제한 대기 방지
 
 import newsletter_bot as nb
 
 
+def _json_response(body, status=200):
+    """requests 응답 MagicMock (json() → body, text → 직렬화된 body)."""
+    res = unittest.mock.MagicMock(status_code=status, text=json.dumps(body))
+    res.json.return_value = body
+    return res
+
+
+def _gemini_response(text='{"articles": []}', **extra):
+    """generateContent 응답 MagicMock — candidates[0]의 텍스트가 text (extra는 usageMetadata 등)."""
+    return _json_response({"candidates": [{"content": {"parts": [{"text": text}]}}], **extra})
+
+
 class TestExtractJsonFromText(unittest.TestCase):
     def test_plain_json(self):
         result = nb.extract_json_from_text('{"key": "value"}')
@@ -41,22 +61,111 @@ class TestExtractJsonFromText(unittest.TestCase):
         self.assertEqual(result, [{"x": 1}, {"x": 2}])
 
 
-class TestIsNearDuplicate(unittest.TestCase):
+class TestStageNearDup(unittest.TestCase):
+    def _is_dup(self, title, seen_titles):
+        return not list(nb.stage_near_dup([{"title": title}], seen_titles))
+
     def test_identical_titles(self):
-        self.assertTrue(nb.is_near_duplicate("오뚜기 신제품 출시", ["오뚜기 신제품 출시"]))
+        self.assertTrue(self._is_dup("오뚜기 신제품 출시", ["오뚜기 신제품 출시"]))
 
     def test_no_overlap(self):
-        self.assertFalse(nb.is_near_duplicate("전혀 다른 제목", ["오뚜기 신제품 출시"]))
+        self.assertFalse(self._is_dup("전혀 다른 제목", ["오뚜기 신제품 출시"]))
 
     def test_below_threshold(self):
         # 단어 겹침 < 40% → 중복 아님
-        self.assertFalse(nb.is_near_duplicate("오뚜기 매출 증가", ["삼양 신제품 출시 행사"]))
+        self.assertFalse(self._is_dup("오뚜기 매출 증가", ["삼양 신제품 출시 행사"]))
 
     def test_empty_title(self):
-        self.assertFalse(nb.is_near_duplicate("", ["오뚜기 신제품 출시"]))
+        self.assertFalse(self._is_dup("", ["오뚜기 신제품 출시"]))
 
     def test_empty_existing(self):
-        self.assertFalse(nb.is_near_duplicate("오뚜기 신제품", []))
+        self.assertFalse(self._is_dup("오뚜기 신제품", []))
+
+
+class TestArticleRecord(unittest.TestCase):
+    def test_normalizes_once_and_behaves_like_dict(self):
+        rec = nb.ArticleRecord.from_html(
+            "<b>오뚜기</b>  신제품 &quot;출시&quot;", "https://example.com/a", "설명 <i>본문</i>", "2026-04-01", "naver"
+        )
+        self.assertEqual(rec["title"], "오뚜기 신제품 출시")
+        self.assertEqual(rec.words, frozenset({"오뚜기", "신제품", "출시"}))
+        self.assertIsNone(rec.get("relevance_score"))
+        self.assertNotIn("relevance_score", rec)
+        rec["relevance_score"] = 0.5
+        self.assertEqual(rec["relevance_score"], 0.5)
+        self.assertFalse(hasattr(rec, "__dict__"))
+
+    def test_serializes_to_existing_json_shape(self):
+        rec = nb.ArticleRecord("제목", "https://example.com/a", "설명", "2026-04-01", "naver", 0.667)
+        self.assertEqual(
+            nb.json.loads(nb.json.dumps([rec], default=nb._json_default)),
+            [{"title": "제목", "link": "https://example.com/a", "desc": "설명",
+              "date": "2026-04-01", "source": "naver", "relevance_score": 0.667}],
+        )
+        self.assertEqual(nb.ArticleRecord.from_dict(rec.to_dict()).to_dict(), rec.to_dict())
+
+    def test_title_update_refreshes_words(self):
+        rec = nb.ArticleRecord("오뚜기 출시", "l", "", "", "naver")
+        rec["title"] = "농심 실적"
+        self.assertEqual(rec.words, frozenset({"농심", "실적"}))
+
+    def test_link_update_refreshes_link_hash(self):
+        rec = nb.ArticleRecord("t", "https://a.com/1", "", "", "naver")
+        rec["link"] = "https://a.com/2"
+        self.assertEqual(rec.link_hash, nb.ArticleRecord("t", "https://a.com/2", "", "", "naver").link_hash)
+
+
+class TestNearDupIndex(unittest.TestCase):
+    TITLES = [
+        "오뚜기 신제품 출시", "오뚜기 라면 수출 급증", "삼양 불닭 수출 신기록",
+        "최저임금 인상 결정", "최저임금 인상 결정 노동계 반발", "AI 자동화 제조업 확산",
+        "농심 실적 발표", "", "\"따옴표\" 제목 [속보]", "라면 수출 역대 최대",
+    ]
+
+    @staticmethod
+    def _linear_scan(title, seen, threshold=0.4):
+        words = nb._title_words(title)
+        return bool(words) and any(
+            len(words & other) / min(len(words), len(other)) > threshold
+            for other in map(nb._title_words, seen) if other
+        )
+
+    def test_matches_linear_scan(self):
+        index = nb.NearDupIndex()
+        seen = []
+        for title in self.TITLES + ["오뚜기 라면 수출 증가", "최저임금 결정", "전혀 새로운 뉴스"]:
+            self.assertEqual(index.is_duplicate(title), self._linear_scan(title, seen), title)
+            index.add(title)
+            seen.append(title)
+
+    def test_stage_near_dup_accepts_index(self):
+        index = nb.NearDupIndex(["오뚜기 신제품 출시"])
+        kept = nb.stage_near_dup([{"title": "오뚜기 신제품 출시"}, {"title": "전혀 다른 제목"}], index)
+        self.assertEqual([n["title"] for n in kept], ["전혀 다른 제목"])
+
+
+class TestMinHashLSHIndex(unittest.TestCase):
+    def test_same_interface_and_obvious_cases(self):
+        index = nb.MinHashLSHIndex(["오뚜기 라면 수출 역대 최대 기록"])
+        self.assertTrue(index.is_duplicate("오뚜기 라면 수출 역대 최대 기록"))
+        self.assertTrue(index.is_duplicate("오뚜기라면 수출, 역대 최대 기록"))
+        self.assertFalse(index.is_duplicate("고용노동부 산업안전 감독 강화"))
+        self.assertFalse(index.is_duplicate(""))
+
+    def test_backend_selected_by_env(self):
+        with patch.dict(os.environ, {'NEAR_DUP_BACKEND': 'minhash'}):
+            self.assertIsInstance(nb.make_near_dup_index(), nb.MinHashLSHIndex)
+        self.assertIsInstance(nb.make_near_dup_index(), nb.NearDupIndex)
+
+    def test_report_against_exact(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            titles = ["오뚜기 신제품 출시", "오뚜기 신제품 출시 예정", "최저임금 인상 결정"]
+            with open(os.path.join(tmp, "2026-01-01.json"), "w", encoding="utf-8") as f:
+                nb.json.dump({"raw_articles": {"panel_a": [{"title": t} for t in titles]}}, f)
+            report = nb.near_dup_report(tmp, configs=[{"bands": 32, "rows": 2, "threshold": 0.5}])
+        self.assertEqual(report["titles"], 3)
+        self.assertEqual(report["exact_duplicates"], 1)
+        self.assertEqual(report["configs"][0]["recall"], 1.0)
 
 
 class TestComputeRelevanceScore(unittest.TestCase):
@@ -84,6 +193,37 @@ class TestComputeRelevanceScore(unittest.TestCase):
         self.assertEqual(score, 0.5)
 
 
+class TestAhoCorasickMatcher(unittest.TestCase):
+    def test_overlapping_and_nested_patterns(self):
+        matcher = nb.AhoCorasickMatcher(["AI", "LLM", "생성형", "생성형 AI", "형A", "주52시간", "52"])
+        self.assertEqual(
+            matcher.find("생성형 AI와 LLM, 주52시간"),
+            {"AI", "LLM", "생성형", "생성형 AI", "주52시간", "52"},
+        )
+        self.assertFalse(matcher.contains_any("무관한 문장"))
+
+    def test_scores_match_substring_scan(self):
+        def brute(article, panel_id):
+            terms = nb.RELEVANCE_TERMS[panel_id]
+            title_hits = sum(1 for t in terms if t in article['title'])
+            desc_hits = sum(1 for t in terms if t in article['desc'] and t not in article['title'])
+            return min((title_hits * 2 + desc_hits) / 6.0, 1.0)
+
+        articles = []
+        for path in sorted(nb.glob.glob(os.path.join(os.path.dirname(__file__), "..", "data", "reports", "2*.json"))):
+            with open(path, encoding="utf-8") as f:
+                report = nb.json.load(f)
+            for items in (report.get("raw_articles") or {}).values():
+                articles.extend(items)
+        articles.append({"title": "글로벌 AI 자동화 제조업 인력 ChatGPT", "desc": "중대재해 근로기준법 CJ"})
+        for article in articles:
+            for panel_id in nb.RELEVANCE_TERMS:
+                self.assertEqual(nb.compute_relevance_score(article, panel_id), brute(article, panel_id))
+            self.assertEqual(
+                nb.is_excluded(article), any(p in article['title'] for p in nb.EXCLUDE_PATTERNS)
+            )
+
+
 class TestQualityGate(unittest.TestCase):
     def _panel(self, n):
         return [{"headline": f"item{i}"} for i in range(n)]
@@ -164,18 +304,27 @@ class TestDedupAcrossPanels(unittest.TestCase):
     def _art(self, title):
         return {"title": title, "desc": "", "link": "http://example.com"}
 
+    def _collect(self, panel_a, panel_b, panel_c):
+        """collect_panels의 교차 중복 제거만 검증 (수집 스트림·관련도 점수는 고정)."""
+        streams = {"PANEL_A": panel_a, "PANEL_B": panel_b, "PANEL_C": panel_c}
+        with patch.object(nb, 'iter_panel_streams',
+                          side_effect=lambda kw: ((pid, iter(arts)) for pid, arts in streams.items())), \
+                patch.object(nb, 'compute_relevance_score', return_value=1.0):
+            news, _ = nb.collect_panels({pid: [] for pid in streams})
+        return news["PANEL_A"], news["PANEL_B"], news["PANEL_C"]
+
     def test_ab_dedup_removes_near_duplicate(self):
         panel_a = [self._art("오뚜기 라면 수출 급증 발표")]
         panel_b = [self._art("오뚜기 라면 수출 급증 발표")]  # identical
         panel_c = []
-        _, deduped_b, _ = nb.dedup_across_panels(panel_a, panel_b, panel_c)
+        _, deduped_b, _ = self._collect(panel_a, panel_b, panel_c)
         self.assertEqual(len(deduped_b), 0)
 
     def test_no_overlap_keeps_all(self):
         panel_a = [self._art("글로벌 원자재 가격 상승")]
         panel_b = [self._art("고용노동부 최저임금 발표")]
         panel_c = [self._art("오뚜기 신제품 출시")]
-        a, b, c = nb.dedup_across_panels(panel_a, panel_b, panel_c)
+        a, b, c = self._collect(panel_a, panel_b, panel_c)
         self.assertEqual(len(a), 1)
         self.assertEqual(len(b), 1)
         self.assertEqual(len(c), 1)
@@ -184,7 +333,7 @@ class TestDedupAcrossPanels(unittest.TestCase):
         panel_a = [self._art("오뚜기 라면 글로벌 수출")]
         panel_b = []
         panel_c = [self._art("오뚜기 라면 글로벌 수출")]  # duplicate of A
-        _, _, deduped_c = nb.dedup_across_panels(panel_a, panel_b, panel_c)
+        _, _, deduped_c = self._collect(panel_a, panel_b, panel_c)
         self.assertEqual(len(deduped_c), 0)
 
 
@@ -204,7 +353,7 @@ class TestCallGemini(unittest.TestCase):
         mock_res.status_code = 200
         mock_res.json.return_value = mock_response
 
-        with patch('requests.post') as mock_post:
+        with patch('requests.Session.post') as mock_post:
             mock_post.return_value = mock_res
             result, error = nb.call_gemini(
                 "test-api-key",
@@ -226,7 +375,7 @@ class TestCallGemini(unittest.TestCase):
         mock_res.status_code = 200
         mock_res.json.return_value = mock_response
 
-        with patch('requests.post') as mock_post:
+        with patch('requests.Session.post') as mock_post:
             # 첫 2번 타임아웃, 3번째 성공
             mock_post.side_effect = [
                 unittest.mock.Mock(side_effect=requests.exceptions.Timeout()),
@@ -242,10 +391,842 @@ class TestCallGemini(unittest.TestCase):
             self.assertEqual(mock_post.call_count, 3)
 
 
+class TestGeminiCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        self.env = patch.dict(os.environ, {'GEMINI_MODEL_CHAIN': 'deep-model,lite-model',
+                                           'GEMINI_BREAKER_THRESHOLD': '1'})
+        self.env.start()
+        self.addCleanup(self.env.stop)
+        nb.reset_gemini_run()
+        self.addCleanup(setattr, nb, '_gemini_run_deadline', None)
+        self.addCleanup(nb._gemini_breakers.clear)
+
+    def test_breaker_opens_then_half_opens_after_cooldown(self):
+        now = [0.0]
+        breaker = nb.CircuitBreaker("t", failure_threshold=2, cooldown=10, clock=lambda: now[0])
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+        now[0] = 11
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, "closed")
+
+    def test_half_open_trial_released_when_attempt_ends_without_verdict(self):
+        now = [0.0]
+        breaker = nb.CircuitBreaker("deep-model", failure_threshold=1, cooldown=10, clock=lambda: now[0])
+        breaker.record_failure()
+        now[0] = 11
+        nb._gemini_breakers["deep-model"] = breaker
+        not_found = unittest.mock.MagicMock(status_code=404, text="not found")
+        with patch('requests.Session.post', return_value=not_found), patch.object(nb.time, 'sleep'):
+            nb.call_gemini("k", "p", max_retries=1)
+        self.assertEqual(breaker.state, "half_open")
+        self.assertTrue(breaker.allow())
+
+    def test_rate_limit_does_not_trip_breaker(self):
+        throttled = unittest.mock.MagicMock(status_code=429, headers={})
+        throttled.json.return_value = {}
+        with patch('requests.Session.post', side_effect=[throttled, throttled, _gemini_response()]), \
+                patch.object(nb.gemini_rate_limiter, 'on_throttle', return_value=0):
+            self.assertEqual(nb.call_gemini("k", "p"), ('{"articles": []}', None))
+        self.assertEqual(nb.gemini_breaker("deep-model").state, "closed")
+        self.assertEqual(nb.gemini_breaker("deep-model").failures, 0)
+
+    def test_timeout_switches_to_next_model_without_sleep(self):
+        with patch('requests.Session.post', side_effect=[requests.exceptions.Timeout(), _gemini_response()]) as mock_post, \
+                patch.object(nb.time, 'sleep') as mock_sleep:
+            self.assertEqual(nb.call_gemini("k", "p"), ('{"articles": []}', None))
+        urls = [c.args[0] for c in mock_post.call_args_list]
+        self.assertIn("/deep-model:", urls[0])
+        self.assertIn("/lite-model:", urls[1])
+        mock_sleep.assert_not_called()
+
+    def test_open_breakers_skip_straight_to_fallback(self):
+        with patch('requests.Session.post', side_effect=requests.exceptions.Timeout()) as mock_post:
+            self.assertEqual(nb.call_gemini("k", "p"), (None, "circuit_open"))
+            self.assertEqual(mock_post.call_count, 2)
+            news = [{"title": "t", "desc": "", "link": "l", "date": "d"}]
+            self.assertEqual(nb.analyze_panel("k", news, "PANEL_A"), ([], "circuit_open"))
+            self.assertEqual(mock_post.call_count, 2)
+
+    def test_run_budget_bounds_call(self):
+        nb._gemini_run_deadline = nb.time.monotonic() - 1
+        with patch('requests.Session.post') as mock_post:
+            self.assertEqual(nb.call_gemini("k", "p"), (None, "budget_exhausted"))
+        mock_post.assert_not_called()
+
+
+class TestStageGraph(unittest.TestCase):
+    def test_independent_nodes_overlap_and_deps_pass_results(self):
+        import threading
+        barrier = threading.Barrier(2, timeout=5)
+
+        def left():
+            barrier.wait()
+            return 1
+
+        def right():
+            barrier.wait()
+            return 2
+
+        graph = (nb.StageGraph("t")
+                 .add("total", lambda left, right: left + right, deps=("left", "right"))
+                 .add("left", left)
+                 .add("right", right))
+        self.assertEqual(graph.run(), {"left": 1, "right": 2, "total": 3})
+        self.assertEqual(set(graph.timings), {"left", "right", "total"})
+
+    def test_timeout_and_failure_use_default_or_propagate(self):
+        import threading
+        release = threading.Event()
+        self.addCleanup(release.set)
+        graph = (nb.StageGraph("t")
+                 .add("slow", lambda: release.wait(5), timeout=0.05, default="fallback")
+                 .add("broken", lambda: 1 / 0, default=None)
+                 .add("after", lambda slow, broken: (slow, broken), deps=("slow", "broken")))
+        self.assertEqual(graph.run()["after"], ("fallback", None))
+        self.assertIn("slow", graph.errors)
+        with self.assertRaises(ZeroDivisionError):
+            nb.StageGraph("t").add("broken", lambda: 1 / 0).run()
+
+    def test_run_newsletter_fetches_company_news_during_collection(self):
+        import threading
+        barrier = threading.Barrier(2, timeout=5)
+        news = {pid: [] for pid in ("PANEL_A", "PANEL_B", "PANEL_C", "PANEL_E")}
+        self.addCleanup(setattr, nb, '_gemini_run_deadline', None)
+
+        def fake_collect(*args, **kwargs):
+            barrier.wait()
+            return news, {pid: {} for pid in news}
+
+        def fake_company(app_password):
+            barrier.wait()
+            return "<p>company</p>"
+
+        with patch.object(nb, 'validate_environment'), \
+                patch.object(nb, 'collect_panels', side_effect=fake_collect), \
+                patch.object(nb, '_company_section_html', side_effect=fake_company), \
+                patch.object(nb, 'run_panel_analyses', return_value=({pid: ([], True) for pid in news}, None)), \
+                patch.object(nb.AnalysisStore, 'save'), \
+                patch.object(nb, 'quality_gate', return_value=(True, "full", [])), \
+                patch.object(nb, 'save_report_json') as save_json, \
+                patch.object(nb, 'build_html', return_value="<html>") as build_html, \
+                patch.object(nb, 'send_email', return_value=[]) as send_email:
+            nb.run_newsletter()
+        save_json.assert_called_once()
+        self.assertEqual(build_html.call_args.args[-1], "<p>company</p>")
+        send_email.assert_called_once()
+        today_str = datetime.datetime.now(nb.KST).strftime("%Y-%m-%d")
+        with open(os.path.join(nb.METRICS_DIR, f"{today_str}.json"), encoding="utf-8") as f:
+            written = json.load(f)
+        stages = {d["labels"]["stage"] for d in written["durations"] if d["name"] == "stage"}
+        self.assertTrue({"collect", "analyses", "company", "send"} <= stages)
+        self.assertIn({"name": "edition", "labels": {"type": "full"}, "value": 1}, written["gauges"])
+
+
+class TestEditionCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.base = tempfile.mkdtemp(prefix='hr_brief_ckpt_')
+
+    def test_stage_graph_skips_restored_node(self):
+        nb.EditionCheckpoint("2026-01-07", base_dir=self.base).save("first", [1, 2])
+        ckpt = nb.EditionCheckpoint("2026-01-07", base_dir=self.base, resume=True)
+        first = unittest.mock.Mock(return_value=[9])
+        results = (
+            nb.StageGraph("t", checkpoint=ckpt)
+            .add("first", first, restore=tuple)
+            .add("second", lambda first: sum(first), deps=("first",))
+            .run()
+        )
+        first.assert_not_called()
+        self.assertEqual(results["second"], 3)
+        self.assertEqual(ckpt.load("second"), 3)
+
+    def test_checkpoints_ignored_without_resume(self):
+        nb.EditionCheckpoint("2026-01-07", base_dir=self.base).save("first", 1)
+        fresh = nb.EditionCheckpoint("2026-01-07", base_dir=self.base)
+        self.assertFalse(fresh.has("first"))
+        self.assertIsNone(fresh.load("first"))
+
+    def test_run_panel_analyses_reuses_checkpointed_panel(self):
+        news = [{"title": "t", "desc": "", "link": "l", "date": "d"}]
+        ckpt = nb.EditionCheckpoint("2026-01-07", base_dir=self.base)
+        ckpt.save("analysis_PANEL_A", {"fingerprint": nb._news_fingerprint(news), "articles": [{"headline": "saved"}]})
+        ckpt.save("analysis_PANEL_C", {"fingerprint": "stale", "articles": [{"headline": "old"}]})
+        ckpt.resume = True
+        with patch.object(nb, 'analyze_panel', return_value=([{"headline": "new"}], None)) as analyze:
+            results, _ = nb.run_panel_analyses(
+                "key", {"PANEL_A": news, "PANEL_B": news, "PANEL_C": news}, checkpoint=ckpt
+            )
+        self.assertEqual(sorted(c.args[2] for c in analyze.call_args_list), ["PANEL_B", "PANEL_C"])
+        self.assertEqual(results["PANEL_A"], ([{"headline": "saved"}], False))
+        self.assertEqual(results["PANEL_C"], ([{"headline": "new"}], False))
+        self.assertEqual(ckpt.load("analysis_PANEL_B")["articles"], [{"headline": "new"}])
+
+    def test_unpersisted_stage_removes_previous_checkpoint(self):
+        def run(a, b, resume=False):
+            ckpt = nb.EditionCheckpoint("2026-01-07", base_dir=self.base, resume=resume)
+            return (nb.StageGraph("t", checkpoint=ckpt)
+                    .add("a", lambda: a)
+                    .add("b", lambda a: b, deps=("a",), persist=lambda r: r is not None)
+                    .run())
+
+        run("a1", "b1")
+        run("a2", None)
+        self.assertEqual(run("a3", "b3", resume=True), {"a": "a2", "b": "b3"})
+
+    def test_clear_removes_edition_directory(self):
+        ckpt = nb.EditionCheckpoint("2026-01-07", base_dir=self.base)
+        ckpt.save("collect", [])
+        ckpt.mark_sent("a@x.com")
+        ckpt.clear()
+        self.assertFalse(os.path.exists(ckpt.directory))
+        self.assertEqual(ckpt.sent_recipients(), set())
+
+    def test_send_ledger_skips_already_sent_recipients(self):
+        ckpt = nb.EditionCheckpoint("2026-01-07", base_dir=self.base, resume=True)
+        with patch('smtplib.SMTP_SSL') as smtp:
+            smtp.return_value.__enter__.return_value.sendmail.side_effect = [None, OSError("down")]
+            nb.send_email("pw", ["a@x.com", "b@x.com"], "s", "<html>", on_sent=ckpt.mark_sent)
+        self.assertEqual(ckpt.sent_recipients(), {"a@x.com"})
+
+    def test_fresh_run_ignores_previous_send_ledger(self):
+        nb.EditionCheckpoint("2026-01-07", base_dir=self.base).save("sent", ["a@x.com"])
+        fresh = nb.EditionCheckpoint("2026-01-07", base_dir=self.base)
+        self.assertEqual(fresh.sent_recipients(), set())
+        fresh.mark_sent("b@x.com")
+        fresh.mark_sent("c@x.com")
+        resumed = nb.EditionCheckpoint("2026-01-07", base_dir=self.base, resume=True)
+        self.assertEqual(resumed.sent_recipients(), {"b@x.com", "c@x.com"})
+
+    def test_prune_removes_old_editions(self):
+        for edition in ("2000-01-01", "2000-01-02", datetime.datetime.now(nb.KST).strftime("%Y-%m-%d")):
+            nb.EditionCheckpoint(edition, base_dir=self.base).save("collect", [])
+        nb.EditionCheckpoint.prune(self.base, keep_days=14, keep=("2000-01-02",))
+        self.assertEqual(len(os.listdir(self.base)), 2)
+        self.assertIn("2000-01-02", os.listdir(self.base))
+
+    def test_resume_after_fallback_reruns_analyses_and_sends(self):
+        news = {pid: [] for pid in ("PANEL_A", "PANEL_B", "PANEL_C", "PANEL_E")}
+        fallback = {pid: ([], pid == "PANEL_A") for pid in news}
+        fresh = {pid: ([{"headline": pid}], False) for pid in news}
+        self.addCleanup(setattr, nb, '_gemini_run_deadline', None)
+        with patch.object(nb, 'CHECKPOINT_DIR', self.base), \
+                patch.object(nb, 'validate_environment'), \
+                patch.object(nb, 'collect_panels', return_value=(news, {pid: {} for pid in news})) as collect, \
+                patch.object(nb, '_company_section_html', return_value="<p>company</p>"), \
+                patch.object(nb, 'run_panel_analyses', side_effect=[(fallback, None), (fresh, None)]) as analyze, \
+                patch.object(nb.AnalysisStore, 'save'), \
+                patch.object(nb, 'send_admin_alert'), \
+                patch.object(nb, 'quality_gate', side_effect=[(False, "full", ["fallback"]), (True, "full", [])]), \
+                patch.object(nb, 'save_report_json'), \
+                patch.object(nb, 'build_html', return_value="<html>"), \
+                patch.object(nb, 'send_email', return_value=[]) as send_email:
+            with patch.dict(os.environ, {'BOT_RESUME': ''}):
+                nb.run_newsletter()
+            send_email.assert_not_called()
+            with patch.dict(os.environ, {'BOT_RESUME': '1'}):
+                nb.run_newsletter()
+        collect.assert_called_once()
+        self.assertEqual(analyze.call_count, 2)
+        send_email.assert_called_once()
+
+    def test_resume_edition_from_argv_and_env(self):
+        with patch.object(nb.sys, 'argv', ['bot', '--resume', '2026-01-07']), \
+                patch.dict(os.environ, {'BOT_RESUME': ''}):
+            self.assertEqual(nb._resume_edition(), "2026-01-07")
+        with patch.object(nb.sys, 'argv', ['bot']), patch.dict(os.environ, {'BOT_RESUME': '1'}):
+            self.assertEqual(nb._resume_edition(), datetime.datetime.now(nb.KST).strftime("%Y-%m-%d"))
+        with patch.object(nb.sys, 'argv', ['bot']), patch.dict(os.environ, {'BOT_RESUME': ''}):
+            self.assertIsNone(nb._resume_edition())
+
+
+class TestReplay(unittest.TestCase):
+    def test_replay_reanalyzes_archived_raw_articles_without_network(self):
+        report_dir = tempfile.mkdtemp(prefix='hr_brief_archive_')
+        out_dir = os.path.join(tempfile.mkdtemp(prefix='hr_brief_replay_'), "out")
+        raw = {
+            "panel_a": [{"title": "임금 인상", "link": "https://a.com/1", "desc": "d", "date": "2026-01-07",
+                         "source": "naver", "relevance_score": 1.0}],
+            "panel_b": [{"title": "노사 협상", "link": "https://b.com/1", "desc": "d", "date": "2026-01-07",
+                         "source": "rss"}],
+            "panel_c": [], "panel_e": [],
+        }
+        with open(os.path.join(report_dir, "2026-01-07.json"), "w", encoding="utf-8") as f:
+            json.dump({"date": "2026-01-07", "raw_articles": raw}, f, ensure_ascii=False)
+        seen = {}
+
+        def fake_analyze(api_key, news, panel_id, store=None, on_article=None):
+            seen[panel_id] = [n["title"] for n in news]
+            return [{"headline": n["title"], "link": n["link"]} for n in news], None
+
+        with patch.object(nb, 'analyze_panel', side_effect=fake_analyze), \
+                patch.object(nb, 'generate_business_report', return_value={"bluf": ["x"], "direction": "Up"}), \
+                patch('requests.Session.get', side_effect=AssertionError("no collection")), \
+                patch.object(nb, 'send_email') as send_email:
+            summary = nb.run_replay(report_dir=report_dir, output_dir=out_dir)
+        send_email.assert_not_called()
+        self.assertEqual(seen["PANEL_A"], ["임금 인상"])
+        self.assertEqual(summary["report_date"], "2026-01-07")
+        self.assertEqual(summary["edition"], "full")
+        self.assertIn("analyses", summary["stage_seconds"])
+        for name in ("2026-01-07.json", "index.json", "latest.md", "newsletter.html", "replay_summary.json"):
+            self.assertTrue(os.path.exists(os.path.join(out_dir, name)), name)
+        with open(os.path.join(out_dir, "2026-01-07.json"), encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["raw_articles"]["panel_a"][0]["link"], "https://a.com/1")
+        self.assertEqual(os.listdir(report_dir), ["2026-01-07.json"])
+
+    def test_replay_writes_metrics_when_analysis_fails(self):
+        report_dir = tempfile.mkdtemp(prefix='hr_brief_archive_')
+        out_dir = os.path.join(tempfile.mkdtemp(prefix='hr_brief_replay_'), "out")
+        with open(os.path.join(report_dir, "2026-01-07.json"), "w", encoding="utf-8") as f:
+            json.dump({"date": "2026-01-07", "raw_articles": {}}, f)
+        with patch.object(nb, 'run_panel_analyses', side_effect=RuntimeError("boom")):
+            with self.assertRaises(RuntimeError):
+                nb.run_replay(report_dir=report_dir, output_dir=out_dir)
+        with open(os.path.join(out_dir, "metrics", "2026-01-07.json"), encoding="utf-8") as f:
+            written = json.load(f)
+        self.assertTrue(written["replay"])
+        self.assertIn({"name": "stage_runs", "labels": {"graph": "replay", "stage": "analyses", "outcome": "failed"},
+                       "value": 1}, written["counters"])
+
+    def test_replay_missing_archive_raises(self):
+        with self.assertRaises(FileNotFoundError):
+            nb.run_replay(report_date="1999-01-01", report_dir=tempfile.mkdtemp())
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def test_prometheus_text_and_json_written(self):
+        reg = nb.MetricsRegistry()
+        reg.inc("retries", api="gemini", reason="rate_limit")
+        reg.inc("retries", 2, api="gemini", reason="rate_limit")
+        reg.observe("stage", 1.5, stage="collect")
+        reg.observe("stage", 0.5, stage="collect")
+        reg.gauge("edition", 1, type='li"ght')
+        prom = reg.to_prometheus()
+        self.assertIn("# TYPE hr_brief_retries_total counter", prom)
+        self.assertIn('hr_brief_retries_total{api="gemini",reason="rate_limit"} 3', prom)
+        self.assertIn('hr_brief_stage_seconds_count{stage="collect"} 2', prom)
+        self.assertIn('hr_brief_stage_seconds_sum{stage="collect"} 2.0', prom)
+        self.assertIn('hr_brief_stage_seconds_max{stage="collect"} 1.5', prom)
+        self.assertIn('hr_brief_edition{type="li\\"ght"} 1', prom)
+
+        out_dir = tempfile.mkdtemp(prefix='hr_brief_metrics_')
+        json_path, prom_path = reg.write("2026-01-07", base_dir=out_dir, resumed=[])
+        with open(json_path, encoding="utf-8") as f:
+            snap = json.load(f)
+        self.assertEqual(snap["counters"][0]["value"], 3)
+        with open(prom_path, encoding="utf-8") as f:
+            self.assertIn('edition="2026-01-07"', f.read())
+
+    def test_gemini_retry_reason_label_normalized(self):
+        with patch('requests.Session.post', side_effect=ValueError("unexpected: {'detail': 1}")), \
+                patch.object(nb.time, 'sleep'), \
+                patch.object(nb, 'metrics', nb.MetricsRegistry()) as reg:
+            self.assertEqual(nb.call_gemini("k", "p", max_retries=2)[1], "unexpected: {'detail': 1}")
+            counters = {(c["name"], c["labels"].get("reason") or c["labels"].get("outcome")): c["value"]
+                        for c in reg.snapshot()["counters"]}
+        self.assertEqual(counters[("retries", "error")], 1)
+        self.assertEqual(counters[("gemini_calls", "error")], 1)
+
+    def test_http_hook_records_requests_and_bytes(self):
+        res = requests.Response()
+        res.status_code = 200
+        res._content = b"hello"
+        res.url = "https://openapi.naver.com/v1/search/news.json"
+        res.elapsed = datetime.timedelta(seconds=0.25)
+        res.request = requests.Request("POST", res.url, data="abc").prepare()
+        with patch.object(nb, 'metrics', nb.MetricsRegistry()) as reg:
+            nb._record_http_metrics(res)
+            nb._record_http_metrics(res, stream=True)
+            counters = {(c["name"], c["labels"].get("status")): c["value"] for c in reg.snapshot()["counters"]}
+        self.assertEqual(counters[("http_requests", "2xx")], 2)
+        self.assertEqual(counters[("http_received_bytes", None)], 5)  # 스트리밍 응답은 제외
+        self.assertEqual(counters[("http_sent_bytes", None)], 6)
+
+    def test_disk_cache_hits_counted_per_namespace(self):
+        cache = nb.DiskCache("metrics_test", ttl_seconds=60, max_entries=10)
+        cache.set("k", 1)
+        with patch.object(nb, 'metrics', nb.MetricsRegistry()) as reg:
+            cache.get("k")
+            cache.get("missing")
+            counters = {c["name"]: c["value"] for c in reg.snapshot()["counters"]}
+        self.assertEqual(counters, {"cache_hits": 1, "cache_misses": 1})
+
+
+class TestStageProfiler(unittest.TestCase):
+    def test_cpu_mode_writes_pstats_per_stage(self):
+        import pstats
+        out_dir = tempfile.mkdtemp(prefix='hr_brief_prof_')
+        profiler = nb.StageProfiler("cpu", out_dir)
+        (
+            nb.StageGraph("t", profiler=profiler)
+            .add("render", lambda: "".join(f"<p>{i}</p>" for i in range(2000)))
+            .add("dump", lambda render: json.dumps({"html": render}), deps=("render",))
+            .run()
+        )
+        profiler.close()
+        self.assertTrue(os.path.exists(os.path.join(out_dir, "render.cpu.txt")))
+        stats = pstats.Stats(os.path.join(out_dir, "dump.pstats"))
+        self.assertTrue(any(func[2] == "dumps" for func in stats.stats))
+
+    def test_mem_mode_reports_top_allocators(self):
+        import tracemalloc
+        out_dir = tempfile.mkdtemp(prefix='hr_brief_prof_')
+        profiler = nb.StageProfiler("mem", out_dir, top=5)
+        self.addCleanup(profiler.close)
+        keep = []
+        with profiler.stage("collect"):
+            keep.append([str(i) * 10 for i in range(20000)])
+        profiler.close()
+        self.assertFalse(tracemalloc.is_tracing())
+        with open(os.path.join(out_dir, "collect.mem.txt"), encoding="utf-8") as f:
+            report = f.read()
+        self.assertIn("test_core.py", report)
+
+    def test_from_env_disabled_or_unknown_mode(self):
+        with patch.dict(os.environ, {'BOT_PROFILE': ''}):
+            self.assertIsNone(nb.StageProfiler.from_env("2026-01-07"))
+        with patch.dict(os.environ, {'BOT_PROFILE': 'gpu'}):
+            self.assertIsNone(nb.StageProfiler.from_env("2026-01-07"))
+        with patch.dict(os.environ, {'BOT_PROFILE': 'CPU'}):
+            profiler = nb.StageProfiler.from_env("2026-01-07", base_dir="/tmp/x")
+        self.assertEqual((profiler.mode, profiler.directory), ("cpu", os.path.join("/tmp/x", "2026-01-07")))
+
+
+class TestRunPanelAnalyses(unittest.TestCase):
+    def test_panels_and_report_run_concurrently_and_fail_independently(self):
+        import threading
+        barrier = threading.Barrier(3, timeout=5)
+
+        def fake_analyze(api_key, news, panel_id, store=None, on_article=None):
+            barrier.wait()  # A, B, 리포트가 동시에 실행 중이어야 통과
+            if panel_id == "PANEL_B":
+                raise RuntimeError("boom")
+            return [{"headline": panel_id}], None
+
+        def fake_report(api_key, a, b, c):
+            barrier.wait()
+            return {"bluf": ["x"], "direction": "Ambiguous"}
+
+        news = [{"title": "t", "desc": "", "link": "l", "date": "d"}]
+        with patch.object(nb, 'analyze_panel', side_effect=fake_analyze), \
+                patch.object(nb, 'generate_business_report', side_effect=fake_report), \
+                patch.object(nb, 'make_smart_fallback', return_value=([], True)) as fallback:
+            results, report = nb.run_panel_analyses(
+                "key", {"PANEL_A": news, "PANEL_B": news}, (news, news, [])
+            )
+        self.assertEqual(results["PANEL_A"], ([{"headline": "PANEL_A"}], False))
+        self.assertEqual(results["PANEL_B"], ([], True))
+        fallback.assert_called_once()
+        self.assertEqual(report["direction"], "Ambiguous")
+
+    def test_gemini_retry_delay_from_body(self):
+        res = unittest.mock.MagicMock(headers={})
+        res.json.return_value = {"error": {"details": [{"retryDelay": "37s"}]}}
+        self.assertEqual(nb._gemini_retry_delay(res), 37.0)
+
+
+class TestGeminiCache(unittest.TestCase):
+    def test_identical_prompt_served_from_cache(self):
+        with tempfile.TemporaryDirectory() as tmp, patch.object(nb, 'CACHE_DIR', tmp), \
+                patch.dict(os.environ, {'GEMINI_CACHE': 'on'}), \
+                patch('requests.Session.post', return_value=_gemini_response('{"a": 1}')) as mock_post:
+            self.assertEqual(nb.call_gemini("k", "cache prompt"), ('{"a": 1}', None))
+            self.assertEqual(nb.call_gemini("k", "cache prompt"), ('{"a": 1}', None))
+            self.assertEqual(mock_post.call_count, 1)
+            nb.call_gemini("k", "other prompt")
+            self.assertEqual(mock_post.call_count, 2)
+
+    def test_only_validated_responses_are_cached(self):
+        with tempfile.TemporaryDirectory() as tmp, patch.object(nb, 'CACHE_DIR', tmp), \
+                patch.dict(os.environ, {'GEMINI_CACHE': 'on'}), \
+                patch('requests.Session.post', return_value=_gemini_response('{"articles": []}')) as mock_post:
+            nb.call_gemini("k", "p", validate=lambda text: False)
+            nb.call_gemini("k", "p", validate=lambda text: False)
+            self.assertEqual(mock_post.call_count, 2)
+            mock_post.return_value = _gemini_response("not json")
+            nb.call_gemini("k", "q")
+            nb.call_gemini("k", "q")
+            self.assertEqual(mock_post.call_count, 4)
+
+    def test_model_is_part_of_key(self):
+        with tempfile.TemporaryDirectory() as tmp, patch.object(nb, 'CACHE_DIR', tmp), \
+                patch.dict(os.environ, {'GEMINI_CACHE': 'on', 'GEMINI_DEEP_MODEL': 'model-a'}), \
+                patch('requests.Session.post', return_value=_gemini_response("a")) as mock_post:
+            nb.call_gemini("k", "same prompt")
+            os.environ['GEMINI_DEEP_MODEL'] = 'model-b'
+            nb.call_gemini("k", "same prompt")
+            self.assertEqual(mock_post.call_count, 2)
+
+
+class TestStructuredOutput(unittest.TestCase):
+    def test_schema_derived_from_prompt_examples(self):
+        item = nb.ARTICLES_RESPONSE_SCHEMA["properties"]["articles"]["items"]
+        self.assertEqual(item["properties"]["signal_strength"]["enum"], ["High", "Medium", "Low"])
+        self.assertEqual(item["properties"]["ref_id"]["type"], "INTEGER")
+        self.assertEqual(item["properties"]["strategic_options"]["type"], "ARRAY")
+        report = nb.REPORT_RESPONSE_SCHEMA["properties"]["report"]
+        self.assertEqual(report["properties"]["direction"]["enum"], ["Converging", "Diverging", "Ambiguous"])
+        self.assertEqual(report["properties"]["causal_narrative"], {"type": "STRING"})
+
+    def test_validator_fixes_small_issues_locally(self):
+        news = [{"title": f"t{i}", "desc": "", "link": f"l{i}", "date": "d"} for i in range(3)]
+        items = nb._map_ref_ids([
+            {"ref_id": "2", "signal_strength": "high", "strategic_options": {"option": "A"}},
+            {"ref_id": 1.0, "signal_strength": "Medium(모니터링)"},
+            {"ref_id": "x"},
+            "not an object",
+        ], news)
+        self.assertEqual([(a["ref_id"], a["link"]) for a in items], [(2, "l2"), (1, "l1")])
+        self.assertEqual(items[0]["signal_strength"], "High")
+        self.assertEqual(items[0]["strategic_options"], [{"option": "A"}])
+        self.assertEqual(items[1]["signal_strength"], "Medium")
+        report = nb._valid_report({"report": {"bluf": "한 문장", "direction": "converging"}})
+        self.assertEqual(report, {"bluf": ["한 문장"], "direction": "Converging"})
+
+    def test_schema_sent_and_dropped_when_rejected(self):
+        rejected = unittest.mock.MagicMock(status_code=400, text="Invalid responseSchema")
+        ok = _gemini_response()
+        with patch('requests.Session.post', side_effect=[rejected, ok]) as mock_post:
+            text, err = nb.call_gemini("k", "schema prompt", response_schema=nb.ARTICLES_RESPONSE_SCHEMA)
+        self.assertEqual((text, err), ('{"articles": []}', None))
+        first, second = (json.loads(c.kwargs["data"])["generationConfig"] for c in mock_post.call_args_list)
+        self.assertEqual(first["responseMimeType"], "application/json")
+        self.assertNotIn("responseSchema", second)
+
+    def test_schema_rejected_response_cached_under_request_key(self):
+        rejected = unittest.mock.MagicMock(status_code=400, text="Invalid responseSchema")
+        ok = _gemini_response()
+        with tempfile.TemporaryDirectory() as tmp, patch.object(nb, 'CACHE_DIR', tmp), \
+                patch.dict(os.environ, {'GEMINI_CACHE': 'on'}), \
+                patch('requests.Session.post', side_effect=[rejected, ok]) as mock_post:
+            nb.call_gemini("k", "schema cache prompt", response_schema=nb.ARTICLES_RESPONSE_SCHEMA)
+            text, _ = nb.call_gemini("k", "schema cache prompt", response_schema=nb.ARTICLES_RESPONSE_SCHEMA)
+        self.assertEqual(text, '{"articles": []}')
+        self.assertEqual(mock_post.call_count, 2)
+
+
+class TestCandidatePlanner(unittest.TestCase):
+    def _news(self, n, desc="설명 " * 20):
+        return [{"title": f"기사 {i}", "desc": desc, "link": f"l{i}", "date": "d"} for i in range(n)]
+
+    def test_compact_desc_strips_boilerplate(self):
+        desc = "[서울=뉴시스] 홍길동 기자 = 농심이 가격을 인상한다... hong@newsis.com 무단전재 및 재배포 금지"
+        self.assertEqual(nb.compact_desc(desc), "농심이 가격을 인상한다")
+        self.assertLessEqual(nb.estimate_tokens(nb.compact_desc("가" * 500, 40)), 40)
+
+    def test_budget_chooses_prefix_of_candidates(self):
+        news = self._news(10)
+        ctx, chosen, used = nb.build_candidate_context(news, budget_tokens=200, desc_tokens=30)
+        self.assertLessEqual(used, 200)
+        self.assertEqual(chosen, news[:len(chosen)])
+        self.assertEqual(ctx.count("\n"), len(chosen))
+        self.assertGreater(len(chosen), 1)
+        self.assertEqual(len(nb.build_candidate_context(news, budget_tokens=1)[1]), 1)
+        self.assertEqual(len(nb.build_candidate_context(news, 10 ** 6, max_items=8)[1]), 8)
+
+    def test_analyze_panel_logs_planned_vs_actual_tokens(self):
+        res = _gemini_response('{"articles": [{"ref_id": 4}]}',
+                               usageMetadata={"promptTokenCount": 777, "candidatesTokenCount": 12})
+        with patch.dict(os.environ, {'GEMINI_PANEL_CONTEXT_TOKENS': '120'}), \
+                patch('requests.Session.post', return_value=res) as mock_post, \
+                self.assertLogs(nb.logger, level="INFO") as logs:
+            result, err = nb.analyze_panel("k", self._news(10), "PANEL_A")
+        prompt = json.loads(mock_post.call_args.kwargs["data"])["contents"][0]["parts"][0]["text"]
+        self.assertIn("[0] 기사 0", prompt)
+        self.assertNotIn("[4]", prompt)
+        self.assertEqual(result, [])  # 예산 밖 후보를 가리키는 ref_id는 버려짐
+        self.assertTrue(any("실제 777" in line for line in logs.output))
+
+
+class TestGeminiContextCache(unittest.TestCase):
+    def setUp(self):
+        nb.gemini_context_cache._entries.clear()
+        self.env = patch.dict(os.environ, {'GEMINI_CONTEXT_CACHE_MIN_TOKENS': '0'})
+        self.env.start()
+        self.addCleanup(self.env.stop)
+        self.addCleanup(nb.gemini_context_cache._entries.clear)
+
+    def test_prefix_cached_once_and_only_suffix_sent(self):
+        created = _json_response({"name": "cachedContents/abc"})
+        with patch('requests.Session.post', side_effect=[created, _gemini_response("ok"), _gemini_response("ok")]) as mock_post:
+            nb.call_gemini("k", "panel A 후보", cache_prefix="공통 접두부")
+            nb.call_gemini("k", "panel B 후보", cache_prefix="공통 접두부")
+        self.assertIn("/cachedContents?", mock_post.call_args_list[0].args[0])
+        body = json.loads(mock_post.call_args_list[2].kwargs["data"])
+        self.assertEqual(body["cachedContent"], "cachedContents/abc")
+        self.assertEqual(body["contents"][0]["parts"][0]["text"], "panel B 후보")
+
+    def test_real_prefix_shared_by_panels_and_report_meets_default_minimum(self):
+        os.environ.pop('GEMINI_CONTEXT_CACHE_MIN_TOKENS')
+        news = [{"title": "관세 인상 발표", "desc": "설명", "link": "https://a.com/1", "date": "2026-03-12"}]
+        created = _json_response({"name": "cachedContents/shared"})
+        panel = _gemini_response()
+        with patch('requests.Session.post', side_effect=[created, panel, panel, _gemini_response("ok")]) as mock_post:
+            nb.analyze_panel("k", news, "PANEL_A")
+            nb.analyze_panel("k", news, "PANEL_B")
+            nb.generate_business_report("k", news, news, [])
+        urls = [c.args[0] for c in mock_post.call_args_list]
+        self.assertEqual(sum("/cachedContents?" in u for u in urls), 1)
+        for call in mock_post.call_args_list[1:]:
+            body = json.loads(call.kwargs["data"])
+            self.assertEqual(body["cachedContent"], "cachedContents/shared")
+            self.assertNotIn("[회사 컨텍스트]", body["contents"][0]["parts"][0]["text"])
+
+    def test_falls_back_to_inline_prompt(self):
+        unsupported = _json_response({"error": {"message": "too small"}}, status=400)
+        with patch('requests.Session.post', side_effect=[unsupported, _gemini_response("ok")]) as mock_post:
+            self.assertEqual(nb.call_gemini("k", "후보", cache_prefix="접두부"), ("ok", None))
+        body = json.loads(mock_post.call_args.kwargs["data"])
+        self.assertNotIn("cachedContent", body)
+        self.assertEqual(body["contents"][0]["parts"][0]["text"], "접두부\n\n후보")
+
+    def test_expired_cache_retried_inline(self):
+        created = _json_response({"name": "cachedContents/old"})
+        expired = _json_response({"error": {"message": "not found"}}, status=404)
+        with patch('requests.Session.post', side_effect=[created, expired, _gemini_response("ok")]) as mock_post:
+            self.assertEqual(nb.call_gemini("k", "후보", cache_prefix="접두부"), ("ok", None))
+        self.assertNotIn("cachedContent", json.loads(mock_post.call_args.kwargs["data"]))
+
+
+class TestGeminiStreaming(unittest.TestCase):
+    def _sse(self, texts):
+        return [f"data: {json.dumps({'candidates': [{'content': {'parts': [{'text': t}]}}]})}" for t in texts]
+
+    def test_parser_emits_articles_as_they_close(self):
+        doc = '```json\n{"articles": [{"ref_id": 0, "fact": "a \\"}] {", "x": [{"y": 2}]}, {"ref_id": 1}]}\n```'
+        parser = nb.IncrementalArticlesParser()
+        emitted = []
+        for i in range(0, len(doc), 4):
+            emitted.extend(parser.feed(doc[i:i + 4]))
+        self.assertEqual([a["ref_id"] for a in emitted], [0, 1])
+        self.assertEqual(emitted[0]["fact"], 'a "}] {')
+        self.assertTrue(parser.done)
+        self.assertFalse(parser.malformed)
+
+    def test_parser_flags_malformed_output(self):
+        self.assertTrue(self._feed('{"articles": [{"a": 1]').malformed)
+        self.assertTrue(self._feed('{"articles": [{"a": 1, }]}').malformed)
+        self.assertTrue(self._feed('분석 결과를 설명드리겠습니다. ' * 20).malformed)
+
+    def _feed(self, text):
+        parser = nb.IncrementalArticlesParser()
+        parser.feed(text)
+        return parser
+
+    def test_stream_calls_back_per_article(self):
+        res = unittest.mock.MagicMock(status_code=200)
+        res.iter_lines.return_value = self._sse(['{"articles": [{"ref_id": 0}', ', {"ref_id"', ': 1}]}'])
+        seen = []
+        with patch.dict(os.environ, {'GEMINI_STREAM': 'on'}), \
+                patch('requests.Session.post', return_value=res) as mock_post:
+            text, err = nb.call_gemini("k", "stream prompt", on_article=seen.append)
+        self.assertIsNone(err)
+        self.assertIn("streamGenerateContent?alt=sse", mock_post.call_args.args[0])
+        self.assertEqual(json.loads(text)["articles"], [{"ref_id": 0}, {"ref_id": 1}])
+        self.assertEqual(seen, [{"ref_id": 0}, {"ref_id": 1}])
+
+    def test_panel_analysis_records_streamed_articles(self):
+        res = unittest.mock.MagicMock(status_code=200)
+        res.iter_lines.return_value = self._sse(['{"articles": [{"ref_id": 0, "title": "a"}]}'])
+        news = [{"title": "임금 인상", "desc": "", "link": "https://a.com/1", "date": "d"}]
+        with patch.dict(os.environ, {'GEMINI_STREAM': 'on'}), \
+                patch('requests.Session.post', return_value=res), \
+                patch.object(nb, 'metrics', nb.MetricsRegistry()) as reg:
+            articles, is_fallback = nb._analyze_with_fallback("k", news, "PANEL_A")
+        self.assertFalse(is_fallback)
+        snap = reg.snapshot()
+        self.assertIn({"name": "streamed_articles", "labels": {"panel": "PANEL_A"}, "value": 1}, snap["counters"])
+        self.assertIn("first_article", [d["name"] for d in snap["durations"]])
+
+    def test_stream_aborts_early_on_malformed_output(self):
+        consumed = []
+
+        def lines():
+            for line in self._sse(['{"articles": [{"ref_id": 0]', '{"more": 1}']):
+                consumed.append(line)
+                yield line
+
+        res = unittest.mock.MagicMock(status_code=200)
+        res.iter_lines.return_value = lines()
+        with patch.dict(os.environ, {'GEMINI_STREAM': 'on'}), \
+                patch('requests.Session.post', return_value=res) as mock_post:
+            self.assertEqual(nb.call_gemini("k", "bad prompt"), (None, "malformed_output"))
+        self.assertEqual(len(consumed), 1)
+        self.assertEqual(mock_post.call_count, 1)
+        res.close.assert_called()
+
+
+class TestBatchMode(unittest.TestCase):
+    news = [{"title": "관세 인상 발표", "desc": "", "link": "https://a.com/1", "date": "2026-03-12"}]
+    report = {"bluf": ["x"], "direction": "Ambiguous"}
+
+    def test_full_batch_response_uses_single_call(self):
+        payload = {"panels": {"PANEL_A": {"articles": [{"ref_id": 0, "headline": "A"}]},
+                              "PANEL_B": {"articles": [{"ref_id": "0", "headline": "B"}]}},
+                   "report": self.report}
+        with patch.dict(os.environ, {'GEMINI_BATCH_MODE': 'on'}), \
+                patch('requests.Session.post', return_value=_gemini_response(json.dumps(payload))) as mock_post:
+            results, report = nb.run_panel_analyses(
+                "k", {"PANEL_A": self.news, "PANEL_B": self.news}, (self.news, self.news, []))
+        self.assertEqual(mock_post.call_count, 1)
+        self.assertEqual(results["PANEL_B"][0][0]["link"], "https://a.com/1")
+        self.assertFalse(results["PANEL_A"][1])
+        self.assertEqual(report, self.report)
+
+    def test_partial_batch_falls_back_per_panel(self):
+        payload = {"panels": {"PANEL_A": {"articles": [{"ref_id": 0, "headline": "A"}]}}}
+        with patch.dict(os.environ, {'GEMINI_BATCH_MODE': 'on'}), \
+                patch('requests.Session.post', return_value=_gemini_response(json.dumps(payload))), \
+                patch.object(nb, 'analyze_panel', return_value=([{"headline": "B"}], None)) as single, \
+                patch.object(nb, 'generate_business_report', return_value=self.report) as single_report:
+            results, report = nb.run_panel_analyses(
+                "k", {"PANEL_A": self.news, "PANEL_B": self.news}, (self.news, self.news, []))
+        self.assertEqual([c.args[2] for c in single.call_args_list], ["PANEL_B"])
+        single_report.assert_called_once()
+        self.assertEqual(results["PANEL_A"][0][0]["headline"], "A")
+        self.assertEqual(results["PANEL_B"], ([{"headline": "B"}], False))
+        self.assertEqual(report, self.report)
+
+
+    def test_panel_with_only_invalid_ref_ids_retried_individually(self):
+        payload = {"panels": {"PANEL_A": {"articles": [{"ref_id": 0, "headline": "A"}]},
+                              "PANEL_B": {"articles": [{"ref_id": 7, "headline": "환각"}]},
+                              "PANEL_C": {"articles": []}}}
+        with patch.dict(os.environ, {'GEMINI_BATCH_MODE': 'on'}), \
+                patch('requests.Session.post', return_value=_gemini_response(json.dumps(payload))), \
+                patch.object(nb, 'analyze_panel', return_value=([{"headline": "B"}], None)) as single:
+            results, _ = nb.run_panel_analyses(
+                "k", {"PANEL_A": self.news, "PANEL_B": self.news, "PANEL_C": self.news})
+        self.assertEqual([c.args[2] for c in single.call_args_list], ["PANEL_B"])
+        self.assertEqual(results["PANEL_B"], ([{"headline": "B"}], False))
+        self.assertTrue(results["PANEL_C"][1])
+
+
+class TestAnalysisStore(unittest.TestCase):
+    def _article(self, title, link):
+        return {"title": title, "desc": "", "link": link, "date": "2026-03-12"}
+
+    def _store(self, tmp, today):
+        return nb.AnalysisStore(path=os.path.join(tmp, "store.json"), today=today)
+
+    def test_canonical_link_strips_tracking(self):
+        self.assertEqual(
+            nb.canonical_link("https://www.News.com/a/1/?utm_source=x&id=3#top"),
+            nb.canonical_link("http://news.com/a/1?id=3"),
+        )
+
+    def test_reuse_by_link_and_near_dup_title(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = self._store(tmp, datetime.date(2026, 3, 12))
+            store.record(self._article("농심 라면 수출 역대 최대 실적 기록", "https://a.com/1"),
+                         {"title": "분석", "signal_strength": "High", "ref_id": 0}, "PANEL_A")
+            store.save()
+            loaded = nb.AnalysisStore.load(store.path, today=datetime.date(2026, 3, 19))
+            by_link = loaded.lookup(self._article("다른 제목", "https://www.a.com/1?utm_medium=rss"))
+            self.assertEqual(by_link["signal_strength"], "High")
+            self.assertEqual(by_link["reused_from"], "2026-03-12")
+            by_title = loaded.lookup(self._article("농심 라면 수출 역대 최대 실적", "https://b.com/9"))
+            self.assertEqual(by_title["link"], "https://b.com/9")
+            self.assertIsNone(loaded.lookup(self._article("CJ 물류 자동화 투자", "https://c.com/2")))
+
+    def test_stale_entries_not_reused_and_pruned(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = self._store(tmp, datetime.date(2026, 1, 1))
+            store.record(self._article("오래된 기사", "https://a.com/old"), {"title": "x"}, "PANEL_A")
+            store.today = datetime.date(2026, 3, 12)
+            self.assertIsNone(store.lookup(self._article("오래된 기사", "https://a.com/old")))
+            store.prune()
+            self.assertEqual(len(store.entries), 0)
+
+    def test_prune_drops_entries_with_unparseable_dates(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = self._store(tmp, datetime.date(2026, 3, 12))
+            store.record(self._article("날짜 깨진 기사", "https://a.com/bad"), {"title": "x"}, "PANEL_A")
+            store.record(self._article("정상 기사", "https://a.com/ok"), {"title": "y"}, "PANEL_A")
+            store.entries[nb.canonical_link("https://a.com/bad")]["analyzed_at"] = "not-a-date"
+            store.prune()
+            self.assertEqual(list(store.entries), [nb.canonical_link("https://a.com/ok")])
+
+    def test_reused_analysis_only_when_model_selects_it(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = self._store(tmp, datetime.date(2026, 3, 12))
+            old = self._article("오뚜기 카레 가격 인상 발표", "https://a.com/old")
+            new = self._article("CJ대한통운 물류센터 자동화 투자", "https://a.com/new")
+            store.record(old, {"title": "이전 분석"}, "PANEL_A")
+            # 이전 분석 보유 후보(ref 0)도 후보로 전달되지만, 모델이 선정하지 않으면 포함되지 않음
+            with patch('requests.Session.post',
+                       return_value=_gemini_response('{"articles": [{"ref_id": 1, "title": "신규 분석"}]}')) as mock_post:
+                result, err = nb.analyze_panel("k", [old, new], "PANEL_A", store)
+            self.assertIsNone(err)
+            prompt = json.loads(mock_post.call_args.kwargs["data"])["contents"][0]["parts"][0]["text"]
+            self.assertIn("오뚜기 카레", prompt)
+            self.assertIn("[기존 분석 보유 후보] ref_id 0", prompt)
+            self.assertEqual([a["title"] for a in result], ["신규 분석"])
+            self.assertIn(nb.canonical_link(new["link"]), store.entries)
+
+            # 모델이 선정하면 새로 생성된 필드 대신 저장된 분석을 사용
+            with patch('requests.Session.post',
+                       return_value=_gemini_response('{"articles": [{"ref_id": 0, "title": "간략"}]}')):
+                result, _ = nb.analyze_panel("k", [old, self._article("기타", "https://a.com/x")], "PANEL_A", store)
+            self.assertEqual(result[0]["title"], "이전 분석")
+            self.assertEqual(result[0]["reused_from"], "2026-03-12")
+
+    def test_reused_candidates_sent_as_titles_only(self):
+        desc = "오뚜기가 카레 전 품목 가격을 평균 8% 인상한다고 밝혔다. 원재료 가격 상승 영향이다."
+        with tempfile.TemporaryDirectory() as tmp:
+            store = self._store(tmp, datetime.date(2026, 3, 12))
+            old = dict(self._article("오뚜기 카레 가격 인상 발표", "https://a.com/old"), desc=desc)
+            new = self._article("CJ대한통운 물류센터 자동화 투자", "https://a.com/new")
+            full_ctx, _, full_tokens = nb.build_candidate_context([old, new], **nb._panel_context_budget())
+            store.record(old, {"title": "이전 분석"}, "PANEL_A")
+            with patch('requests.Session.post',
+                       return_value=_gemini_response('{"articles": [{"ref_id": 1, "title": "신규 분석"}]}')) as mock_post:
+                nb.analyze_panel("k", [old, new], "PANEL_A", store)
+            prompt = json.loads(mock_post.call_args.kwargs["data"])["contents"][0]["parts"][0]["text"]
+            self.assertIn(desc[:20], full_ctx)
+            self.assertNotIn(desc[:20], prompt)
+            brief_ctx, _, brief_tokens = nb.build_candidate_context(
+                [old, new], **nb._panel_context_budget(), brief_ids={0})
+            self.assertLess(brief_tokens, full_tokens)
+            self.assertIn(brief_ctx, prompt)
+
+    def test_call_skipped_when_stored_analyses_fill_quota(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = self._store(tmp, datetime.date(2026, 3, 12))
+            news = [self._article(t, f"https://a.com/{i}") for i, t in enumerate(
+                ["오뚜기 카레 가격 인상", "농심 라면 수출 최대", "CJ 물류센터 자동화", "삼양 불닭 증설 투자"])]
+            for i in (0, 2, 3):
+                store.record(news[i], {"title": f"이전 분석 {i}"}, "PANEL_A")
+            with patch('requests.Session.post') as mock_post:
+                result, err = nb.analyze_panel("k", news, "PANEL_A", store)
+            mock_post.assert_not_called()
+            self.assertIsNone(err)
+            self.assertEqual([(a["ref_id"], a["title"]) for a in result],
+                             [(0, "이전 분석 0"), (2, "이전 분석 2"), (3, "이전 분석 3")])
+
+    def test_reuse_lookup_limited_to_budgeted_candidates(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = self._store(tmp, datetime.date(2026, 3, 12))
+            news = [self._article(f"제목{i}가 {i}번째 키워드{i * 7}", f"https://a.com/{i}") for i in range(20)]
+            store.record(news[15], {"title": "낮은 순위 이전 분석"}, "PANEL_A")
+            with patch.dict(os.environ, {'PANEL_MAX_CANDIDATES': '5'}), \
+                    patch.object(store, 'lookup', wraps=store.lookup) as lookup, \
+                    patch('requests.Session.post',
+                          return_value=_gemini_response('{"articles": [{"ref_id": 0, "title": "신규"}]}')):
+                result, _ = nb.analyze_panel("k", news, "PANEL_A", store)
+            self.assertEqual(lookup.call_count, 5)
+            self.assertEqual([a["title"] for a in result], ["신규"])
+
+
 class TestFetchNews(unittest.TestCase):
     def test_fetch_news_returns_list(self):
         """Naver API 응답이 리스트를 반환하는지 테스트."""
-        with patch('requests.get') as mock_get:
+        with patch('requests.Session.get') as mock_get:
             # Naver API 모의 응답
             mock_response = {
                 "items": [
@@ -263,8 +1244,245 @@ class TestFetchNews(unittest.TestCase):
             mock_res.status_code = 200
             mock_get.return_value = mock_res
 
-            result = nb.fetch_news("PANEL_C", nb.PROFILE["PANEL_C"])
-            self.assertIsInstance(result, list)
+            result, _ = nb.collect_panels({"PANEL_C": nb.PROFILE["PANEL_C"]})
+            self.assertIsInstance(result["PANEL_C"], list)
+
+
+class TestStreamingPipeline(unittest.TestCase):
+    def _art(self, title, desc=""):
+        return {"title": title, "desc": desc, "link": "http://example.com"}
+
+    def test_top_k_matches_full_sort_prefix(self):
+        arts = [dict(self._art(f"t{i}"), relevance_score=s) for i, s in enumerate([0.5, 0.9, 0.5, 0.7, 0.9])]
+        expected = sorted(arts, key=lambda n: n['relevance_score'], reverse=True)[:3]
+        self.assertEqual(nb.top_k(iter(arts), 3), expected)
+
+    def test_pipeline_filters_scores_and_cross_dedups(self):
+        articles = [
+            self._art("오뚜기 신제품 매출 증가"),
+            self._art("아파트 분양 오뚜기 라면"),       # 네거티브 필터
+            self._art("무관한 제목"),                   # 저관련
+            self._art("농심 삼양 라면 수출 실적 경쟁"),  # 교차 중복
+        ]
+        stats = {}
+        kept = nb.run_panel_pipeline(
+            "PANEL_C", iter(articles), seen_titles=["농심 삼양 라면 수출 실적 경쟁"], k=5, stats=stats
+        )
+        self.assertEqual([n["title"] for n in kept], ["오뚜기 신제품 매출 증가"])
+        self.assertEqual(stats, {"fetched": 4, "excluded": 1, "below_min": 1, "cross_dup": 1})
+
+    def test_collect_panels_dedups_in_priority_order(self):
+        from email.utils import format_datetime
+        import datetime
+        pub = format_datetime(datetime.datetime.now(datetime.timezone.utc))
+
+        def fake_get(url, headers=None, params=None, timeout=None):
+            res = unittest.mock.MagicMock(status_code=200)
+            res.json.return_value = {"items": [{
+                "title": "오뚜기 라면 글로벌 수출 원자재 급등",
+                "link": f"https://example.com/{params['query']}",
+                "description": "", "pubDate": pub,
+            }]}
+            return res
+
+        with patch('requests.Session.get', side_effect=fake_get):
+            news, stats = nb.collect_panels(
+                {"PANEL_A": ["collect-a"], "PANEL_C": ["collect-c"]},
+                extra_sources={"PANEL_C": lambda: []},
+            )
+        self.assertEqual(len(news["PANEL_A"]), 1)
+        self.assertEqual(news["PANEL_C"], [])
+        self.assertEqual(stats["PANEL_C"]["cross_dup"], 1)
+
+
+class TestHttpSession(unittest.TestCase):
+    def test_session_is_shared(self):
+        self.assertIs(nb.http_session(), nb.http_session())
+
+    def test_adapter_applies_default_timeout(self):
+        adapter = nb.http_session().get_adapter("https://openapi.naver.com/")
+        self.assertIsInstance(adapter, nb._TimeoutHTTPAdapter)
+        self.assertGreater(adapter.timeout, 0)
+
+
+class TestPanelStreams(unittest.TestCase):
+    def _response(self, titles):
+        from email.utils import format_datetime
+        import datetime
+        pub = format_datetime(datetime.datetime.now(datetime.timezone.utc))
+        res = unittest.mock.MagicMock()
+        res.status_code = 200
+        res.json.return_value = {"items": [
+            {"title": t, "link": f"https://example.com/{t}", "description": t, "pubDate": pub}
+            for t in titles
+        ]}
+        return res
+
+    def test_merge_order_follows_keywords(self):
+        """완료 순서와 무관하게 키워드 입력 순서대로 병합."""
+        by_query = {
+            "kw1": ["라면 수출 급증 발표"],
+            "kw2": ["라면 수출 급증 발표 속보", "최저임금 인상 결정"],
+            "kw3": ["환율 상승 지속"],
+        }
+
+        def fake_get(url, headers=None, params=None, timeout=None):
+            return self._response(by_query[params["query"]])
+
+        with patch('requests.Session.get', side_effect=fake_get):
+            result = {
+                pid: [n["title"] for n in stream]
+                for pid, stream in nb.iter_panel_streams({"PANEL_A": ["kw1", "kw2"], "PANEL_B": ["kw3"]})
+            }
+        self.assertEqual(result["PANEL_A"], ["라면 수출 급증 발표", "최저임금 인상 결정"])
+        self.assertEqual(result["PANEL_B"], ["환율 상승 지속"])
+
+
+class TestNaverPagination(unittest.TestCase):
+    def _page(self, pub_dates):
+        from email.utils import format_datetime
+        res = unittest.mock.MagicMock()
+        res.status_code = 200
+        res.json.return_value = {"items": [
+            {"title": f"t{i}", "link": "l", "description": "", "pubDate": format_datetime(d)}
+            for i, d in enumerate(pub_dates)
+        ]}
+        return res
+
+    def test_stops_when_page_crosses_cutoff(self):
+        import datetime
+        now = datetime.datetime.now(datetime.timezone.utc)
+        limit = now - datetime.timedelta(days=7)
+        pages = {
+            1: self._page([now] * 10),
+            11: self._page([now] * 5 + [now - datetime.timedelta(days=9)] * 5),
+            21: self._page([now] * 10),
+        }
+        starts = []
+
+        def fake_get(url, headers=None, params=None, timeout=None):
+            starts.append(params["start"])
+            return pages[params["start"]]
+
+        with patch('requests.Session.get', side_effect=fake_get), \
+                patch.dict(os.environ, {'NAVER_PAGE_SIZE': '10', 'NAVER_MAX_PAGES': '5'}):
+            items = list(nb.iter_naver_pages("PANEL_A", "pagination-kw", {}, limit))
+        self.assertEqual(starts, [1, 11])
+        self.assertEqual(len(items), 20)
+
+
+class TestRateLimiter(unittest.TestCase):
+    def _limiter(self, **kwargs):
+        clock = {"now": 0.0}
+
+        def fake_sleep(seconds):
+            clock["now"] += seconds
+
+        limiter = nb.RateLimiter("unit", clock=lambda: clock["now"], sleep=fake_sleep, **kwargs)
+        return limiter, clock
+
+    def test_token_bucket_spaces_requests(self):
+        limiter, clock = self._limiter(rate_per_sec=2, burst=1)
+        limiter.acquire()
+        limiter.acquire()
+        self.assertAlmostEqual(clock["now"], 0.5)
+        self.assertEqual(limiter.stats()["requests"], 2)
+
+    def test_throttle_honors_retry_after_and_slows_down(self):
+        limiter, clock = self._limiter(rate_per_sec=4, burst=4)
+        limiter.on_throttle(retry_after=3.0)
+        limiter.acquire()
+        self.assertGreaterEqual(clock["now"], 3.0)
+        stats = limiter.stats()
+        self.assertEqual(stats["throttle_events"], 1)
+        self.assertEqual(stats["rate_per_sec"], 2.0)
+
+    def test_naver_429_is_retried_not_dropped(self):
+        limiter, _ = self._limiter(rate_per_sec=10, burst=10)
+        throttled = unittest.mock.MagicMock(status_code=429, headers={"Retry-After": "1"})
+        ok = unittest.mock.MagicMock(status_code=200)
+        ok.json.return_value = {"items": [{"title": "a"}]}
+        with patch.object(nb, 'naver_rate_limiter', limiter), \
+                patch('requests.Session.get', side_effect=[throttled, ok]):
+            status, items = nb._naver_search({}, "throttle-retry-kw")
+        self.assertEqual((status, items), (200, [{"title": "a"}]))
+        self.assertEqual(limiter.throttle_events, 1)
+
+    def test_parse_retry_after(self):
+        self.assertEqual(nb.parse_retry_after("5"), 5.0)
+        self.assertIsNone(nb.parse_retry_after(None))
+        self.assertIsNone(nb.parse_retry_after("soon"))
+
+
+class TestRssConditionalGet(unittest.TestCase):
+    FEED = (
+        b'<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel><title>t</title>'
+        b'<item><title>Safety notice</title><link>https://example.com/1</link>'
+        b'<description>desc</description></item></channel></rss>'
+    )
+
+    def _res(self, status, content=b"", headers=None):
+        res = unittest.mock.MagicMock()
+        res.status_code = status
+        res.content = content
+        res.headers = headers or {}
+        return res
+
+    def test_304_reuses_cached_entries(self):
+        with tempfile.TemporaryDirectory() as tmp, patch.object(nb, 'CACHE_DIR', tmp):
+            first = self._res(200, self.FEED, {"ETag": '"v1"'})
+            with patch('requests.Session.get', return_value=first):
+                entries, status = nb._fetch_feed_entries("https://example.com/rss")
+            self.assertEqual(status, "fresh")
+            self.assertEqual(entries[0]["title"], "Safety notice")
+
+            with patch('requests.Session.get', return_value=self._res(304)) as mock_get:
+                entries, status = nb._fetch_feed_entries("https://example.com/rss")
+            self.assertEqual(status, "not_modified")
+            self.assertEqual(entries[0]["link"], "https://example.com/1")
+            self.assertEqual(mock_get.call_args.kwargs["headers"]["If-None-Match"], '"v1"')
+
+    def test_304_without_cache_entry_retries_unconditionally(self):
+        with tempfile.TemporaryDirectory() as tmp, patch.object(nb, 'CACHE_DIR', tmp):
+            with patch('requests.Session.get', side_effect=[self._res(304), self._res(200, self.FEED)]) as mock_get:
+                entries, status = nb._fetch_feed_entries("https://example.com/rss")
+            self.assertEqual((status, entries[0]["title"]), ("fresh", "Safety notice"))
+            self.assertNotIn("If-None-Match", mock_get.call_args.kwargs["headers"])
+
+            with patch('requests.Session.get', return_value=self._res(304)):
+                with self.assertRaises(requests.exceptions.HTTPError):
+                    nb._fetch_feed_entries("https://example.com/other")
+            self.assertFalse(os.path.exists(
+                os.path.join(tmp, "rss", nb.hashlib.sha1(b"https://example.com/other").hexdigest() + ".json")
+            ))
+
+
+class TestDiskCache(unittest.TestCase):
+    def test_ttl_and_lru_cap(self):
+        with tempfile.TemporaryDirectory() as tmp, patch.object(nb, 'CACHE_DIR', tmp):
+            cache = nb.DiskCache("unit", ttl_seconds=60, max_entries=2)
+            cache.set(["a"], 1)
+            self.assertEqual(cache.get(["a"]), 1)
+            self.assertIsNone(cache.get(["missing"]))
+            self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+            cache.ttl_seconds = -1
+            self.assertIsNone(cache.get(["a"]))
+            self.assertEqual(cache.get(["a"], ignore_ttl=True), 1)
+
+            cache.set(["b"], 2)
+            cache.set(["c"], 3)
+            remaining = [k for k in (["a"], ["b"], ["c"]) if cache.get(k, ignore_ttl=True) is not None]
+            self.assertEqual(len(remaining), 2)
+
+    def test_offline_mode_never_hits_network(self):
+        with tempfile.TemporaryDirectory() as tmp, patch.object(nb, 'CACHE_DIR', tmp), \
+                patch.dict(os.environ, {'NAVER_OFFLINE': '1'}), \
+                patch('requests.Session.get') as mock_get:
+            self.assertEqual(nb._naver_search({}, "uncached query"), (None, []))
+            nb._naver_cache.set(["news", "cached query", 10, "date", 1], [{"title": "x"}])
+            self.assertEqual(nb._naver_search({}, "cached query"), (200, [{"title": "x"}]))
+            mock_get.assert_not_called()
 
 
 class TestAnalyzePanelFallback(unittest.TestCase):
@@ -286,7 +1504,7 @@ class TestAnalyzePanelFallback(unittest.TestCase):
         mock_res.status_code = 200
         mock_res.json.return_value = mock_response
 
-        with patch('requests.post') as mock_post:
+        with patch('requests.Session.post') as mock_post:
             mock_post.return_value = mock_res
             result, error = nb.analyze_panel(
                 "test-api-key",